@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+"""Optional asyncio SEMP transport based on httpx, with HTTP/2 if the h2 package is installed.
+
+solace_utils sends the requests of a SolaceBulkTask with async_transport here: each worker
+thread runs _make_request() / _make_page_request() on a shared event loop thread with
+run_sync(), so the number of requests in flight is the number of workers. With HTTP/2 all
+requests to a broker are multiplexed over one connection, so hundreds of workers do not
+open hundreds of connections.
+Without httpx, with the httpapi connection, with auth_type session/oauth or while a cassette
+records / replays the requests the synchronous solace_utils functions are used instead.
+"""
+
+import asyncio
+import atexit
+import threading
+import time
+import traceback
+import weakref
+
+import ansible.module_utils.network.solace.solace_utils as su
+
+try:
+    import httpx
+
+    HAS_HTTPX = True
+except ImportError:
+    HTTPX_IMP_ERR = traceback.format_exc()
+    HAS_HTTPX = False
+
+try:
+    import h2  # noqa: F401, required by httpx for http2
+
+    HAS_H2 = True
+except ImportError:
+    HAS_H2 = False
+
+
+def is_supported(solace_config):
+    """True if requests of solace_config can be sent with httpx, False for the synchronous fallback"""
+    return (HAS_HTTPX and solace_config.connection is None and solace_config.auth_type == 'basic'
+            and solace_config.cassette is None)
+
+
+# event loop -> dict: broker url & credentials -> httpx.AsyncClient
+_CLIENTS = weakref.WeakKeyDictionary()
+
+
+def get_client(solace_config):
+    """Return the httpx.AsyncClient of the running event loop for the broker, creating it on first use."""
+    clients = _CLIENTS.setdefault(asyncio.get_running_loop(), dict())
+    key = (solace_config.vmr_url, solace_config.vmr_auth, solace_config.pool_size, solace_config.keep_alive,
+           solace_config.compression)
+    client = clients.get(key)
+    if client is None:
+        client = httpx.AsyncClient(
+            base_url=solace_config.vmr_url,
+            auth=solace_config.vmr_auth,
+            http2=HAS_H2,
+            headers={'Accept-Encoding': su.ACCEPT_ENCODING if solace_config.compression else 'identity'},
+            limits=httpx.Limits(max_connections=solace_config.pool_size,
+                                max_keepalive_connections=solace_config.pool_size if solace_config.keep_alive else 0)
+        )
+        clients[key] = client
+    return client
+
+
+async def close_clients():
+    """Close the clients of the running event loop and their connections."""
+    clients = _CLIENTS.pop(asyncio.get_running_loop(), dict())
+    for client in clients.values():
+        await client.aclose()
+
+
+class _LoopThread(object):
+    """Event loop running in a daemon thread, executing the coroutines submitted by synchronous code"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='solace-async')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def close(self):
+        self.run(close_clients())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+_LOOP_THREAD = None
+_LOOP_THREAD_LOCK = threading.Lock()
+
+
+def run_sync(coro):
+    """Run coro on the shared event loop thread and wait for its result, callable from any thread but the loop's."""
+    global _LOOP_THREAD
+    with _LOOP_THREAD_LOCK:
+        if _LOOP_THREAD is None:
+            _LOOP_THREAD = _LoopThread()
+            atexit.register(_LOOP_THREAD.close)
+    return _LOOP_THREAD.run(coro)
+
+
+async def _run_in_executor(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+def _is_retriable_error(method, e):
+    """Same rules as solace_utils._is_retriable_error() for httpx exceptions"""
+    if isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)):
+        return True
+    if method not in su.IDEMPOTENT_METHODS:
+        return False
+    return isinstance(e, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError))
+
+
+async def _send_request(method, solace_config, path, json=None, timeout=None):
+    su.log.debug("%s uri=%s body=%s (async)", method, path, su._LazyJson(json))
+    timeout = timeout or solace_config.vmr_timeout
+    headers = {'x-broker-name': solace_config.x_broker}
+    content = None
+    if json is not None:
+        content = su.json_dumps(json)
+        headers['Content-Type'] = 'application/json'
+        if solace_config.semp_stats is not None:
+            solace_config.semp_stats.add_sent(len(content))
+    return await get_client(solace_config).request(
+        method,
+        path,
+        content=content,
+        headers=headers,
+        timeout=httpx.Timeout(timeout, connect=min(solace_config.vmr_connect_timeout, timeout))
+    )
+
+
+def _record_failure(breaker, solace_config, e):
+    """Same as solace_utils._record_failure() for httpx exceptions"""
+    if breaker is not None and isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)):
+        breaker.record(solace_config.vmr_url, False)
+
+
+async def _send_with_retry(method, solace_config, path, json=None):
+    """Coroutine version of solace_utils._send_with_retry()"""
+    breaker = solace_config.circuit_breaker
+    stats = solace_config.latency_stats
+    endpoint = su._endpoint_class(method, path) if stats is not None else None
+    attempt = 0
+    while True:
+        timeout = su._attempt_timeout(solace_config, endpoint)
+        if breaker is not None:
+            breaker.check(solace_config.vmr_url)
+        resp = None
+        start = time.time()
+        try:
+            resp = await _send_request(method, solace_config, path, json, timeout=timeout)
+            su._record(solace_config, method, path, json, resp, time.time() - start)
+            if stats is not None:
+                stats.record(solace_config.vmr_url, endpoint, time.time() - start)
+            if breaker is not None:
+                breaker.record(solace_config.vmr_url, True)
+            if resp.status_code not in su.RETRY_STATUS_CODES:
+                return resp
+            error = 'http status {}'.format(resp.status_code)
+        except httpx.TransportError as e:
+            su._record(solace_config, method, path, json, None, time.time() - start, e)
+            if stats is not None and isinstance(e, httpx.ReadTimeout):
+                stats.record(solace_config.vmr_url, endpoint, timeout)
+            if not _is_retriable_error(method, e):
+                _record_failure(breaker, solace_config, e)
+                raise
+            error = e
+        delay = su._retry_delay(solace_config, attempt, resp)
+        if delay is None:
+            if resp is not None:
+                return resp
+            _record_failure(breaker, solace_config, error)
+            raise error
+        attempt += 1
+        if solace_config.semp_stats is not None:
+            solace_config.semp_stats.add_retry()
+        su.log.debug("retry %d of %s uri=%s in %.2fs after: %s", attempt, method, path, delay, error)
+        await asyncio.sleep(delay)
+
+
+async def _make_request(method, solace_config, path_array, json=None, params=None):
+    if not is_supported(solace_config):
+        return await _run_in_executor(su._make_request, method, solace_config, path_array, json, params)
+    path = su._build_path(path_array, params)
+    try:
+        return su._parse_response(await _send_with_retry(method, solace_config, path, json))
+    except su.CircuitOpenError as e:
+        return False, str(e)
+    except httpx.HTTPError as e:
+        return False, '{}: {}'.format(type(e).__name__, e)
+
+
+async def _make_page_request(solace_config, path):
+    """Coroutine version of solace_utils._make_page_request()"""
+    if not is_supported(solace_config):
+        return await _run_in_executor(su._make_page_request, solace_config, path)
+    try:
+        resp = await _send_with_retry('GET', solace_config, path)
+    except su.CircuitOpenError as e:
+        return False, str(e)
+    except httpx.HTTPError as e:
+        return False, '{}: {}'.format(type(e).__name__, e)
+    return su._parse_page_response(resp)
+
+###
+# The End.
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+"""Run solace_* modules inside the controller process, used by the solace action plugins."""
+
+import importlib.util
+import threading
+
+from ansible.module_utils.basic import remove_values
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+
+# module path -> loaded python module
+_MODULES = dict()
+_MODULES_LOCK = threading.Lock()
+
+
+class _ModuleExit(Exception):
+    """Raised by LocalModule.exit_json() / fail_json() to end run_module()"""
+
+    def __init__(self, result):
+        Exception.__init__(self)
+        self.result = result
+
+
+class LocalModule(object):
+    """Stand-in for AnsibleModule, takes the module arguments from the calling thread's invocation."""
+
+    _invocation = threading.local()
+
+    def __init__(self, argument_spec, supports_check_mode=False, mutually_exclusive=None, required_together=None,
+                 required_one_of=None, required_if=None, required_by=None, **kwargs):
+        self.check_mode = self._invocation.check_mode
+        self._socket_path = self._invocation.socket_path
+        self._verbosity = self._invocation.verbosity
+        self.no_log_values = set()
+        if self.check_mode and not supports_check_mode:
+            self.exit_json(skipped=True, msg='module does not support check mode')
+        validator = ArgumentSpecValidator(argument_spec,
+                                          mutually_exclusive=mutually_exclusive,
+                                          required_together=required_together,
+                                          required_one_of=required_one_of,
+                                          required_if=required_if,
+                                          required_by=required_by)
+        validated = validator.validate(self._invocation.args)
+        self.no_log_values = validated._no_log_values
+        if validated.error_messages:
+            self.fail_json(msg='; '.join(validated.error_messages))
+        self.params = validated.validated_parameters
+
+    def exit_json(self, **kwargs):
+        kwargs.setdefault('changed', False)
+        raise _ModuleExit(remove_values(kwargs, self.no_log_values))
+
+    def fail_json(self, msg, **kwargs):
+        kwargs['failed'] = True
+        kwargs['msg'] = msg
+        raise _ModuleExit(remove_values(kwargs, self.no_log_values))
+
+
+def load_module(path):
+    """Load the module source once, with AnsibleModule replaced by LocalModule."""
+    with _MODULES_LOCK:
+        module = _MODULES.get(path)
+        if module is None:
+            spec = importlib.util.spec_from_file_location('ansible_solace_local_%d' % len(_MODULES), path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            if not hasattr(module, 'run_module'):
+                raise ValueError('{} has no run_module()'.format(path))
+            module.AnsibleModule = LocalModule
+            _MODULES[path] = module
+    return module
+
+
+def run_module(path, args, check_mode=False, socket_path=None, verbosity=0):
+    """Run the module's run_module() with args in the calling thread, returns the module result.
+
+    socket_path: of the persistent httpapi connection, if the task uses one
+    verbosity: ansible verbosity, e.g. 3 for -vvv
+    """
+    module = load_module(path)
+    invocation = LocalModule._invocation
+    invocation.args = dict(args)
+    invocation.check_mode = check_mode
+    invocation.socket_path = socket_path
+    invocation.verbosity = verbosity
+    try:
+        module.run_module()
+    except _ModuleExit as e:
+        return e.result
+    except Exception as e:
+        return dict(failed=True, msg='{}: {}'.format(type(e).__name__, e))
+    finally:
+        invocation.args = None
+    return dict(failed=True, msg='module returned without calling exit_json()')
+
+###
+# The End.
@@ -6,21 +6,82 @@
 
 """Collection of utility classes and functions to aid the solace_* modules."""
 
+import atexit
+import collections
+import hashlib
 import re
+import sys
 import traceback
 import logging
 import json
+import os
+import random
+import ssl
+import threading
+import time
+from email.utils import parsedate_tz, mktime_tz
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible.module_utils.connection import Connection, ConnectionError as HttpApiConnectionError
+from ansible.module_utils.six.moves.urllib.parse import quote, urlencode, urlsplit
+
+try:
+    import fcntl
+
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
 
 try:
     import requests
+    import requests.adapters
+    import urllib3
 
     HAS_REQUESTS = True
 except ImportError:
     REQUESTS_IMP_ERR = traceback.format_exc()
     HAS_REQUESTS = False
 
+# json codec of the SEMP payloads: orjson or ujson if installed, the standard library otherwise.
+# json_loads() takes str or bytes, json_dumps() returns utf-8 bytes
+try:
+    import orjson
+
+    JSON_CODEC = 'orjson'
+    json_loads = orjson.loads
+
+    def _orjson_default(obj):
+        # subclasses orjson does not serialize natively, e.g. the tagged float values of the ansible controller
+        for base in (float, str, int):
+            if isinstance(obj, base):
+                return base(obj)
+        raise TypeError('Type is not JSON serializable: {}'.format(type(obj).__name__))
+
+    def json_dumps(obj):
+        # str subclasses as keys: module arguments on the controller (see solace_local)
+        return orjson.dumps(obj, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    try:
+        import ujson
+
+        JSON_CODEC = 'ujson'
+        json_loads = ujson.loads
+
+        def json_dumps(obj):
+            return ujson.dumps(obj, ensure_ascii=False).encode('utf-8')
+    except ImportError:
+        JSON_CODEC = 'json'
+        json_loads = json.loads
+
+        def json_dumps(obj):
+            return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
 SEMP_V2_CONFIG = '/SEMP/v2/config'
 
+""" broker resources """
+ABOUT = 'about'
+ABOUT_API = 'api'
+
 """ VPN level reources """
 
 MSG_VPNS = 'msgVpns'
@@ -58,19 +119,417 @@ CERT_AUTHORITIES = 'certAuthorities'
 
 ################################################################################################
 # logging
-ENABLE_LOGGING = False  # False to disable
+# file to write the debug log to, e.g. ANSIBLE_SOLACE_LOG_FILE=/tmp/ansible_solace.log
+LOG_FILE_ENV = 'ANSIBLE_SOLACE_LOG_FILE'
+# keep the last SEMP requests of a task and return them in the result if the task fails,
+# also enabled by -vvv, which returns them for successful tasks as well
+SEMP_LOG_ENV = 'ANSIBLE_SOLACE_SEMP_LOG'
+SEMP_LOG_VERBOSITY = 3
+DEFAULT_SEMP_LOG_SIZE = 50
+# characters of a response body kept in the semp_log of the result
+SEMP_LOG_MAX_BODY = 2000
+# attributes whose values are replaced by ******** in logs
+REDACT_PATTERN = re.compile(r'password|secret|token|passphrase|privatekey|authorization', re.IGNORECASE)
+
+log = logging.getLogger('ansible_solace')
+
+
+def init_logging(path):
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(process)d - %(levelname)s - %(funcName)s(): %(message)s'))
+    log.addHandler(handler)
+    log.setLevel(logging.DEBUG)
+    # not to the root logger of the host process, e.g. the ansible controller
+    log.propagate = False
+    log.info('Module start #############################################################################################')
+
+
+if os.environ.get(LOG_FILE_ENV):
+    init_logging(os.path.expanduser(os.environ[LOG_FILE_ENV]))
+
+
+def redact(obj):
+    """Copy of obj (parsed json) with the values of credential attributes replaced"""
+    if isinstance(obj, dict):
+        return dict((k, '********' if REDACT_PATTERN.search(k) else redact(v)) for k, v in obj.items())
+    if isinstance(obj, list):
+        return [redact(v) for v in obj]
+    return obj
+
+
+class _LazyJson(object):
+    """Log argument formatting obj as redacted, indented json only if the record is emitted"""
+
+    __slots__ = ('obj',)
+
+    def __init__(self, obj):
+        self.obj = obj
 
+    def __str__(self):
+        return json.dumps(redact(self.obj), indent=2)
 
-def init_logging():
-    logging.basicConfig(filename='ansible_solace.log',
-                        level=logging.DEBUG,
-                        format='%(asctime)s - %(name)s - %(levelname)s - %(funcName)s(): %(message)s')
-    logging.info('Module start #############################################################################################')
-    return
 
+class SempLog(object):
+    """Ring buffer of the last SEMP requests of a task.
 
-if ENABLE_LOGGING:
-    init_logging()
+    Only references are stored per request, bodies are decoded, redacted and formatted
+    by records(), when the buffer is returned in the result.
+    """
+
+    def __init__(self, size=DEFAULT_SEMP_LOG_SIZE):
+        self._records = collections.deque(maxlen=size)
+
+    def add(self, method, path, data, resp, seconds, error=None):
+        self._records.append((time.time(), method, path, data, resp, seconds, error))
+
+    def records(self):
+        return [self._format(*record) for record in list(self._records)]
+
+    @staticmethod
+    def _format(when, method, path, data, resp, seconds, error):
+        record = dict(
+            time=time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(when)),
+            method=method,
+            path=path,
+            seconds=round(seconds, 4)
+        )
+        if data is not None:
+            record['request'] = redact(data)
+        if resp is not None:
+            record['status'] = resp.status_code
+            try:
+                record['response'] = redact(json_loads(resp.content))
+            except ValueError:
+                record['response'] = resp.text
+            text = json.dumps(record['response'])
+            if len(text) > SEMP_LOG_MAX_BODY:
+                record['response'] = text[:SEMP_LOG_MAX_BODY] + '...'
+        if error is not None:
+            record['error'] = str(error)
+        return record
+
+
+# return semp_stats in the result of every task, also enabled per task by the semp_stats option
+SEMP_STATS_ENV = 'ANSIBLE_SOLACE_SEMP_STATS'
+# calls listed individually in semp_stats: a uniform random sample of this size, the counters include all
+SEMP_STATS_MAX_CALLS = 10000
+# busy intervals kept apart before the older half is folded into busy_seconds
+SEMP_STATS_MAX_INTERVALS = 1000
+
+
+class SempStats(object):
+    """Counters of the SEMP requests of a task, returned as semp_stats in the result.
+
+    Each request attempt is counted: calls and latency per method, bytes of the bodies
+    sent and received (as transferred, i.e. compressed), new connections opened,
+    retries and transport errors.
+    seconds is the sum of the request durations, busy_seconds the wall clock time with at
+    least one request in flight (the union of the request intervals), which is less than
+    seconds for parallel requests. calls is a reservoir sample of SEMP_STATS_MAX_CALLS
+    requests, so its percentiles stay unbiased for tasks with more requests.
+    connection_reuse = requests - errors - connections is an estimate: failed connects count as
+    connections and as errors, a request failing on a reused connection only as an error, and
+    connections of the async transport are not counted.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # url of the broker, None with the httpapi connection
+        self.broker = None
+        self.methods = dict()
+        self.requests = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.connections = 0
+        self.retries = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.calls = []
+        # disjoint (start, end) intervals with requests in flight, ordered by start,
+        # and the time of the intervals folded into busy_seconds
+        self._busy = []
+        self.busy_seconds = 0.0
+        self.started = None
+        self.finished = None
+
+    def add(self, method, path, resp, seconds, error=None):
+        end = time.time()
+        received = 0
+        if resp is not None:
+            received = int(resp.headers.get('Content-Length') or len(resp.content or b''))
+        call = dict(method=method, resource=_endpoint_class(method, path)[len(method) + 1:],
+                    status=resp.status_code if resp is not None else None, seconds=round(seconds, 4))
+        with self._lock:
+            counters = self.methods.setdefault(method, dict(calls=0, seconds=0.0))
+            counters['calls'] += 1
+            counters['seconds'] += seconds
+            self.requests += 1
+            self.bytes_received += received
+            self.seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            if error is not None:
+                self.errors += 1
+            if len(self.calls) < SEMP_STATS_MAX_CALLS:
+                self.calls.append(call)
+            else:
+                # reservoir sampling: each request is listed with the same probability
+                i = random.randrange(self.requests)
+                if i < SEMP_STATS_MAX_CALLS:
+                    self.calls[i] = call
+            self._add_busy(end - seconds, end)
+
+    def _add_busy(self, start, end):
+        """Merge the interval of a request into the busy intervals, called with the lock held"""
+        self.started = start if self.started is None else min(self.started, start)
+        self.finished = end if self.finished is None else max(self.finished, end)
+        busy = self._busy
+        # requests are added when they end, so the overlapping intervals are at the tail
+        i = len(busy)
+        while i > 0 and busy[i - 1][1] >= start:
+            i -= 1
+        j = i
+        while j < len(busy) and busy[j][0] <= end:
+            start, end = min(start, busy[j][0]), max(end, busy[j][1])
+            j += 1
+        busy[i:j] = [(start, end)]
+        if len(busy) > SEMP_STATS_MAX_INTERVALS:
+            # requests running that far back are not expected any more
+            half = len(busy) // 2
+            self.busy_seconds += sum(e - s for s, e in busy[:half])
+            del busy[:half]
+
+    def add_sent(self, size):
+        with self._lock:
+            self.bytes_sent += size
+
+    def add_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def add_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def result(self):
+        with self._lock:
+            return dict(
+                broker=self.broker,
+                requests=self.requests,
+                methods=dict((m, dict(calls=c['calls'], seconds=round(c['seconds'], 4))) for m, c in self.methods.items()),
+                bytes_sent=self.bytes_sent,
+                bytes_received=self.bytes_received,
+                connections=self.connections,
+                # estimate, see the class docstring
+                connection_reuse=max(0, self.requests - self.errors - self.connections),
+                retries=self.retries,
+                errors=self.errors,
+                seconds=round(self.seconds, 4),
+                busy_seconds=round(self.busy_seconds + sum(e - s for s, e in self._busy), 4),
+                started=self.started,
+                finished=self.finished,
+                max_seconds=round(self.max_seconds, 4),
+                calls=list(self.calls)
+            )
+
+
+# record the SEMP requests and responses to a cassette file, e.g. ANSIBLE_SOLACE_CASSETTE=/tmp/broker.jsonl,
+# and serve them back instead of a broker with ANSIBLE_SOLACE_CASSETTE_MODE=replay
+CASSETTE_ENV = 'ANSIBLE_SOLACE_CASSETTE'
+CASSETTE_MODE_ENV = 'ANSIBLE_SOLACE_CASSETTE_MODE'
+# factor applied to the recorded latency on replay, 0 to replay without delay
+CASSETTE_LATENCY_ENV = 'ANSIBLE_SOLACE_CASSETTE_LATENCY'
+# broker addresses in response bodies, e.g. in links and nextPageUri
+_BROKER_URL_PATTERN = re.compile(r'https?://[^/"\s]+(?=/SEMP/)')
+
+
+class CassetteError(Exception):
+    """Raised on replay for a request without recorded response."""
+    pass
+
+
+class Cassette(object):
+    """Cassette file of recorded SEMP requests, one json object per line.
+
+    record: appends each request sent (each attempt, including retries) with its
+    response or error and duration. Credentials are redacted and broker urls in the
+    responses made relative.
+    replay: serves the recorded responses instead of sending requests, after the recorded
+    duration times latency_scale. Requests are matched by method, path and body, in recorded
+    order, then by method and path. Once all responses of a request are served, the last
+    one is served again.
+    """
+
+    def __init__(self, path, mode='record', latency_scale=1.0):
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._file = None
+        # (method, path, body) and (method, path) -> deque of recorded interactions
+        self._responses = dict()
+        if mode == 'replay':
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        self._add(json.loads(line))
+
+    @property
+    def replaying(self):
+        return self.mode == 'replay'
+
+    @staticmethod
+    def _body_key(data):
+        return json.dumps(redact(data), sort_keys=True) if data is not None else None
+
+    def _add(self, interaction):
+        body = self._body_key(interaction.get('request'))
+        for key in [(interaction['method'], interaction['path'], body), (interaction['method'], interaction['path'])]:
+            self._responses.setdefault(key, collections.deque()).append(interaction)
+
+    def record(self, method, path, data, resp, seconds, error=None):
+        interaction = dict(method=method, path=path, seconds=round(seconds, 6))
+        if data is not None:
+            interaction['request'] = redact(data)
+        if resp is not None:
+            interaction['status'] = resp.status_code
+            try:
+                interaction['response'] = json.loads(_BROKER_URL_PATTERN.sub('', json.dumps(redact(json_loads(resp.content)))))
+            except ValueError:
+                interaction['text'] = resp.text
+            if resp.headers.get('Retry-After'):
+                interaction['retry_after'] = resp.headers['Retry-After']
+        if error is not None:
+            interaction['error'] = type(error).__name__
+            interaction['error_message'] = str(error)
+            if HAS_REQUESTS and isinstance(error, requests.exceptions.RequestException) and _is_connect_error(error):
+                interaction['connect_error'] = True
+        line = json.dumps(interaction, sort_keys=True) + '\n'
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a')
+            self._file.write(line)
+            self._file.flush()
+
+    def _next(self, key):
+        with self._lock:
+            responses = self._responses.get(key)
+            if not responses:
+                return None
+            return responses.popleft() if len(responses) > 1 else responses[0]
+
+    def replay(self, method, path, data):
+        """Recorded response of the request as _HttpApiResponse, raises the recorded exception or CassetteError"""
+        interaction = self._next((method, path, self._body_key(data))) or self._next((method, path))
+        if interaction is None:
+            raise CassetteError('no recorded response for {} {} in {}'.format(method, path, self.path))
+        if self.latency_scale:
+            time.sleep(interaction['seconds'] * self.latency_scale)
+        if 'error' in interaction:
+            error = getattr(requests.exceptions, interaction['error'], None) if HAS_REQUESTS else None
+            if error is None or not issubclass(error, requests.exceptions.RequestException):
+                raise CassetteError('{}: {}'.format(interaction['error'], interaction['error_message']))
+            error = error(interaction['error_message'])
+            # retried like the recorded error, see _is_connect_error()
+            error.connect_error = interaction.get('connect_error', False)
+            raise error
+        text = interaction['text'] if 'text' in interaction else json.dumps(interaction.get('response', {}))
+        resp = _HttpApiResponse(interaction['status'], text)
+        if 'retry_after' in interaction:
+            resp.headers['Retry-After'] = interaction['retry_after']
+        return resp
+
+
+_CASSETTES = dict()
+_CASSETTES_LOCK = threading.Lock()
+
+
+def get_cassette():
+    """Return the Cassette configured by the environment, None if not enabled."""
+    path = os.environ.get(CASSETTE_ENV)
+    if not path:
+        return None
+    mode = os.environ.get(CASSETTE_MODE_ENV) or 'record'
+    if mode not in ('record', 'replay'):
+        raise ValueError('{} must be record or replay, not {}'.format(CASSETTE_MODE_ENV, mode))
+    key = (os.path.expanduser(path), mode, float(os.environ.get(CASSETTE_LATENCY_ENV) or 1.0))
+    with _CASSETTES_LOCK:
+        cassette = _CASSETTES.get(key)
+        if cassette is None:
+            cassette = Cassette(*key)
+            _CASSETTES[key] = cassette
+    return cassette
+
+################################################################################################
+# transport
+DEFAULT_POOL_SIZE = 10
+# objects per page when reading collections, max. allowed by SEMP v2
+DEFAULT_PAGE_COUNT = 100
+# configuration items that are not returned by GET
+WHITELIST = ['password']
+# retries of a failed request, first backoff (seconds), doubled on each retry with full jitter
+DEFAULT_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 0.5
+MAX_RETRY_BACKOFF = 30.0
+# http status codes of a busy / restarting management plane
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+# methods that are safe to resend after a read timeout, the broker may have applied the request
+IDEMPOTENT_METHODS = ['GET', 'PATCH']
+# consecutive connection failures opening the circuit of a broker, seconds until a probe request is let through
+DEFAULT_CIRCUIT_BREAKER_THRESHOLD = 5
+DEFAULT_CIRCUIT_BREAKER_TIMEOUT = 30.0
+DEFAULT_CIRCUIT_BREAKER_FILE = '~/.ansible/tmp/solace_circuit_breaker.json'
+# max. time to establish a connection, a dead broker is detected after this rather than the read timeout
+DEFAULT_CONNECT_TIMEOUT = 3.0
+# adaptive read timeout: percentile of the observed durations per endpoint class * factor + margin, within min / max
+DEFAULT_LATENCY_FILE = '~/.ansible/tmp/solace_latency.json'
+ADAPTIVE_TIMEOUT_PERCENTILE = 0.99
+ADAPTIVE_TIMEOUT_FACTOR = 2.0
+ADAPTIVE_TIMEOUT_MARGIN = 1.0
+ADAPTIVE_TIMEOUT_MIN = 1.0
+ADAPTIVE_TIMEOUT_MAX = 120.0
+# samples required before the adaptive timeout is used, samples kept per endpoint class
+ADAPTIVE_TIMEOUT_MIN_SAMPLES = 20
+ADAPTIVE_TIMEOUT_MAX_SAMPLES = 200
+# session cookies are reused for this many seconds, oauth tokens are refreshed this many seconds before they expire
+SESSION_COOKIE_TTL = 900
+OAUTH_TOKEN_EXPIRY_MARGIN = 30
+
+
+def transport_arg_spec():
+    """Common module arguments controlling the http transport to the broker."""
+    return dict(
+        pool_size=dict(type='int', default=DEFAULT_POOL_SIZE),
+        keep_alive=dict(type='bool', default=True),
+        retries=dict(type='int', default=DEFAULT_RETRIES),
+        retry_backoff=dict(type='float', default=DEFAULT_RETRY_BACKOFF),
+        deadline=dict(type='float', default=0),
+        circuit_breaker_threshold=dict(type='int', default=DEFAULT_CIRCUIT_BREAKER_THRESHOLD),
+        circuit_breaker_timeout=dict(type='float', default=DEFAULT_CIRCUIT_BREAKER_TIMEOUT),
+        circuit_breaker_file=dict(type='path', default=DEFAULT_CIRCUIT_BREAKER_FILE),
+        connect_timeout=dict(type='float', required=False),
+        adaptive_timeout=dict(type='bool', default=False),
+        adaptive_timeout_file=dict(type='path', default=DEFAULT_LATENCY_FILE),
+        credentials_file=dict(type='path', required=False),
+        auth_type=dict(type='str', default='basic', choices=['basic', 'session', 'oauth']),
+        bearer_token=dict(type='str', required=False, no_log=True),
+        oauth=dict(type='dict', required=False, no_log=True, options=dict(
+            token_url=dict(type='str', required=True),
+            client_id=dict(type='str', required=True),
+            client_secret=dict(type='str', required=True, no_log=True),
+            scope=dict(type='str', required=False)
+        )),
+        compression=dict(type='bool', default=True),
+        semp_stats=dict(type='bool', default=False)
+    )
+
+
+def bulk_arg_spec():
+    """Common module arguments of the bulk (SolaceBulkTask) modules."""
+    return dict(
+        workers=dict(type='int', default=1),
+        async_transport=dict(type='bool', default=False)
+    )
 
 
 class SolaceConfig(object):
@@ -82,37 +541,155 @@ class SolaceConfig(object):
                  vmr_auth,
                  vmr_secure=False,
                  vmr_timeout=1,
-                 x_broker=''):
+                 x_broker='',
+                 pool_size=DEFAULT_POOL_SIZE,
+                 keep_alive=True,
+                 connection=None,
+                 retries=DEFAULT_RETRIES,
+                 retry_backoff=DEFAULT_RETRY_BACKOFF,
+                 deadline=0,
+                 circuit_breaker=None,
+                 vmr_connect_timeout=None,
+                 latency_stats=None,
+                 auth_type='basic',
+                 bearer_token=None,
+                 oauth=None,
+                 credentials=None,
+                 compression=True,
+                 semp_log=None,
+                 cassette=None,
+                 semp_stats=None):
         self.vmr_auth = vmr_auth
+        # read timeout
         self.vmr_timeout = float(vmr_timeout)
+        self.vmr_connect_timeout = float(vmr_connect_timeout) if vmr_connect_timeout else min(DEFAULT_CONNECT_TIMEOUT, self.vmr_timeout)
 
         self.vmr_url = ('https' if vmr_secure else 'http') + '://' + vmr_host + ':' + str(vmr_port)
         self.x_broker = x_broker
+        self.pool_size = int(pool_size)
+        self.keep_alive = keep_alive
+        # persistent httpapi connection (ansible_network_os=solace), if configured
+        self.connection = connection
+        self.retries = max(0, int(retries))
+        self.retry_backoff = float(retry_backoff)
+        # time budget of all requests of the task, no more retries once it is used up
+        self.deadline = time.time() + float(deadline) if deadline else None
+        # shared CircuitBreaker, None to disable
+        self.circuit_breaker = circuit_breaker
+        # shared LatencyStats for adaptive read timeouts, None to use vmr_timeout
+        self.latency_stats = latency_stats
+        # basic: vmr_auth on every request, session: broker session cookie, oauth: bearer_token or token from oauth
+        # (token_url, client_id, client_secret, scope)
+        self.auth_type = auth_type
+        self.bearer_token = bearer_token
+        self.oauth = oauth
+        # _StateFile caching session cookies / oauth tokens across tasks, None to keep them in memory
+        self.credentials = credentials
+        # accept gzip / deflate compressed responses
+        self.compression = compression
+        # SempLog of the task's requests, None if not enabled
+        self.semp_log = semp_log
+        # Cassette recording or replaying the task's requests, None if not enabled
+        self.cassette = cassette
+        # SempStats of the task's requests, None if not enabled
+        self.semp_stats = semp_stats
+        # attributes requested by get_configuration(), None for the full object
+        self.select = None
+        # tls handshakes made for this config's requests, see TLSSessionContext
+        self.tls_stats = dict(handshakes=0, resumed=0, seconds=0.0)
+        # send requests with the asyncio transport of solace_async, see SolaceBulkTask
+        self.async_transport = False
+
+    def is_tls(self):
+        """True if requests are sent by the module over https, rather than through the httpapi connection"""
+        return self.connection is None and self.vmr_url.startswith('https')
 
 
 class SolaceTask:
 
     def __init__(self, module):
         self.module = module
+        self.verbosity = getattr(module, '_verbosity', 0)
+        semp_log = None
+        if self.verbosity >= SEMP_LOG_VERBOSITY or os.environ.get(SEMP_LOG_ENV):
+            semp_log = SempLog()
+        semp_stats = None
+        if self.module.params.get('semp_stats') or os.environ.get(SEMP_STATS_ENV):
+            semp_stats = SempStats()
+        if semp_log is not None or semp_stats is not None:
+            self._add_semp_info_on_failure(semp_log, semp_stats)
+        if self.module.params.get('auth_type') == 'oauth' and \
+                not (self.module.params.get('bearer_token') or self.module.params.get('oauth')):
+            self.module.fail_json(msg="auth_type 'oauth' requires 'bearer_token' or 'oauth' (token_url, client_id, client_secret)")
+        # with connection: httpapi the broker details come from the connection plugin
+        socket_path = getattr(module, '_socket_path', None)
         self.solace_config = SolaceConfig(
             vmr_host=self.module.params['host'],
             vmr_port=self.module.params['port'],
             vmr_auth=(self.module.params['username'], self.module.params['password']),
             vmr_secure=self.module.params['secure_connection'],
             vmr_timeout=self.module.params['timeout'],
-            x_broker=self.module.params.get('x_broker', '')
+            x_broker=self.module.params.get('x_broker', ''),
+            pool_size=self.module.params.get('pool_size', DEFAULT_POOL_SIZE),
+            keep_alive=self.module.params.get('keep_alive', True),
+            connection=Connection(socket_path) if socket_path else None,
+            retries=self.module.params.get('retries', DEFAULT_RETRIES),
+            retry_backoff=self.module.params.get('retry_backoff', DEFAULT_RETRY_BACKOFF),
+            deadline=self.module.params.get('deadline', 0),
+            circuit_breaker=get_circuit_breaker(
+                self.module.params.get('circuit_breaker_file') or DEFAULT_CIRCUIT_BREAKER_FILE,
+                self.module.params.get('circuit_breaker_threshold', DEFAULT_CIRCUIT_BREAKER_THRESHOLD),
+                self.module.params.get('circuit_breaker_timeout', DEFAULT_CIRCUIT_BREAKER_TIMEOUT)
+            ),
+            vmr_connect_timeout=self.module.params.get('connect_timeout'),
+            latency_stats=get_latency_stats(
+                self.module.params.get('adaptive_timeout_file') or DEFAULT_LATENCY_FILE
+            ) if self.module.params.get('adaptive_timeout') else None,
+            auth_type=self.module.params.get('auth_type') or 'basic',
+            bearer_token=self.module.params.get('bearer_token'),
+            oauth=self.module.params.get('oauth'),
+            credentials=get_credentials(self.module.params.get('credentials_file')),
+            compression=self.module.params.get('compression', True),
+            semp_log=semp_log,
+            cassette=get_cassette(),
+            semp_stats=semp_stats
         )
+        if semp_stats is not None and self.solace_config.connection is None:
+            semp_stats.broker = self.solace_config.vmr_url
         return
 
+    def _add_semp_info_on_failure(self, semp_log, semp_stats):
+        """Make module.fail_json() return the requests of semp_log and the semp_stats in the result"""
+        fail_json = self.module.fail_json
+
+        def fail_json_with_semp_info(msg, **kwargs):
+            if semp_log is not None:
+                kwargs['semp_log'] = semp_log.records()
+            if semp_stats is not None:
+                kwargs['semp_stats'] = semp_stats.result()
+            fail_json(msg=msg, **kwargs)
+        self.module.fail_json = fail_json_with_semp_info
+
+    def add_semp_info(self, result):
+        """Add the semp_stats and, at -vvv, the requests of the task to the result of a successful task"""
+        if self.solace_config.semp_log is not None and self.verbosity >= SEMP_LOG_VERBOSITY:
+            result['semp_log'] = self.solace_config.semp_log.records()
+        if self.solace_config.semp_stats is not None:
+            result['semp_stats'] = self.solace_config.semp_stats.result()
+        return result
+
     def do_task(self):
 
-        if not HAS_REQUESTS:
+        if not HAS_REQUESTS and self.solace_config.connection is None:
             self.module.fail_json(msg='Missing requests module', exception=REQUESTS_IMP_ERR)
 
         result = dict(
             changed=False,
             response=dict()
         )
+        if self.solace_config.is_tls():
+            # updated in place as connections are made
+            result['tls_handshakes'] = self.solace_config.tls_stats
 
         crud_args = self.crud_args()
 
@@ -122,14 +699,17 @@ class SolaceTask:
             # jinja treats everything as a string, so cast ints and floats
             settings = _type_conversion(settings)
 
-        ok, resp = self.get_func(self.solace_config, *(self.get_args() + [self.lookup_item()]))
+        # only fetch the attributes needed for change detection
+        self.solace_config.select = self._change_detection_select(settings)
+        try:
+            ok, resp = self.get_func(self.solace_config, *(self.get_args() + [self.lookup_item()]))
+        finally:
+            self.solace_config.select = None
 
         if not ok:
             self.module.fail_json(msg=resp, **result)
         # else response was good
         current_configuration = resp
-        # whitelist of configuration items that are not returned by GET
-        whitelist = ['password']
 
         if self.lookup_item() in current_configuration:
             if self.module.params['state'] == 'absent':
@@ -142,22 +722,11 @@ class SolaceTask:
                 if settings and len(settings.keys()):
                     # compare new settings against configuration
                     current_settings = current_configuration[self.lookup_item()]
-                    bad_keys = [key for key in settings if key not in current_settings.keys()]
-                    # remove whitelist items from bad_keys
-                    bad_keys = [item for item in bad_keys if item not in whitelist]
-                    # removed keys
-                    removed_keys = [item for item in settings if item in whitelist]
+                    bad_keys, delta_settings = get_delta(settings, current_settings)
                     # fail if any unexpected settings found
                     if len(bad_keys):
                         self.module.fail_json(msg='Invalid key(s): ' + ', '.join(bad_keys), **result)
-                    # changed keys are those that exist in settings and don't match current settings
-                    changed_keys = [x for x in settings if x in current_settings.keys()
-                                    and settings[x] != current_settings[x]]
-                    # add back in anything from the whitelist
-                    changed_keys = changed_keys + removed_keys
-                    # add any whitelisted items
-                    if len(changed_keys):
-                        delta_settings = {key: settings[key] for key in changed_keys}
+                    if len(delta_settings):
                         crud_args.append(delta_settings)
                         if not self.module.check_mode:
                             ok, resp = self.update_func(self.solace_config, *crud_args)
@@ -180,7 +749,18 @@ class SolaceTask:
                         self.module.fail_json(msg=resp, **result)
                 result['changed'] = True
 
-        return result
+        return self.add_semp_info(result)
+
+    def _change_detection_select(self, settings):
+        key = getattr(self, 'LOOKUP_ITEM_KEY', None)
+        if not key:
+            return None
+        if self.module.params['state'] == 'absent':
+            return [key]
+        if settings:
+            return [key] + [k for k in settings if k != key]
+        # no settings: the full object is returned as response
+        return None
 
     def get_func(self, solace_config, *args):
         return
@@ -204,7 +784,175 @@ class SolaceTask:
         return self.get_args() + [self.lookup_item()]
 
 
+class SolaceBulkTask(SolaceTask):
+    """Base class for modules reconciling many objects of a collection in one invocation.
+
+    The existing objects are read with one paged collection GET, compared locally
+    with the same rules as SolaceTask.do_task() and only the required
+    POST/PATCH/DELETE calls are made, up to 'workers' of them in parallel.
+    """
+
+    def __init__(self, module):
+        SolaceTask.__init__(self, module)
+        if not HAS_REQUESTS and self.solace_config.connection is None:
+            self.module.fail_json(msg='Missing requests module', exception=REQUESTS_IMP_ERR)
+        self.workers = max(1, self.module.params.get('workers') or 1)
+        # one pooled connection per worker
+        self.solace_config.pool_size = max(self.solace_config.pool_size, self.workers)
+        # the workers' requests are multiplexed by the shared event loop, falls back to requests if not supported
+        self.solace_config.async_transport = bool(self.module.params.get('async_transport')) and \
+            solace_async is not None and solace_async.is_supported(self.solace_config)
+        self.result = dict(changed=False)
+        if self.solace_config.is_tls():
+            self.result['tls_handshakes'] = self.solace_config.tls_stats
+        # keys of all objects that could not be reconciled
+        self.failed = []
+
+    def read_collection(self, path_array, key, select=None):
+        """Read a collection into a CollectionIndex: key -> selected attributes, fails the module on error.
+
+        key is the key attribute, or a list of attributes for composite keys (see object_key()).
+        """
+        ok, resp = read_index(self.solace_config, path_array, key, select)
+        if not ok:
+            self.module.fail_json(msg=resp, **self.result)
+        return resp
+
+    def desired_from_items(self, items, common=None):
+        """Turn a list of items with 'name', 'settings' and 'state' into the desired dict used by plan().
+
+        common settings are applied to every item, the item's own settings take precedence.
+        """
+        desired = dict()
+        for item in items:
+            if item.get('state', 'present') == 'absent':
+                desired[item['name']] = False
+            else:
+                # jinja treats everything as a string, so cast ints and floats
+                desired[item['name']] = _type_conversion(merge_dicts(common, item.get('settings')))
+        return desired
+
+    def plan(self, desired, current, prune=False, keep=None):
+        """Compute the changes required to turn current into desired.
+
+        desired: dict key -> settings (dict or None) for state: present, False for state: absent
+        current: CollectionIndex or dict key -> current object, as returned by read_collection()
+        prune: delete objects in current that are not in desired, unless keep(key) is True
+        Returns a list of (op, key, data) with op one of create/update/delete and
+        a dict key -> error for objects with invalid settings.
+        """
+        ops = []
+        errors = dict()
+        for key, settings in desired.items():
+            if settings is False:
+                if key in current:
+                    ops.append(('delete', key, None))
+            elif key not in current:
+                ops.append(('create', key, settings))
+            elif settings:
+                if isinstance(current, CollectionIndex):
+                    bad_keys, delta = current.delta(key, settings)
+                else:
+                    bad_keys, delta = get_delta(settings, current[key])
+                if len(bad_keys):
+                    errors[key] = 'Invalid key(s): ' + ', '.join(bad_keys)
+                elif len(delta):
+                    ops.append(('update', key, delta))
+        if prune:
+            for key in current:
+                if key not in desired and not (keep and keep(key)):
+                    ops.append(('delete', key, None))
+        return ops, errors
+
+    def apply(self, ops, create_func, update_func, delete_func, result, errors=None):
+        """Execute the planned ops, recording them in result[created|updated|deleted|errors].
+
+        create_func(key, settings), update_func(key, delta) and delete_func(key) return ok, resp.
+        A failing op is recorded in result['errors'] and does not stop the others,
+        errors already found by plan() are added to result['errors'] as well.
+        The task is changed if at least one op succeeded.
+        """
+        result.setdefault('created', [])
+        result.setdefault('updated', dict())
+        result.setdefault('deleted', [])
+        result.setdefault('errors', dict())
+        for key, error in (errors or dict()).items():
+            self.add_error(result, key, error)
+        if not ops:
+            return result
+        if self.module.check_mode:
+            responses = [(True, None)] * len(ops)
+        else:
+            funcs = dict(create=create_func, update=update_func, delete=delete_func)
+            responses = run_parallel(lambda op, key, data: _apply_op(funcs, op, key, data), ops, self.workers)
+        for (op, key, data), (ok, resp) in zip(ops, responses):
+            if not ok:
+                self.add_error(result, key, resp)
+                continue
+            # changed only by the ops that succeeded
+            self.result['changed'] = True
+            if op == 'update':
+                # do not return write-only settings, e.g. passwords
+                result['updated'][key] = dict((k, '********' if k in WHITELIST else v) for k, v in data.items())
+            else:
+                result[op + 'd'].append(key)
+        return result
+
+    def add_error(self, result, key, error):
+        result.setdefault('errors', dict())[key] = error
+        self.failed.append(str(key))
+
+    def finish(self):
+        """Fail the module if any object failed, returns the result otherwise."""
+        if self.failed:
+            self.module.fail_json(msg='{} object(s) failed: {}'.format(len(self.failed), ', '.join(self.failed)), **self.result)
+        return self.add_semp_info(self.result)
+
+
+def run_parallel(func, args_list, workers=1):
+    """Call func(*args) for each args in args_list using up to workers threads, returns the results in order."""
+    if workers <= 1 or len(args_list) <= 1:
+        return [func(*args) for args in args_list]
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        return list(executor.map(lambda args: func(*args), args_list))
+    finally:
+        executor.shutdown(wait=True)
+
+
+def _apply_op(funcs, op, key, data):
+    # report unexpected exceptions (e.g. read timeouts) as a failed op
+    try:
+        if op == 'delete':
+            return funcs[op](key)
+        return funcs[op](key, data)
+    except Exception as e:
+        return False, str(e)
+
+
+def object_key(obj, key):
+    """The value of attribute key of obj, for a list of attributes the values joined by ',' as used in the object's URI."""
+    if isinstance(key, (list, tuple)):
+        return ','.join(obj[k] for k in key)
+    return obj[key]
+
+
 # internal helper functions
+def get_delta(settings, current_settings):
+    """Compare settings against the current settings of an object.
+
+    Returns the keys not known to the broker and the dict of settings to change.
+    """
+    # bad keys are unknown to the broker, except whitelisted ones
+    bad_keys = [key for key in settings if key not in current_settings.keys() and key not in WHITELIST]
+    # changed keys are those that exist in settings and don't match current settings
+    changed_keys = [x for x in settings if x in current_settings.keys()
+                    and settings[x] != current_settings[x]]
+    # add back in anything from the whitelist
+    changed_keys = changed_keys + [item for item in settings if item in WHITELIST]
+    return bad_keys, {key: settings[key] for key in changed_keys}
+
+
 def merge_dicts(*argv):
     data = dict()
     for arg in argv:
@@ -235,23 +983,685 @@ def _type_conversion(d):
     return d
 
 
+def is_not_found(resp):
+    """Check if a bad response is the broker's 'not found': responseCode=400 and error.code=6"""
+    return (type(resp) is dict
+            and resp['responseCode'] == 400
+            and 'error' in resp.keys()
+            and 'code' in resp['error'].keys()
+            and resp['error']['code'] == 6)
+
+
 # response contains 1 dict if lookup_item/key is found
 # if lookup_item is not found, response http-code: 400 with extra info in meta.error
 def get_configuration(solace_config, path_array, key):
-    ok, resp = make_get_request(solace_config, path_array)
+    params = None
+    if solace_config.select:
+        params = dict(select=','.join(solace_config.select))
+    ok, resp = _make_request('GET', solace_config, path_array, params=params)
     if ok:
         return True, _build_config_dict(resp, key)
     else:
-        # check if responseCode=400 and error.code=6 ==> not found
-        if (type(resp) is dict
-                and resp['responseCode'] == 400
-                and 'error' in resp.keys()
-                and 'code' in resp['error'].keys()
-                and resp['error']['code'] == 6):
+        if is_not_found(resp):
             return True, dict()
     return False, resp
 
 
+def get_semp_version(solace_config):
+    """Retrieve the SEMP API version of the broker, returns ok, version as tuple of ints, e.g. (2, 14) / error."""
+    # GET /about/api
+    ok, resp = make_get_request(solace_config, [SEMP_V2_CONFIG, ABOUT, ABOUT_API])
+    if not ok:
+        return False, resp
+    return True, tuple(int(v) for v in resp['sempVersion'].split('.'))
+
+
+class SempRequestError(Exception):
+    """Raised by iter_collection() if a page can not be retrieved, resp holds the error."""
+
+    def __init__(self, resp):
+        Exception.__init__(self, str(resp))
+        self.resp = resp
+
+
+def iter_collection(solace_config, path_array, count=DEFAULT_PAGE_COUNT, select=None, where=None):
+    """Generator yielding the objects of a SEMP v2 collection, e.g. /msgVpns/{vpn}/queues.
+
+    Pages are requested lazily following meta.paging.nextPageUri, so only one page
+    is held in memory at a time. select and where are lists (or comma separated strings)
+    of attribute names and filter expressions as per SEMP v2.
+    Raises SempRequestError if a page can not be retrieved.
+    """
+    path = _build_path(path_array, _collection_params(count, select, where))
+    while path:
+        ok, resp = _make_page_request(solace_config, path)
+        if not ok:
+            raise SempRequestError(resp)
+        data, path = resp
+        for obj in data:
+            yield obj
+
+
+def _collection_params(count, select, where):
+    params = dict(count=count)
+    if select:
+        params['select'] = select if isinstance(select, str) else ','.join(select)
+    if where:
+        params['where'] = where if isinstance(where, str) else ','.join(where)
+    return params
+
+
+def get_collection(solace_config, path_array, count=DEFAULT_PAGE_COUNT, select=None, where=None):
+    """Read all objects of a collection, returns ok, list of objects / error."""
+    try:
+        return True, list(iter_collection(solace_config, path_array, count, select, where))
+    except SempRequestError as e:
+        return False, e.resp
+
+
+class CollectionIndex(object):
+    """Compact index of a collection: object key -> the object's selected attributes.
+
+    Used instead of a dict of the full objects to diff collections of 100k objects.
+    Each object is reduced to a record of a __slots__ class with one slot per selected
+    attribute (other than the key), keys and string values are interned, so equal values
+    (e.g. 'exclusive') are stored once. An attribute the broker did not return is an empty slot.
+    Behaves like a read-only dict: `in`, len(), iteration and keys() over the keys,
+    index[key] and get() return the record's attributes as a new dict.
+    """
+
+    def __init__(self, key, fields=None):
+        self.key = key
+        key_fields = key if isinstance(key, (list, tuple)) else [key]
+        if isinstance(fields, str):
+            fields = fields.split(',')
+        # None: keep all attributes, as a dict per object
+        # broker attributes are identifiers; other names, e.g. a misspelled 'max-spool' setting, can not be
+        # slots and are reported as invalid keys by delta()
+        self.fields = None if fields is None else \
+            tuple(sorted(f for f in set(fields) - set(key_fields) if f.isidentifier() and not f.startswith('__')))
+        self._record_type = None if fields is None else type('IndexRecord', (object,), dict(__slots__=self.fields))
+        self._records = dict()
+
+    def add(self, obj):
+        record = self._record_type() if self._record_type is not None else dict()
+        for name, value in obj.items():
+            if self._record_type is None:
+                record[name] = _intern(value)
+            elif name in self._record_type.__slots__:
+                setattr(record, name, _intern(value))
+        self._records[sys.intern(object_key(obj, self.key))] = record
+
+    def __contains__(self, key):
+        return key in self._records
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def keys(self):
+        """Set-like view of the keys, e.g. for desired - index.keys()"""
+        return self._records.keys()
+
+    def __getitem__(self, key):
+        record = self._records[key]
+        if self._record_type is None:
+            return dict(record)
+        return dict((name, getattr(record, name)) for name in self.fields if hasattr(record, name))
+
+    def get(self, key, default=None):
+        return self[key] if key in self._records else default
+
+    def delta(self, key, settings):
+        """get_delta(settings, self[key]) without building the dict"""
+        record = self._records[key]
+        if self._record_type is None:
+            return get_delta(settings, record)
+        bad_keys = []
+        delta = dict()
+        for name, value in settings.items():
+            if name in WHITELIST:
+                delta[name] = value
+            elif name not in self._record_type.__slots__ or not hasattr(record, name):
+                bad_keys.append(name)
+            elif getattr(record, name) != value:
+                delta[name] = value
+        return bad_keys, delta
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+def read_index(solace_config, path_array, key, select=None):
+    """Read a collection page by page into a CollectionIndex of the select attributes, returns ok, index / error.
+
+    Each page is projected into the index as it arrives, so only the index and one page are held in memory.
+    """
+    index = CollectionIndex(key, select)
+    try:
+        for obj in iter_collection(solace_config, path_array, select=select):
+            index.add(obj)
+    except SempRequestError as e:
+        return False, e.resp
+    return True, index
+
+
+# response encodings decoded by requests and httpx without extra packages
+ACCEPT_ENCODING = 'gzip, deflate'
+
+# http sessions, one connection pool per broker url & credentials
+_SESSIONS = dict()
+_SESSIONS_LOCK = threading.Lock()
+
+
+def get_session(solace_config):
+    """Return the pooled keep-alive session for the broker, creating it on first use."""
+    oauth = tuple(sorted(solace_config.oauth.items())) if solace_config.oauth else None
+    key = (solace_config.vmr_url, solace_config.vmr_auth, solace_config.pool_size, solace_config.keep_alive,
+           solace_config.auth_type, solace_config.bearer_token, oauth, solace_config.compression,
+           solace_config.credentials.path if solace_config.credentials else None)
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = _CountingAdapter(pool_connections=1, pool_maxsize=solace_config.pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', _TLSAdapter(TLSSessionContext(), pool_connections=1, pool_maxsize=solace_config.pool_size))
+            if solace_config.auth_type == 'basic':
+                session.auth = solace_config.vmr_auth
+            else:
+                session.auth = SempAuth(solace_config, session)
+            if not solace_config.keep_alive:
+                session.headers['Connection'] = 'close'
+            session.headers['Accept-Encoding'] = ACCEPT_ENCODING if solace_config.compression else 'identity'
+            _SESSIONS[key] = session
+    return session
+
+
+def close_sessions():
+    """Close all pooled sessions and their connections."""
+    with _SESSIONS_LOCK:
+        for session in _SESSIONS.values():
+            session.close()
+        _SESSIONS.clear()
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a broker whose circuit is open."""
+    pass
+
+
+class _StateFile(object):
+    """Small json file shared by all processes on the host, e.g. the circuit breaker state.
+
+    Problems reading or writing the file are logged and otherwise ignored, the state is then
+    only kept in memory. Without path the state is only kept in memory.
+    """
+
+    def __init__(self, path, mode=0o644):
+        self.path = os.path.expanduser(path) if path else None
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._stat = None
+        self._state = dict()
+
+    def load(self):
+        """Current state, re-read only if the file changed"""
+        with self._lock:
+            if self.path is None:
+                return self._state
+            try:
+                st = os.stat(self.path)
+                stat = (st.st_ino, st.st_mtime, st.st_size)
+                if stat != self._stat:
+                    with open(self.path) as f:
+                        self._state = json.load(f)
+                    self._stat = stat
+            except (IOError, OSError, ValueError):
+                self._stat = None
+                self._state = dict()
+            return self._state
+
+    def update(self, func, *args):
+        """Apply func(state, *args) to the state under an exclusive file lock, returns the result of func"""
+        with self._lock:
+            if self.path is None:
+                return func(self._state, *args)
+            lock_file = None
+            try:
+                directory = os.path.dirname(self.path)
+                if directory and not os.path.isdir(directory):
+                    os.makedirs(directory)
+                lock_file = open(self.path + '.lock', 'a')
+                if HAS_FCNTL:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    with open(self.path) as f:
+                        state = json.load(f)
+                except (IOError, OSError, ValueError):
+                    state = dict()
+                result = func(state, *args)
+                tmp_path = '{}.{}'.format(self.path, os.getpid())
+                with os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, self.mode), 'w') as f:
+                    json.dump(state, f)
+                os.rename(tmp_path, self.path)
+                self._state = state
+                self._stat = None
+                return result
+            except (IOError, OSError) as e:
+                log.warning("state file %s: %s", self.path, e)
+                return func(self._state, *args)
+            finally:
+                if lock_file is not None:
+                    lock_file.close()
+
+
+class CircuitBreaker(object):
+    """Counts consecutive connection failures per broker url.
+
+    A failure is a request whose attempts, including its retries, all failed with a connection
+    error, see _send_with_retry(). The state is kept in a _StateFile, so all forks and tasks on
+    the host share it, also across runs. Once threshold failures are reached the circuit opens
+    and requests fail right away; after timeout seconds one probe request is let through,
+    closing the circuit if it succeeds.
+    """
+
+    def __init__(self, path, threshold, timeout):
+        self.threshold = threshold
+        self.timeout = timeout
+        self._file = _StateFile(path)
+
+    def check(self, url):
+        """Raise CircuitOpenError if the circuit of url is open"""
+        entry = self._file.load().get(url)
+        if not entry or entry['failures'] < self.threshold:
+            return
+        if time.time() - entry['opened'] >= self.timeout and self._file.update(self._probe, url):
+            log.debug("circuit half-open, probing %s", url)
+            return
+        raise CircuitOpenError('circuit breaker open for {} after {} consecutive connection failures, retry in {:.0f}s'.format(
+            url, entry['failures'], max(0.0, self.timeout - (time.time() - entry['opened']))))
+
+    def record(self, url, ok):
+        """Record the outcome of a request to url, ok: the broker was reachable"""
+        if ok:
+            # only touch the file if there are failures to reset
+            if url in self._file.load():
+                self._file.update(lambda state, url: state.pop(url, None), url)
+        else:
+            self._file.update(self._failure, url)
+
+    def _probe(self, state, url):
+        # one caller gets the probe, the others see the re-armed timeout
+        entry = state.get(url)
+        if entry and entry['failures'] >= self.threshold and time.time() - entry['opened'] >= self.timeout:
+            entry['opened'] = time.time()
+            return True
+        return False
+
+    def _failure(self, state, url):
+        entry = state.setdefault(url, dict(failures=0, opened=0))
+        entry['failures'] += 1
+        if entry['failures'] >= self.threshold:
+            entry['opened'] = time.time()
+
+
+_CIRCUIT_BREAKERS = dict()
+_CIRCUIT_BREAKERS_LOCK = threading.Lock()
+
+
+def get_circuit_breaker(path, threshold, timeout):
+    """Return the CircuitBreaker for the state file, None if disabled (threshold 0)."""
+    if not threshold or threshold <= 0:
+        return None
+    key = (path, threshold, timeout)
+    with _CIRCUIT_BREAKERS_LOCK:
+        breaker = _CIRCUIT_BREAKERS.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(path, threshold, timeout)
+            _CIRCUIT_BREAKERS[key] = breaker
+    return breaker
+
+
+class LatencyStats(object):
+    """Request durations per broker url and endpoint class, e.g. 'GET msgVpns/*/queues', for adaptive read timeouts.
+
+    New samples are collected in memory and merged into a _StateFile, keeping the last
+    ADAPTIVE_TIMEOUT_MAX_SAMPLES per endpoint class, every ADAPTIVE_TIMEOUT_MIN_SAMPLES
+    samples and at exit.
+    """
+
+    def __init__(self, path):
+        self._file = _StateFile(path)
+        self._lock = threading.Lock()
+        self._pending = dict()
+        self._count = 0
+        atexit.register(self.flush)
+
+    def read_timeout(self, url, endpoint, default):
+        """p99 of the durations * factor + margin, default if there are not enough samples"""
+        with self._lock:
+            samples = self._file.load().get(url, {}).get(endpoint, []) + self._pending.get((url, endpoint), [])
+        if len(samples) < ADAPTIVE_TIMEOUT_MIN_SAMPLES:
+            return default
+        samples = sorted(samples[-ADAPTIVE_TIMEOUT_MAX_SAMPLES:])
+        p99 = samples[int(ADAPTIVE_TIMEOUT_PERCENTILE * (len(samples) - 1))]
+        return min(ADAPTIVE_TIMEOUT_MAX, max(ADAPTIVE_TIMEOUT_MIN, p99 * ADAPTIVE_TIMEOUT_FACTOR + ADAPTIVE_TIMEOUT_MARGIN))
+
+    def record(self, url, endpoint, seconds):
+        with self._lock:
+            self._pending.setdefault((url, endpoint), []).append(round(seconds, 4))
+            self._count += 1
+            flush = self._count >= ADAPTIVE_TIMEOUT_MIN_SAMPLES
+        if flush:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending, self._count = self._pending, dict(), 0
+        if pending:
+            self._file.update(self._merge, pending)
+
+    @staticmethod
+    def _merge(state, pending):
+        for (url, endpoint), samples in pending.items():
+            merged = state.setdefault(url, dict()).get(endpoint, []) + samples
+            state[url][endpoint] = merged[-ADAPTIVE_TIMEOUT_MAX_SAMPLES:]
+
+
+_LATENCY_STATS = dict()
+_LATENCY_STATS_LOCK = threading.Lock()
+
+
+def get_latency_stats(path):
+    """Return the LatencyStats for the state file."""
+    with _LATENCY_STATS_LOCK:
+        stats = _LATENCY_STATS.get(path)
+        if stats is None:
+            stats = LatencyStats(path)
+            _LATENCY_STATS[path] = stats
+    return stats
+
+
+def _endpoint_class(method, path):
+    """Method and path without object names and query, e.g. GET /SEMP/v2/config/msgVpns/a/queues?count=100 -> GET msgVpns/*/queues"""
+    parts = path.split('?', 1)[0][len(SEMP_V2_CONFIG) + 1:].split('/')
+    return method + ' ' + '/'.join(p if i % 2 == 0 else '*' for i, p in enumerate(parts))
+
+
+class SempAuth(object):
+    """requests auth handler for session cookie and oauth bearer token authentication.
+
+    The credential is obtained once per broker & user and cached in memory, so all requests of
+    the task reuse it. With credentials_file it is cached in that _StateFile instead, readable by
+    the user only (0600), and later tasks and runs reuse it until it expires. A 401 response
+    drops the cached credential and the request is resent once with a new one.
+      session: basic auth until the broker sets a session cookie, the cookie after that
+      oauth: bearer_token, or a token from oauth['token_url'] (client credentials grant)
+    """
+
+    def __init__(self, solace_config, session):
+        self.solace_config = solace_config
+        self.session = session
+        self._lock = threading.Lock()
+        self._token = None
+        self._credentials = solace_config.credentials or get_credentials(None)
+        user = solace_config.vmr_auth[0] if solace_config.auth_type == 'session' else (solace_config.oauth or {}).get('client_id')
+        self._key = hashlib.sha256('{}|{}|{}'.format(solace_config.auth_type, solace_config.vmr_url, user).encode('utf-8')).hexdigest()
+        if solace_config.auth_type == 'session':
+            cached = self._cached()
+            if cached:
+                for cookie in cached['cookies']:
+                    session.cookies.set(cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie['path'])
+
+    def __call__(self, r):
+        if self.solace_config.auth_type == 'oauth':
+            r.headers['Authorization'] = 'Bearer ' + self._get_token()
+        elif 'Cookie' not in r.headers:
+            requests.auth.HTTPBasicAuth(*self.solace_config.vmr_auth)(r)
+        r.register_hook('response', self._handle_response)
+        return r
+
+    def _handle_response(self, resp, **kwargs):
+        if resp.status_code == 401 and not getattr(resp.request, 'semp_auth_retry', False):
+            log.debug("401, renewing %s credential", self.solace_config.auth_type)
+            self._invalidate()
+            resp.content
+            resp.close()
+            prep = resp.request.copy()
+            prep.headers.pop('Cookie', None)
+            prep.headers.pop('Authorization', None)
+            prep.semp_auth_retry = True
+            prep.hooks['response'] = []
+            self(prep)
+            retry = resp.connection.send(prep, **kwargs)
+            retry.history.append(resp)
+            retry.request = prep
+            resp = retry
+        if self.solace_config.auth_type == 'session':
+            # the session adds the response's cookies to its jar after this hook, cache them if they are new
+            cookies = self._cookies(self.session.cookies)
+            new_cookies = self._cookies(resp.cookies)
+            if any(cookies.get(key) != cookie for key, cookie in new_cookies.items()):
+                cookies.update(new_cookies)
+                self._credentials.update(self._store, dict(cookies=list(cookies.values()), expires=time.time() + SESSION_COOKIE_TTL))
+        return resp
+
+    @staticmethod
+    def _cookies(jar):
+        return dict(((c.domain, c.path, c.name), dict(name=c.name, value=c.value, domain=c.domain, path=c.path)) for c in jar)
+
+    def _cached(self):
+        """The cached, not expired, cookies / token entry"""
+        entry = self._credentials.load().get(self._key)
+        if entry and entry['expires'] > time.time():
+            return entry
+        return None
+
+    def _store(self, state, entry):
+        # drop expired entries of other brokers & users while at it
+        for key in [key for key, value in state.items() if value['expires'] <= time.time()]:
+            del state[key]
+        state[self._key] = entry
+
+    def _invalidate(self):
+        with self._lock:
+            self._token = None
+        if self.solace_config.auth_type == 'session':
+            self.session.cookies.clear()
+        self._credentials.update(lambda state, key: state.pop(key, None), self._key)
+
+    def _get_token(self):
+        if self.solace_config.bearer_token:
+            return self.solace_config.bearer_token
+        with self._lock:
+            if self._token is None or self._token[1] <= time.time():
+                cached = self._cached()
+                if cached:
+                    self._token = cached['token'], cached['expires']
+                else:
+                    self._token = self._request_token()
+            return self._token[0]
+
+    def _request_token(self):
+        """Client credentials grant, returns token, expiry"""
+        oauth = self.solace_config.oauth or dict()
+        data = dict(grant_type='client_credentials', client_id=oauth.get('client_id'), client_secret=oauth.get('client_secret'))
+        if oauth.get('scope'):
+            data['scope'] = oauth['scope']
+        resp = requests.post(oauth['token_url'], data=data, timeout=self.solace_config.vmr_timeout)
+        resp.raise_for_status()
+        try:
+            j = resp.json()
+            token = j['access_token']
+        except (ValueError, KeyError, TypeError):
+            raise requests.exceptions.RequestException('no access_token in the response of {}'.format(oauth['token_url']))
+        expires = time.time() + float(j.get('expires_in', SESSION_COOKIE_TTL)) - OAUTH_TOKEN_EXPIRY_MARGIN
+        self._credentials.update(self._store, dict(token=token, expires=expires))
+        return token, expires
+
+
+# credentials file path (None: in memory) -> _StateFile
+_CREDENTIALS = dict()
+_CREDENTIALS_LOCK = threading.Lock()
+
+
+def get_credentials(path):
+    """Return the _StateFile of cached session cookies / oauth tokens, kept in memory only without path."""
+    with _CREDENTIALS_LOCK:
+        credentials = _CREDENTIALS.get(path)
+        if credentials is None:
+            credentials = _StateFile(path, mode=0o600)
+            _CREDENTIALS[path] = credentials
+    return credentials
+
+
+# tls_stats of the SolaceConfig of the request being sent by the current thread
+_TLS_STATS = threading.local()
+
+
+class _ResumableSSLSocket(ssl.SSLSocket):
+    """SSLSocket handing its TLS session to its TLSSessionContext when closed"""
+
+    def close(self):
+        if not self._closed and self._sslobj is not None:
+            self.context.remember_session(self.session)
+        ssl.SSLSocket.close(self)
+
+
+class TLSSessionContext(ssl.SSLContext):
+    """SSLContext resuming the latest TLS session for each new connection.
+
+    Resumption avoids the full (e.g. RSA-4096) handshake when the pool opens more connections
+    to the broker, e.g. for more workers, or after a connection was closed. Sessions live in
+    memory and can not be shared between processes, so they are resumed within one task only
+    (its requests and the items of solace_loop): every task starts with a full handshake.
+    The handshakes are counted in the tls_stats of the requests' SolaceConfig.
+    """
+
+    sslsocket_class = _ResumableSSLSocket
+
+    def __new__(cls):
+        return ssl.SSLContext.__new__(cls, ssl.PROTOCOL_TLS_CLIENT)
+
+    def __init__(self):
+        ssl.SSLContext.__init__(self)
+        self.load_default_certs()
+        if HAS_REQUESTS:
+            # same CA bundle as requests' default context
+            self.load_verify_locations(requests.certs.where())
+        self._lock = threading.Lock()
+        self._last_socket = None
+        self._session = None
+
+    def remember_session(self, session):
+        if session is not None:
+            with self._lock:
+                self._session = session
+
+    def _resumable_session(self):
+        with self._lock:
+            last_socket, session = self._last_socket, self._session
+        if last_socket is not None and not last_socket._closed:
+            # with TLS 1.3 the session ticket arrives after the handshake, take it from the open connection
+            session = last_socket.session or session
+        return session
+
+    def wrap_socket(self, sock, *args, **kwargs):
+        if kwargs.get('session') is None:
+            kwargs['session'] = self._resumable_session()
+        start = time.time()
+        try:
+            ssl_sock = ssl.SSLContext.wrap_socket(self, sock, *args, **kwargs)
+        except ValueError as e:
+            # handshake errors, e.g. an untrusted certificate, are SSLErrors (ValueError as well)
+            if isinstance(e, ssl.SSLError) or kwargs.get('session') is None:
+                raise
+            # session not usable for this connection, full handshake
+            kwargs.pop('session', None)
+            ssl_sock = ssl.SSLContext.wrap_socket(self, sock, *args, **kwargs)
+        seconds = time.time() - start
+        with self._lock:
+            self._last_socket = ssl_sock
+            stats = getattr(_TLS_STATS, 'current', None)
+            if stats is not None:
+                stats['handshakes'] += 1
+                stats['resumed'] += 1 if ssl_sock.session_reused else 0
+                stats['seconds'] = round(stats['seconds'] + seconds, 4)
+        log.debug("tls handshake %.3fs, resumed=%s", seconds, ssl_sock.session_reused)
+        return ssl_sock
+
+
+# semp_stats of the SolaceConfig of the request being sent by the current thread
+_CONNECTION_STATS = threading.local()
+
+
+def _count_connection():
+    stats = getattr(_CONNECTION_STATS, 'current', None)
+    if stats is not None:
+        stats.add_connection()
+
+
+if HAS_REQUESTS:
+    class _CountingHTTPConnection(urllib3.connection.HTTPConnection):
+        def connect(self):
+            _count_connection()
+            return urllib3.connection.HTTPConnection.connect(self)
+
+    class _CountingHTTPSConnection(urllib3.connection.HTTPSConnection):
+        def connect(self):
+            _count_connection()
+            return urllib3.connection.HTTPSConnection.connect(self)
+
+    class _CountingHTTPConnectionPool(urllib3.HTTPConnectionPool):
+        ConnectionCls = _CountingHTTPConnection
+
+    class _CountingHTTPSConnectionPool(urllib3.HTTPSConnectionPool):
+        ConnectionCls = _CountingHTTPSConnection
+
+    class _CountingAdapter(requests.adapters.HTTPAdapter):
+        """HTTPAdapter counting the new connections into the semp_stats of the request"""
+
+        def init_poolmanager(self, *args, **kwargs):
+            requests.adapters.HTTPAdapter.init_poolmanager(self, *args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = {'http': _CountingHTTPConnectionPool,
+                                                       'https': _CountingHTTPSConnectionPool}
+
+    class _TLSAdapter(_CountingAdapter):
+        """HTTPAdapter using a TLSSessionContext for all its connections"""
+
+        def __init__(self, ssl_context, **kwargs):
+            self.ssl_context = ssl_context
+            _CountingAdapter.__init__(self, **kwargs)
+
+        def init_poolmanager(self, *args, **kwargs):
+            kwargs['ssl_context'] = self.ssl_context
+            return _CountingAdapter.init_poolmanager(self, *args, **kwargs)
+
+        def build_connection_pool_key_attributes(self, request, verify, cert=None):
+            # requests >= 2.32 passes its own default context per request
+            host_params, pool_kwargs = requests.adapters.HTTPAdapter.build_connection_pool_key_attributes(self, request, verify, cert)
+            if verify is True and 'ssl_context' in pool_kwargs:
+                pool_kwargs['ssl_context'] = self.ssl_context
+            return host_params, pool_kwargs
+
+
+class _HttpApiResponse(object):
+    """Minimal response object for requests sent through the httpapi connection plugin."""
+
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+        self.content = text
+        self.headers = dict()
+
+    def json(self):
+        return json_loads(self.text)
+
+
 # request/response handling
 def _parse_response(resp):
     if resp.status_code != 200:
@@ -259,17 +1669,26 @@ def _parse_response(resp):
     return True, _parse_good_response(resp)
 
 
+def _response_json(resp):
+    # decode the (already decompressed) body with the fast codec rather than resp.json()
+    return json_loads(resp.content)
+
+
 def _parse_good_response(resp):
-    j = resp.json()
-    logging.debug("response=\n%s", json.dumps(j, indent=2))
+    j = _response_json(resp)
+    log.debug("response=\n%s", _LazyJson(j))
     if 'data' in j.keys():
         return j['data']
     return dict()
 
 
 def _parse_bad_response(resp):
-    j = resp.json()
-    logging.debug("response=\n%s", json.dumps(j, indent=2))
+    try:
+        j = _response_json(resp)
+    except ValueError:
+        # e.g. an html error page of a proxy / load balancer
+        return 'http status {}: {}'.format(resp.status_code, resp.text[:200])
+    log.debug("response=\n%s", _LazyJson(j))
     if 'meta' in j.keys() and \
             'error' in j['meta'].keys() and \
             'description' in j['meta']['error'].keys():
@@ -279,49 +1698,241 @@ def _parse_bad_response(resp):
     return 'Unknown error'
 
 
-def _make_request(func, solace_config, path_array, json=None):
+def _build_path(path_array, params=None):
     if not type(path_array) is list:
         raise TypeError("argument 'path_array' is not an array but {}".format(type(path_array)))
-    # ensure elements are 'url encoded'
+    # ensure elements are 'url encoded', e.g. '/', '#' and '?' of topics,
     # except first one: /SEMP/v2/config
+    # and the commas separating the attributes of composite keys, e.g. 'mqtt,a/b/#'
     paths = []
     for i, path_elem in enumerate(path_array):
         if i > 0:
-            paths.append(path_elem.replace('/', '%2F'))
+            paths.append(quote(path_elem, safe=','))
         else:
             paths.append(path_elem)
     path = '/'.join(paths)
-    logging.debug("%s uri=%s", func, path)
-
+    if params:
+        path += '?' + urlencode(params)
+    return path
+
+
+def _send_request(method, solace_config, path, json=None, timeout=None):
+    log.debug("%s uri=%s body=%s", method, path, _LazyJson(json))
+    if solace_config.cassette is not None and solace_config.cassette.replaying:
+        return solace_config.cassette.replay(method, path, json)
+    headers = {'x-broker-name': solace_config.x_broker}
+    timeout = timeout or solace_config.vmr_timeout
+    if solace_config.connection is not None:
+        return _HttpApiResponse(*solace_config.connection.send_request(
+            json, path, method=method, headers=headers, timeout=timeout
+        ))
+    data = None
+    if json is not None:
+        data = json_dumps(json)
+        headers['Content-Type'] = 'application/json'
+        if solace_config.semp_stats is not None:
+            solace_config.semp_stats.add_sent(len(data))
+    _TLS_STATS.current = solace_config.tls_stats
+    _CONNECTION_STATS.current = solace_config.semp_stats
     try:
-        return _parse_response(
-            func(
-                solace_config.vmr_url + path,
-                json=json,
-                auth=solace_config.vmr_auth,
-                timeout=solace_config.vmr_timeout,
-                headers={'x-broker-name': solace_config.x_broker},
-                params=None
-            )
+        return get_session(solace_config).request(
+            method,
+            solace_config.vmr_url + path,
+            data=data,
+            timeout=(min(solace_config.vmr_connect_timeout, timeout), timeout),
+            headers=headers,
+            params=None
         )
-    except requests.exceptions.ConnectionError as e:
+    finally:
+        _TLS_STATS.current = None
+        _CONNECTION_STATS.current = None
+
+
+def _is_connect_error(e):
+    """True if the request failed while connecting (refused, DNS, connect timeout), so it was not sent"""
+    if isinstance(e, requests.exceptions.ConnectTimeout) or getattr(e, 'connect_error', False):
+        return True
+    reason = getattr(e.args[0], 'reason', None) if e.args else None
+    return isinstance(reason, (urllib3.exceptions.NewConnectionError, urllib3.exceptions.ConnectTimeoutError))
+
+
+def _is_retriable_error(method, e):
+    """Connect errors are always retried, the request did not reach the broker.
+
+    Other connection errors (e.g. connection reset) and read timeouts only for idempotent methods,
+    the broker may have processed the request.
+    """
+    if _is_connect_error(e):
+        return True
+    if method not in IDEMPOTENT_METHODS:
+        return False
+    return isinstance(e, (requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+
+
+def _retry_after(resp):
+    """Seconds to wait as per the Retry-After header of the response, None if not set"""
+    value = resp.headers.get('Retry-After') if resp is not None else None
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    date = parsedate_tz(value)
+    return max(0.0, mktime_tz(date) - time.time()) if date else None
+
+
+def _attempt_timeout(solace_config, endpoint):
+    """Read timeout of the next attempt, adaptive if enabled and capped by the remaining task deadline"""
+    timeout = solace_config.vmr_timeout
+    if solace_config.latency_stats is not None:
+        timeout = solace_config.latency_stats.read_timeout(solace_config.vmr_url, endpoint, timeout)
+    if solace_config.deadline is not None:
+        timeout = min(timeout, max(0.001, solace_config.deadline - time.time()))
+    return timeout
+
+
+def _retry_delay(solace_config, attempt, resp):
+    """Seconds to wait before retry number attempt + 1, None if retries or the deadline are used up"""
+    delay = _retry_after(resp)
+    if delay is None:
+        delay = random.uniform(0, solace_config.retry_backoff * (2 ** attempt))
+    # also caps the broker's Retry-After
+    delay = min(delay, MAX_RETRY_BACKOFF)
+    if attempt >= solace_config.retries or \
+            (solace_config.deadline is not None and time.time() + delay >= solace_config.deadline):
+        return None
+    return delay
+
+
+def _record(solace_config, method, path, json, resp, seconds, error=None):
+    """Add the request to the task's semp_log, semp_stats and the recording cassette, if enabled"""
+    if solace_config.semp_log is not None:
+        solace_config.semp_log.add(method, path, json, resp, seconds, error)
+    if solace_config.semp_stats is not None:
+        solace_config.semp_stats.add(method, path, resp, seconds, error)
+    if solace_config.cassette is not None and not solace_config.cassette.replaying:
+        solace_config.cassette.record(method, path, json, resp, seconds, error)
+
+
+def _record_failure(breaker, solace_config, e):
+    """Count a request failed with a connection error in the circuit breaker, once per request rather than per attempt"""
+    if breaker is not None and isinstance(e, requests.exceptions.ConnectionError):
+        breaker.record(solace_config.vmr_url, False)
+
+
+def _send_with_retry(method, solace_config, path, json=None):
+    """Send the request, retrying connection errors, timeouts and 429/5xx responses.
+
+    Requests with non-idempotent methods (POST, DELETE) are only retried after connect errors.
+    Retries use exponential backoff with full jitter or the broker's Retry-After, at most
+    MAX_RETRY_BACKOFF, within solace_config.retries and the remaining task deadline. All other responses, including
+    400 (e.g. error code 6, not found), are returned right away.
+    Raises CircuitOpenError if the broker's circuit breaker is open.
+    Returns the last response or raises the last exception.
+    """
+    breaker = solace_config.circuit_breaker if solace_config.connection is None else None
+    stats = solace_config.latency_stats
+    endpoint = _endpoint_class(method, path) if stats is not None else None
+    attempt = 0
+    while True:
+        timeout = _attempt_timeout(solace_config, endpoint)
+        if breaker is not None:
+            breaker.check(solace_config.vmr_url)
+        resp = None
+        start = time.time()
+        try:
+            resp = _send_request(method, solace_config, path, json, timeout=timeout)
+            _record(solace_config, method, path, json, resp, time.time() - start)
+            if stats is not None:
+                stats.record(solace_config.vmr_url, endpoint, time.time() - start)
+            if breaker is not None:
+                breaker.record(solace_config.vmr_url, True)
+            if resp.status_code not in RETRY_STATUS_CODES:
+                return resp
+            error = 'http status {}'.format(resp.status_code)
+        except HttpApiConnectionError as e:
+            _record(solace_config, method, path, json, None, time.time() - start, e)
+            raise
+        except requests.exceptions.RequestException as e:
+            _record(solace_config, method, path, json, None, time.time() - start, e)
+            if stats is not None and isinstance(e, requests.exceptions.ReadTimeout):
+                # the request took at least the timeout, raises the next timeout
+                stats.record(solace_config.vmr_url, endpoint, timeout)
+            if not _is_retriable_error(method, e):
+                _record_failure(breaker, solace_config, e)
+                raise
+            error = e
+        delay = _retry_delay(solace_config, attempt, resp)
+        if delay is None:
+            if resp is not None:
+                return resp
+            _record_failure(breaker, solace_config, error)
+            raise error
+        attempt += 1
+        if solace_config.semp_stats is not None:
+            solace_config.semp_stats.add_retry()
+        log.debug("retry %d of %s uri=%s in %.2fs after: %s", attempt, method, path, delay, error)
+        time.sleep(delay)
+
+
+def _make_request(method, solace_config, path_array, json=None, params=None):
+    if solace_config.async_transport:
+        return solace_async.run_sync(solace_async._make_request(method, solace_config, path_array, json, params))
+    path = _build_path(path_array, params)
+    try:
+        return _parse_response(_send_with_retry(method, solace_config, path, json))
+    except (HttpApiConnectionError, CircuitOpenError, CassetteError) as e:
+        return False, str(e)
+    except requests.exceptions.RequestException as e:
         return False, str(e)
 
 
+def _make_page_request(solace_config, path):
+    """GET one page of a collection, returns ok, (list of objects, path of the next page or None)"""
+    if solace_config.async_transport:
+        return solace_async.run_sync(solace_async._make_page_request(solace_config, path))
+    try:
+        resp = _send_with_retry('GET', solace_config, path)
+    except (HttpApiConnectionError, CircuitOpenError, CassetteError) as e:
+        return False, str(e)
+    except requests.exceptions.RequestException as e:
+        return False, str(e)
+    return _parse_page_response(resp)
+
+
+def _parse_page_response(resp):
+    if resp.status_code != 200:
+        return False, _parse_bad_response(resp)
+    j = _response_json(resp)
+    log.debug("response=\n%s", _LazyJson(j))
+    next_page_uri = j.get('meta', {}).get('paging', {}).get('nextPageUri')
+    if next_page_uri:
+        # nextPageUri is absolute, keep the configured broker url (e.g. a SEMP proxy)
+        parts = urlsplit(next_page_uri)
+        next_page_uri = parts.path + ('?' + parts.query if parts.query else '')
+    return True, (j.get('data', []), next_page_uri)
+
+
 def make_get_request(solace_config, path_array):
-    return _make_request(requests.get, solace_config, path_array)
+    return _make_request('GET', solace_config, path_array)
 
 
 def make_post_request(solace_config, path_array, json=None):
-    return _make_request(requests.post, solace_config, path_array, json)
+    return _make_request('POST', solace_config, path_array, json)
 
 
 def make_delete_request(solace_config, path_array, json=None):
-    return _make_request(requests.delete, solace_config, path_array, json)
+    return _make_request('DELETE', solace_config, path_array, json)
 
 
 def make_patch_request(solace_config, path_array, json=None):
-    return _make_request(requests.patch, solace_config, path_array, json)
+    return _make_request('PATCH', solace_config, path_array, json)
+
+
+# optional asyncio transport (python 3, httpx), imported last as it uses this module
+try:
+    from ansible.module_utils.network.solace import solace_async
+except (ImportError, SyntaxError):
+    solace_async = None
 
 ###
 # The End.
@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+"""Ansible-Solace Module for configuring all Exceptions of an ACL Profile at once"""
+import ansible.module_utils.network.solace.solace_utils as su
+from ansible.module_utils.basic import AnsibleModule
+
+ANSIBLE_METADATA = {
+    'metadata_version': '0.1.0',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: solace_acl_exceptions
+
+short_description: Configure the publish, subscribe and client connect exceptions of an acl profile.
+
+description:
+    - "Bulk version of solace_acl_publish, solace_acl_subscribe and solace_acl_connect. Reads the existing exceptions of the
+       acl profile once using paged collection GETs, computes the exceptions to add and remove and sends the required
+       POST/DELETE calls, optionally in parallel."
+    - "Brokers with SEMP API versions before 2.14 do not support publishTopicExceptions / subscribeTopicExceptions,
+       the deprecated publishExceptions / subscribeExceptions resources are used instead (api=auto)."
+    - "Reference documentation: https://docs.solace.com/API-Developer-Online-Ref-Documentation/swagger-ui/config/index.html#/aclProfile."
+
+options:
+    msg_vpn:
+        description:
+            - The message vpn of the acl profile
+        required: true
+    acl_profile_name:
+        description:
+            - The acl profile
+        required: true
+    publish_topic_exceptions:
+        description:
+            - Dictionary of topic syntax (smf, mqtt) -> list of publish topic exceptions. Only the syntaxes listed are managed.
+        required: false
+    subscribe_topic_exceptions:
+        description:
+            - Dictionary of topic syntax (smf, mqtt) -> list of subscribe topic exceptions. Only the syntaxes listed are managed.
+        required: false
+    client_connect_exceptions:
+        description:
+            - List of client connect exception addresses (e.g. 192.168.1.0/24)
+        required: false
+    exclusive:
+        description:
+            - Remove the exceptions that are not listed. Only used with state=present.
+        required: false
+        default: false
+    state:
+        description:
+            - Target state of the listed exceptions, present/absent
+        required: false
+    api:
+        description:
+            - Topic exception resources to use, auto selects them based on the broker's SEMP API version
+        required: false
+        default: auto
+        choices: [auto, current, deprecated]
+    workers:
+        description:
+            - Number of POST/DELETE requests sent in parallel
+        required: false
+        default: 1
+    async_transport:
+        description:
+            - Send the requests of the workers with the asyncio (httpx) transport, multiplexed over HTTP/2 if the h2 package is installed.
+              Falls back to the default transport without httpx, with the httpapi connection or with auth_type session / oauth.
+        required: false
+        default: false
+    host:
+        description:
+            - Hostname of Solace Broker, default is "localhost"
+        required: false
+    port:
+        description:
+            - Management port of Solace Broker, default is 8080
+        required: false
+    secure_connection:
+        description:
+            - If true use https rather than http for querying
+        required: false
+    username:
+        description:
+            - Administrator username for Solace Broker, default is "admin"
+        required: false
+    password:
+        description:
+            - Administrator password for Solace Broker, default is "admin"
+        required: false
+    timeout:
+        description:
+            - Connection timeout when making requests, defaults to 10 (seconds)
+        required: false
+    x_broker:
+        description:
+            - Custom HTTP header with the broker virtual router id, if using a SMEPv2 Proxy/agent infrastructure
+        required: false
+
+author:
+    - Ricardo Gomez-Ulmke (ricardo.gomez-ulmke@solace.com)
+'''
+
+EXAMPLES = '''
+    - name: Set the exceptions of acl profile foo
+      solace_acl_exceptions:
+        msg_vpn: default
+        acl_profile_name: foo
+        publish_topic_exceptions:
+          smf:
+            - a/b/>
+          mqtt:
+            - a/b/#
+        subscribe_topic_exceptions:
+          smf:
+            - c/>
+        client_connect_exceptions:
+          - 10.0.0.0/8
+        exclusive: true
+        workers: 10
+'''
+
+RETURN = '''
+publish_topic_exceptions:
+    description: The exceptions ("<syntax>,<topic>") created, deleted and the errors per exception
+    type: dict
+subscribe_topic_exceptions:
+    description: Same as publish_topic_exceptions
+    type: dict
+client_connect_exceptions:
+    description: The client connect exceptions created, deleted and the errors per exception
+    type: dict
+api:
+    description: The topic exception resources used, current or deprecated
+    type: str
+'''
+
+# first SEMP API version supporting publishTopicExceptions / subscribeTopicExceptions
+TOPIC_EXCEPTIONS_SEMP_VERSION = (2, 14)
+
+# module param -> resource, key attributes of the resource per api
+RESOURCES = {
+    'current': {
+        'publish_topic_exceptions': (su.ACL_PROFILES_PUBLISH_TOPIC_EXCEPTIONS, ['publishTopicExceptionSyntax', 'publishTopicException']),
+        'subscribe_topic_exceptions': (su.ACL_PROFILES_SUBSCRIBE_TOPIC_EXCEPTIONS, ['subscribeTopicExceptionSyntax', 'subscribeTopicException']),
+        'client_connect_exceptions': (su.ACL_PROFILES_CLIENT_CONNECT_EXCEPTIONS, 'clientConnectExceptionAddress')
+    },
+    'deprecated': {
+        'publish_topic_exceptions': (su.ACL_PROFILES_PUBLISH_EXCEPTIONS, ['topicSyntax', 'publishExceptionTopic']),
+        'subscribe_topic_exceptions': (su.ACL_PROFILES_SUBSCRIBE_EXCEPTIONS, ['topicSyntax', 'subscribeExceptionTopic']),
+        'client_connect_exceptions': (su.ACL_PROFILES_CLIENT_CONNECT_EXCEPTIONS, 'clientConnectExceptionAddress')
+    }
+}
+
+
+class SolaceACLExceptionsTask(su.SolaceBulkTask):
+
+    def __init__(self, module):
+        su.SolaceBulkTask.__init__(self, module)
+
+    def get_args(self):
+        return [self.module.params['msg_vpn'], self.module.params['acl_profile_name']]
+
+    def do_task(self):
+        api = self.module.params['api']
+        if api == 'auto':
+            ok, resp = su.get_semp_version(self.solace_config)
+            if not ok:
+                self.module.fail_json(msg=resp, **self.result)
+            api = 'current' if resp >= TOPIC_EXCEPTIONS_SEMP_VERSION else 'deprecated'
+        self.result['api'] = api
+
+        params = [param for param in RESOURCES[api] if self.module.params[param] is not None]
+        resources = [RESOURCES[api][param] for param in params]
+
+        # read all managed exception collections
+        current = su.run_parallel(lambda resource, key: self.get_func(self.solace_config, *(self.get_args() + [resource, key])),
+                                  resources, self.workers)
+
+        ops = []
+        for param, (resource, key), (ok, resp) in zip(params, resources, current):
+            self.result[param] = dict()
+            if not ok:
+                self.module.fail_json(msg=resp, **self.result)
+            for op, name, data in self.plan_exceptions(param, resp):
+                ops.append((op, (param, resource, key, name), data))
+
+        result = dict()
+        self.apply(
+            ops,
+            lambda ex, settings: self.create_func(self.solace_config, *(self.get_args() + list(ex))),
+            None,
+            lambda ex: self.delete_func(self.solace_config, *(self.get_args() + list(ex))),
+            result
+        )
+        for op in ['created', 'deleted']:
+            for param, resource, key, name in result[op]:
+                self.result[param].setdefault(op, []).append(name)
+        for (param, resource, key, name), error in result['errors'].items():
+            self.result[param].setdefault('errors', dict())[name] = error
+        return self.finish()
+
+    def plan_exceptions(self, param, current_index):
+        """Compute the exceptions to create / delete, named as in their URI: <syntax>,<topic> or <address>"""
+        exceptions = self.module.params[param]
+        if isinstance(exceptions, dict):
+            # topic exceptions, per syntax
+            desired = set(','.join([syntax, topic]) for syntax, topics in exceptions.items() for topic in topics or [])
+            managed = set(exceptions.keys())
+        else:
+            desired = set(exceptions)
+            managed = None
+        current = current_index.keys()
+        if self.module.params['state'] == 'absent':
+            return [('delete', name, None) for name in sorted(desired & current)]
+        ops = [('create', name, None) for name in sorted(desired - current)]
+        if self.module.params['exclusive']:
+            ops += [('delete', name, None) for name in sorted(current - desired)
+                    if managed is None or name.split(',', 1)[0] in managed]
+        return ops
+
+    def get_func(self, solace_config, vpn, acl_profile_name, resource, key):
+        # GET /msgVpns/{msgVpnName}/aclProfiles/{aclProfileName}/{resource}
+        path_array = [su.SEMP_V2_CONFIG, su.MSG_VPNS, vpn, su.ACL_PROFILES, acl_profile_name, resource]
+        return su.read_index(solace_config, path_array, key, select=key if isinstance(key, list) else [key])
+
+    def create_func(self, solace_config, vpn, acl_profile_name, param, resource, key, name):
+        # POST /msgVpns/{msgVpnName}/aclProfiles/{aclProfileName}/{resource}
+        data = {
+            'msgVpnName': vpn,
+            'aclProfileName': acl_profile_name
+        }
+        if isinstance(key, list):
+            data.update(zip(key, name.split(',', 1)))
+        else:
+            data[key] = name
+        path_array = [su.SEMP_V2_CONFIG, su.MSG_VPNS, vpn, su.ACL_PROFILES, acl_profile_name, resource]
+        return su.make_post_request(solace_config, path_array, data)
+
+    def delete_func(self, solace_config, vpn, acl_profile_name, param, resource, key, name):
+        # DELETE /msgVpns/{msgVpnName}/aclProfiles/{aclProfileName}/{resource}/{name}
+        path_array = [su.SEMP_V2_CONFIG, su.MSG_VPNS, vpn, su.ACL_PROFILES, acl_profile_name, resource, name]
+        return su.make_delete_request(solace_config, path_array)
+
+
+def run_module():
+    """Entrypoint to module"""
+    module_args = dict(
+        msg_vpn=dict(type='str', required=True),
+        acl_profile_name=dict(type='str', required=True),
+        publish_topic_exceptions=dict(type='dict', required=False),
+        subscribe_topic_exceptions=dict(type='dict', required=False),
+        client_connect_exceptions=dict(type='list', elements='str', required=False),
+        exclusive=dict(type='bool', default=False),
+        state=dict(default='present', choices=['absent', 'present']),
+        api=dict(default='auto', choices=['auto', 'current', 'deprecated']),
+        host=dict(type='str', default='localhost'),
+        port=dict(type='int', default=8080),
+        secure_connection=dict(type='bool', default=False),
+        username=dict(type='str', default='admin'),
+        password=dict(type='str', default='admin', no_log=True),
+        timeout=dict(default='10', require=False),
+        x_broker=dict(type='str', default='')
+    )
+    module_args.update(su.transport_arg_spec())
+    module_args.update(su.bulk_arg_spec())
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+
+    solace_task = SolaceACLExceptionsTask(module)
+    result = solace_task.do_task()
+
+    module.exit_json(**result)
+
+
+def main():
+    """Standard boilerplate"""
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
+
+###
+# The End.
@@ -7,9 +7,6 @@
 import ansible.module_utils.network.solace.solace_utils as su
 from ansible.module_utils.basic import AnsibleModule
 
-import logging
-logging.basicConfig(filename='solace.log', level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(funcName)s -%(message)s')
-
 
 ANSIBLE_METADATA = {
     'metadata_version': '0.1.0',
@@ -25,7 +22,7 @@ class SolaceACLPublishExceptionDeprecatedTask(su.SolaceTask):
 
     def get_args(self):
         ret_val = [self.module.params['msg_vpn'], self.module.params['acl_profile_name'], self.module.params['topic_syntax']]
-        logging.debug('get args ' + str(ret_val))
+        su.log.debug('get args %s', ret_val)
         return ret_val
 
     LOOKUP_ITEM_KEY = 'publishExceptionTopic'
@@ -74,6 +71,7 @@ def run_module():
         timeout=dict(default='1', require=False),
         x_broker=dict(type='str', default='')
     )
+    module_args.update(su.transport_arg_spec())
     module = AnsibleModule(
         argument_spec=module_args,
         supports_check_mode=True
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+"""Ansible-Solace Module for configuring many Clients at once"""
+import ansible.module_utils.network.solace.solace_utils as su
+from ansible.module_utils.basic import AnsibleModule
+
+ANSIBLE_METADATA = {
+    'metadata_version': '0.1.0',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: solace_clients
+
+short_description: Configure a list of client usernames on a message vpn.
+
+description:
+    - "Bulk version of solace_client. Reads the existing client usernames of the vpn once using paged collection GETs,
+       compares them locally with the requested settings and sends the required POST/PATCH/DELETE calls through a
+       pool of workers sharing one pooled http session."
+    - "A failing client username is reported in the result and does not stop the others."
+    - "Reference documentation: https://docs.solace.com/API-Developer-Online-Ref-Documentation/swagger-ui/config/index.html#/clientUsername."
+
+options:
+    msg_vpn:
+        description:
+            - The message vpn the client usernames are on/created
+        required: true
+    clients:
+        description:
+            - List of client usernames. Each item has a 'name', optional 'settings', optional 'password' and optional 'state'
+              (present/absent, default present).
+            - The password is set with the item's 'password', which is not logged, rather than in 'settings'.
+        required: true
+    settings:
+        description:
+            - JSON dictionary of settings applied to every client username, overridden by the item's settings
+        required: false
+    update_password:
+        description:
+            - always will update the password of existing client usernames, on_create will only set it for new ones.
+              The password is not returned by the broker, so with always it is sent (and the task changed) on every run.
+        required: false
+        default: on_create
+        choices: [always, on_create]
+    workers:
+        description:
+            - Number of POST/PATCH/DELETE requests sent in parallel
+        required: false
+        default: 1
+    async_transport:
+        description:
+            - Send the requests of the workers with the asyncio (httpx) transport, multiplexed over HTTP/2 if the h2 package is installed.
+              Falls back to the default transport without httpx, with the httpapi connection or with auth_type session / oauth.
+        required: false
+        default: false
+    host:
+        description:
+            - Hostname of Solace Broker, default is "localhost"
+        required: false
+    port:
+        description:
+            - Management port of Solace Broker, default is 8080
+        required: false
+    secure_connection:
+        description:
+            - If true use https rather than http for querying
+        required: false
+    username:
+        description:
+            - Administrator username for Solace Broker, default is "admin"
+        required: false
+    password:
+        description:
+            - Administrator password for Solace Broker, default is "admin"
+        required: false
+    timeout:
+        description:
+            - Connection timeout when making requests, defaults to 10 (seconds)
+        required: false
+    x_broker:
+        description:
+            - Custom HTTP header with the broker virtual router id, if using a SMEPv2 Proxy/agent infrastructure
+        required: false
+
+author:
+    - Ricardo Gomez-Ulmke (ricardo.gomez-ulmke@solace.com)
+'''
+
+EXAMPLES = '''
+    - name: Onboard service accounts
+      solace_clients:
+        msg_vpn: foo
+        settings:
+          aclProfileName: services
+          clientProfileName: services
+        clients: "{{ service_accounts }}"
+        workers: 20
+'''
+
+RETURN = '''
+clients:
+    description: The client usernames created, updated (with the delta), deleted and the errors per client username
+    type: dict
+'''
+
+
+class SolaceClientsTask(su.SolaceBulkTask):
+
+    LOOKUP_ITEM_KEY = 'clientUsername'
+
+    def __init__(self, module):
+        su.SolaceBulkTask.__init__(self, module)
+
+    def get_args(self):
+        return [self.module.params['msg_vpn']]
+
+    def do_task(self):
+        clients = self.module.params['clients']
+        for settings in [self.module.params['settings']] + [item['settings'] for item in clients]:
+            if settings and 'password' in settings:
+                self.module.fail_json(msg="set the password of a client username with the item's 'password', not in 'settings'", **self.result)
+        desired = self.desired_from_items(clients, self.module.params['settings'])
+        for item in clients:
+            if item['password'] is not None and desired[item['name']] is not False:
+                desired[item['name']]['password'] = item['password']
+        # only read the attributes that are compared
+        select = set([self.LOOKUP_ITEM_KEY])
+        for settings in desired.values():
+            select.update(settings or [])
+        current = self.read_collection(self.path_array(), self.LOOKUP_ITEM_KEY, select=sorted(select))
+        if self.module.params['update_password'] == 'on_create':
+            for name, settings in desired.items():
+                if settings and name in current:
+                    settings.pop('password', None)
+
+        ops, errors = self.plan(desired, current)
+        self.apply(
+            ops,
+            lambda name, settings: self.create_func(self.solace_config, *(self.get_args() + [name, settings])),
+            lambda name, delta: self.update_func(self.solace_config, *(self.get_args() + [name, delta])),
+            lambda name: self.delete_func(self.solace_config, *(self.get_args() + [name])),
+            self.result.setdefault('clients', dict()),
+            errors
+        )
+        return self.finish()
+
+    def path_array(self, *names):
+        # /msgVpns/{msgVpnName}/clientUsernames
+        return [su.SEMP_V2_CONFIG, su.MSG_VPNS, self.module.params['msg_vpn'], su.CLIENT_USERNAMES] + list(names)
+
+    def create_func(self, solace_config, vpn, client, settings=None):
+        """Create a Client"""
+        # POST /msgVpns/{msgVpnName}/clientUsernames
+        defaults = {
+            'enabled': True
+        }
+        mandatory = {
+            'clientUsername': client,
+        }
+        data = su.merge_dicts(defaults, mandatory, settings)
+        return su.make_post_request(solace_config, self.path_array(), data)
+
+    def update_func(self, solace_config, vpn, lookup_item_value, settings=None):
+        """Update an existing Client"""
+        # PATCH /msgVpns/{msgVpnName}/clientUsernames/{clientUsername}
+        return su.make_patch_request(solace_config, self.path_array(lookup_item_value), settings)
+
+    def delete_func(self, solace_config, vpn, lookup_item_value):
+        """Delete a Client"""
+        # DELETE /msgVpns/{msgVpnName}/clientUsernames/{clientUsername}
+        return su.make_delete_request(solace_config, self.path_array(lookup_item_value), None)
+
+
+def run_module():
+    """Entrypoint to module"""
+    module_args = dict(
+        msg_vpn=dict(type='str', required=True),
+        clients=dict(type='list', elements='dict', required=True, options=dict(
+            name=dict(type='str', required=True),
+            settings=dict(type='dict', required=False),
+            password=dict(type='str', required=False, no_log=True),
+            state=dict(type='str', default='present', choices=['present', 'absent'])
+        )),
+        settings=dict(type='dict', require=False),
+        update_password=dict(default='on_create', choices=['always', 'on_create']),
+        host=dict(type='str', default='localhost'),
+        port=dict(type='int', default=8080),
+        secure_connection=dict(type='bool', default=False),
+        username=dict(type='str', default='admin'),
+        password=dict(type='str', default='admin', no_log=True),
+        timeout=dict(default='10', require=False),
+        x_broker=dict(type='str', default='')
+    )
+    module_args.update(su.transport_arg_spec())
+    module_args.update(su.bulk_arg_spec())
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+
+    solace_task = SolaceClientsTask(module)
+    result = solace_task.do_task()
+
+    module.exit_json(**result)
+
+
+def main():
+    """Standard boilerplate"""
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
+
+###
+# The End.
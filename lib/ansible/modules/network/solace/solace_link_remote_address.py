@@ -142,6 +142,7 @@ def run_module():
         x_broker=dict(type='str', default='')
 
     )
+    module_args.update(su.transport_arg_spec())
 
     module = AnsibleModule(
         argument_spec=module_args,
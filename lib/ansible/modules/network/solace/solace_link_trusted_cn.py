@@ -140,6 +140,7 @@ def run_module():
         timeout=dict(default='1', require=False),
         x_broker=dict(type='str', default='')
     )
+    module_args.update(su.transport_arg_spec())
 
     module = AnsibleModule(
         argument_spec=module_args,
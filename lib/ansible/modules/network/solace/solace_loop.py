@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+"""Documentation of the solace_loop action plugin, see lib/ansible/plugins/action/solace_loop.py"""
+
+ANSIBLE_METADATA = {
+    'metadata_version': '0.1.0',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: solace_loop
+
+short_description: Run a solace_* module for a list of items in parallel.
+
+description:
+    - "Alternative to an Ansible loop over a solace_* module. The items are run in the controller process by a pool of
+       worker threads, sharing one pooled http session per broker, instead of one module process per item."
+    - "Implemented as action plugin only, set ANSIBLE_ACTION_PLUGINS to lib/ansible/plugins/action and
+       ANSIBLE_MODULE_UTILS to lib/ansible/module_utils."
+    - "The module arguments are validated as for a normal task. With the solace httpapi connection, the items' requests
+       are sent through the persistent connection."
+
+options:
+    module:
+        description:
+            - Name of the solace_* module to run, e.g. solace_queue
+        required: true
+    items:
+        description:
+            - List of module arguments, one dict per item
+        required: true
+    args:
+        description:
+            - Module arguments common to all items, overridden by the item's arguments
+            - Dict arguments, e.g. settings, are merged, the item's keys take precedence
+        required: false
+    workers:
+        description:
+            - Number of items run in parallel
+        required: false
+        default: 10
+
+author:
+    - Ricardo Gomez-Ulmke (ricardo.gomez-ulmke@solace.com)
+'''
+
+EXAMPLES = '''
+    - name: Create queues
+      solace_loop:
+        module: solace_queue
+        args:
+          msg_vpn: default
+          settings:
+            egressEnabled: true
+            ingressEnabled: true
+        items:
+          - name: q1
+          - name: q2
+          - name: q3
+            settings:
+              maxMsgSpoolUsage: 100
+        workers: 20
+'''
+
+RETURN = '''
+results:
+    description: The result of each item, same as the results of a loop, with the item's arguments in 'item'
+    type: list
+'''
+
+###
+# The End.
@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+"""Ansible-Solace Module for configuring many Queues & Topic Endpoints at once"""
+import ansible.module_utils.network.solace.solace_utils as su
+from ansible.module_utils.basic import AnsibleModule
+
+ANSIBLE_METADATA = {
+    'metadata_version': '0.1.0',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: solace_queues
+
+short_description: Configure a list of queues (and topic endpoints) on a message vpn.
+
+description:
+    - "Bulk version of solace_queue / solace_topic. Reads the existing queues of the vpn once using paged collection GETs,
+       compares them locally with the requested settings and only issues the POST/PATCH/DELETE calls required, optionally in parallel."
+    - "Reference documentation: https://docs.solace.com/API-Developer-Online-Ref-Documentation/swagger-ui/config/index.html#/queue."
+
+options:
+    msg_vpn:
+        description:
+            - The message vpn the queues are on/created
+        required: true
+    queues:
+        description:
+            - List of queues. Each item has a 'name', optional 'settings' and optional 'state' (present/absent, default present).
+        required: false
+    topic_endpoints:
+        description:
+            - List of topic endpoints, same format as queues. Topic endpoints are only managed if this option is given.
+        required: false
+    settings:
+        description:
+            - JSON dictionary of settings applied to every queue and topic endpoint, overridden by the item's settings
+        required: false
+    prune:
+        description:
+            - Delete queues (and topic endpoints, if managed) that are not in the list. Names starting with '#' are never deleted.
+        required: false
+        default: false
+    workers:
+        description:
+            - Number of POST/PATCH/DELETE requests sent in parallel
+        required: false
+        default: 1
+    async_transport:
+        description:
+            - Send the requests of the workers with the asyncio (httpx) transport, multiplexed over HTTP/2 if the h2 package is installed.
+              Falls back to the default transport without httpx, with the httpapi connection or with auth_type session / oauth.
+        required: false
+        default: false
+    host:
+        description:
+            - Hostname of Solace Broker, default is "localhost"
+        required: false
+    port:
+        description:
+            - Management port of Solace Broker, default is 8080
+        required: false
+    secure_connection:
+        description:
+            - If true use https rather than http for querying
+        required: false
+    username:
+        description:
+            - Administrator username for Solace Broker, default is "admin"
+        required: false
+    password:
+        description:
+            - Administrator password for Solace Broker, default is "admin"
+        required: false
+    timeout:
+        description:
+            - Connection timeout when making requests, defaults to 10 (seconds)
+        required: false
+    x_broker:
+        description:
+            - Custom HTTP header with the broker virtual router id, if using a SMEPv2 Proxy/agent infrastructure
+        required: false
+
+author:
+    - Ricardo Gomez-Ulmke (ricardo.gomez-ulmke@solace.com)
+'''
+
+EXAMPLES = '''
+    - name: Configure all queues of the vpn
+      solace_queues:
+        msg_vpn: foo
+        settings:
+          owner: admin
+          permission: consume
+        queues:
+          - name: q1
+          - name: q2
+            settings:
+              maxMsgSpoolUsage: 100
+          - name: q3
+            state: absent
+        prune: true
+        workers: 10
+'''
+
+RETURN = '''
+queues:
+    description: The queues created, updated (with the delta), deleted and the errors per queue
+    type: dict
+topic_endpoints:
+    description: Same as queues, for topic endpoints
+    type: dict
+'''
+
+
+class SolaceQueuesTask(su.SolaceBulkTask):
+
+    def __init__(self, module):
+        su.SolaceBulkTask.__init__(self, module)
+
+    def do_task(self):
+        vpn = self.module.params['msg_vpn']
+        self.reconcile('queues', [su.SEMP_V2_CONFIG, su.MSG_VPNS, vpn, su.QUEUES], 'queueName')
+        if self.module.params['topic_endpoints'] is not None:
+            self.reconcile('topic_endpoints', [su.SEMP_V2_CONFIG, su.MSG_VPNS, vpn, su.TOPIC_ENDPOINTS], 'topicEndpointName')
+        return self.finish()
+
+    def reconcile(self, param, path_array, key):
+        """Bring the collection at path_array in line with the items of module param"""
+        desired = self.desired_from_items(self.module.params[param] or [], self.module.params['settings'])
+        # only read the attributes that are compared
+        select = set([key])
+        for settings in desired.values():
+            select.update(settings or [])
+        current = self.read_collection(path_array, key, select=sorted(select))
+        ops, errors = self.plan(desired, current, self.module.params['prune'], keep=lambda name: name.startswith('#'))
+        result = self.result.setdefault(param, dict())
+        self.apply(
+            ops,
+            lambda name, settings: self.create_func(path_array, key, name, settings),
+            lambda name, delta: su.make_patch_request(self.solace_config, path_array + [name], delta),
+            lambda name: su.make_delete_request(self.solace_config, path_array + [name]),
+            result,
+            errors
+        )
+
+    def create_func(self, path_array, key, name, settings=None):
+        """Create a Queue / Topic Endpoint"""
+        # POST /msgVpns/{msgVpnName}/queues
+        defaults = {}
+        mandatory = {
+            'msgVpnName': self.module.params['msg_vpn'],
+            key: name
+        }
+        data = su.merge_dicts(defaults, mandatory, settings)
+        return su.make_post_request(self.solace_config, path_array, data)
+
+
+def run_module():
+    """Entrypoint to module"""
+    module_args = dict(
+        msg_vpn=dict(type='str', required=True),
+        queues=dict(type='list', elements='dict', default=[]),
+        topic_endpoints=dict(type='list', elements='dict', required=False),
+        settings=dict(type='dict', require=False),
+        prune=dict(type='bool', default=False),
+        host=dict(type='str', default='localhost'),
+        port=dict(type='int', default=8080),
+        secure_connection=dict(type='bool', default=False),
+        username=dict(type='str', default='admin'),
+        password=dict(type='str', default='admin', no_log=True),
+        timeout=dict(default='10', require=False),
+        x_broker=dict(type='str', default='')
+    )
+    module_args.update(su.transport_arg_spec())
+    module_args.update(su.bulk_arg_spec())
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+
+    solace_task = SolaceQueuesTask(module)
+    result = solace_task.do_task()
+
+    module.exit_json(**result)
+
+
+def main():
+    """Standard boilerplate"""
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
+
+###
+# The End.
@@ -0,0 +1,337 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+"""Ansible-Solace Module for configuring RDPs incl. rest consumers, trusted common names & queue bindings"""
+import ansible.module_utils.network.solace.solace_utils as su
+from ansible.module_utils.basic import AnsibleModule
+
+ANSIBLE_METADATA = {
+    'metadata_version': '0.1.0',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: solace_rdp_tree
+
+short_description: Configure rest delivery points with their rest consumers, trusted common names and queue bindings.
+
+description:
+    - "Single invocation version of solace_rdp, solace_rdp_rest_consumer, solace_rdp_rest_consumer_trusted_common_name and
+       solace_rdp_queue_binding. The existing objects are read with a minimal set of collection GETs, changes are applied level
+       by level (rdp, rest consumers & queue bindings, trusted common names), in parallel within each level."
+    - "Rdps and rest consumers are changed with enabled=false in the same request if they are enabled and are (re-)enabled
+       in a last step, after all their children have been configured."
+    - "Reference documentation: https://docs.solace.com/API-Developer-Online-Ref-Documentation/swagger-ui/config/index.html#/restDeliveryPoint."
+
+options:
+    msg_vpn:
+        description:
+            - The message vpn the RDPs are on/created
+        required: true
+    rdps:
+        description:
+            - List of RDPs. Each item has a 'name', optional 'settings', optional 'state' (present/absent, default present),
+              'rest_consumers' (list of 'name', 'settings', 'trusted_common_names' (list of str)) and
+              'queue_bindings' (list of 'name', 'settings').
+        required: true
+    exclusive:
+        description:
+            - Remove rest consumers, trusted common names and queue bindings of the listed RDPs that are not in the document
+        required: false
+        default: false
+    workers:
+        description:
+            - Number of requests sent in parallel within a level
+        required: false
+        default: 1
+    async_transport:
+        description:
+            - Send the requests of the workers with the asyncio (httpx) transport, multiplexed over HTTP/2 if the h2 package is installed.
+              Falls back to the default transport without httpx, with the httpapi connection or with auth_type session / oauth.
+        required: false
+        default: false
+    host:
+        description:
+            - Hostname of Solace Broker, default is "localhost"
+        required: false
+    port:
+        description:
+            - Management port of Solace Broker, default is 8080
+        required: false
+    secure_connection:
+        description:
+            - If true use https rather than http for querying
+        required: false
+    username:
+        description:
+            - Administrator username for Solace Broker, default is "admin"
+        required: false
+    password:
+        description:
+            - Administrator password for Solace Broker, default is "admin"
+        required: false
+    timeout:
+        description:
+            - Connection timeout when making requests, defaults to 30 (seconds)
+        required: false
+    x_broker:
+        description:
+            - Custom HTTP header with the broker virtual router id, if using a SMEPv2 Proxy/agent infrastructure
+        required: false
+
+author:
+    - Ricardo Gomez-Ulmke (ricardo.gomez-ulmke@solace.com)
+'''
+
+EXAMPLES = '''
+    - name: Configure the RDP of the Azure function
+      solace_rdp_tree:
+        msg_vpn: "{{ deployment.azRDPFunction.brokerConfig.vpn }}"
+        rdps:
+          - name: "{{ deployment.azRDPFunction.brokerConfig.rdp.name }}"
+            settings:
+              clientProfileName: default
+              enabled: true
+            rest_consumers:
+              - name: "{{ deployment.azRDPFunction.brokerConfig.rdp.restConsumer.name }}"
+                settings:
+                  remoteHost: "{{ deployment.azRDPFunction.brokerConfig.rdp.restConsumer.host }}"
+                  remotePort: "{{ deployment.azRDPFunction.brokerConfig.rdp.restConsumer.port }}"
+                  tlsEnabled: true
+                  enabled: true
+                trusted_common_names:
+                  - "{{ deployment.azRDPFunction.brokerConfig.rdp.restConsumer.tlsOptions.trustedCommonName }}"
+            queue_bindings: "{{ deployment.azRDPFunction.brokerConfig.rdp.queueBindings }}"
+        exclusive: true
+        workers: 10
+'''
+
+RETURN = '''
+rest_delivery_points:
+    description: The rdps created, updated (with the delta), deleted and the errors per rdp
+    type: dict
+rest_consumers:
+    description: Same as rest_delivery_points, named <rdp>/<rest consumer>
+    type: dict
+trusted_common_names:
+    description: Same as rest_delivery_points, named <rdp>/<rest consumer>/<common name>
+    type: dict
+queue_bindings:
+    description: Same as rest_delivery_points, named <rdp>/<queue binding>
+    type: dict
+'''
+
+RDPS = 'rest_delivery_points'
+REST_CONSUMERS = 'rest_consumers'
+TRUSTED_COMMON_NAMES = 'trusted_common_names'
+QUEUE_BINDINGS = 'queue_bindings'
+
+
+class SolaceRdpTreeTask(su.SolaceBulkTask):
+
+    def __init__(self, module):
+        su.SolaceBulkTask.__init__(self, module)
+        for resource in [RDPS, REST_CONSUMERS, TRUSTED_COMMON_NAMES, QUEUE_BINDINGS]:
+            self.result[resource] = dict(created=[], updated=dict(), deleted=[], errors=dict())
+
+    def do_task(self):
+        vpn = self.module.params['msg_vpn']
+        rdp_path = [su.SEMP_V2_CONFIG, su.MSG_VPNS, vpn, su.RDP_REST_DELIVERY_POINTS]
+        rdps = self.module.params['rdps']
+        exclusive = self.module.params['exclusive']
+
+        # read the tree: all rdps, then consumers & bindings of the existing rdps, then their trusted common names
+        current_rdps = self.read_collection(rdp_path, 'restDeliveryPointName',
+                                            select=self.select('restDeliveryPointName', rdps))
+        existing = [rdp for rdp in rdps if rdp['name'] in current_rdps and rdp.get('state', 'present') == 'present']
+        reads = []
+        for rdp in existing:
+            reads.append([rdp_path + [rdp['name'], su.RDP_REST_CONSUMERS], 'restConsumerName',
+                          self.select('restConsumerName', rdp.get('rest_consumers'))])
+            reads.append([rdp_path + [rdp['name'], su.RDP_QUEUE_BINDINGS], 'queueBindingName',
+                          self.select('queueBindingName', rdp.get('queue_bindings'))])
+        current = self.read_all(reads)
+        consumers = dict((rdp['name'], current[2 * i]) for i, rdp in enumerate(existing))
+        bindings = dict((rdp['name'], current[2 * i + 1]) for i, rdp in enumerate(existing))
+        consumer_names = [(rdp_name, name) for rdp_name in consumers for name in consumers[rdp_name]]
+        current = self.read_all([[rdp_path + [rdp_name, su.RDP_REST_CONSUMERS, name, su.RDP_TLS_TRUSTED_COMMON_NAMES],
+                                  'tlsTrustedCommonName', ['tlsTrustedCommonName']] for rdp_name, name in consumer_names])
+        common_names = dict(zip(consumer_names, current))
+
+        # plan all levels
+        rdp_ops, child_ops, cn_ops, enable_ops = [], [], [], []
+        for rdp in rdps:
+            name = rdp['name']
+            path_array = rdp_path + [name]
+            if rdp.get('state', 'present') == 'absent':
+                if name in current_rdps:
+                    rdp_ops.append((RDPS, 'delete', name, path_array, None, None))
+                continue
+            mandatory = {'msgVpnName': vpn, 'restDeliveryPointName': name}
+            rdp_ops += self.plan_enableable(RDPS, name, rdp_path, path_array, mandatory, rdp.get('settings'),
+                                            current_rdps.get(name), False, None, enable_ops)
+            for consumer in rdp.get('rest_consumers') or []:
+                consumer_path = path_array + [su.RDP_REST_CONSUMERS, consumer['name']]
+                consumer_name = name + '/' + consumer['name']
+                current_consumer = consumers.get(name, {}).get(consumer['name'])
+                cn_path = consumer_path + [su.RDP_TLS_TRUSTED_COMMON_NAMES]
+                ops = self.plan_set(TRUSTED_COMMON_NAMES, consumer_name, cn_path, consumer.get('trusted_common_names') or [],
+                                    common_names.get((name, consumer['name']), {}), exclusive,
+                                    lambda cn, rdp_name=name, consumer=consumer['name']: {
+                                        'msgVpnName': vpn, 'restDeliveryPointName': rdp_name,
+                                        'restConsumerName': consumer, 'tlsTrustedCommonName': cn})
+                cn_ops += ops
+                mandatory = {'msgVpnName': vpn, 'restDeliveryPointName': name, 'restConsumerName': consumer['name']}
+                child_ops += self.plan_enableable(REST_CONSUMERS, consumer_name, path_array + [su.RDP_REST_CONSUMERS],
+                                                  consumer_path, mandatory, consumer.get('settings'), current_consumer,
+                                                  len(ops) > 0, name, enable_ops)
+            desired = self.desired_from_items(rdp.get('queue_bindings') or [])
+            ops, errors = self.plan(desired, bindings.get(name, {}), exclusive)
+            for key, error in errors.items():
+                self.add_error(self.result[QUEUE_BINDINGS], name + '/' + key, error)
+            for op, key, data in ops:
+                if op == 'create':
+                    data = su.merge_dicts({'msgVpnName': vpn, 'restDeliveryPointName': name, 'queueBindingName': key}, data)
+                child_ops.append((QUEUE_BINDINGS, op, name + '/' + key,
+                                  path_array + [su.RDP_QUEUE_BINDINGS] + ([] if op == 'create' else [key]), data, name))
+            if exclusive:
+                for key in consumers.get(name, {}):
+                    if key not in [c['name'] for c in rdp.get('rest_consumers') or []]:
+                        child_ops.append((REST_CONSUMERS, 'delete', name + '/' + key,
+                                          path_array + [su.RDP_REST_CONSUMERS, key], None, name))
+
+        # apply level by level, children of failed objects are skipped
+        failed = set(self.failed)
+        for ops in [rdp_ops, child_ops, cn_ops, enable_ops]:
+            self.run_level(ops, failed)
+        return self.finish()
+
+    def select(self, key, items):
+        """Attributes to read for the items: the key, enabled & all settings"""
+        select = set([key, 'enabled'])
+        for item in items or []:
+            select.update(item.get('settings') or [])
+        return sorted(select)
+
+    def read_all(self, reads):
+        """Read collections in parallel, reads: list of [path_array, key, select]. Returns list of CollectionIndex"""
+        responses = su.run_parallel(lambda path_array, key, select: su.read_index(self.solace_config, path_array, key, select),
+                                    reads, self.workers)
+        current = []
+        for ok, resp in responses:
+            if not ok:
+                self.module.fail_json(msg=resp, **self.result)
+            current.append(resp)
+        return current
+
+    def plan_enableable(self, resource, name, collection_path, path_array, mandatory, settings, current, children_changed,
+                        parent, enable_ops):
+        """Ops for an rdp / rest consumer.
+
+        Changes to an enabled object are sent with enabled=false in the same PATCH, enabling
+        is deferred to enable_ops so it happens after the children are configured.
+        """
+        settings = su._type_conversion(dict(settings or {}))
+        enable = settings.pop('enabled', None)
+        if current is None:
+            # create disabled, enable last
+            data = su.merge_dicts(mandatory, settings, {'enabled': False} if enable is not None else None)
+            if enable:
+                enable_ops.append((resource, 'enable', name, path_array, {'enabled': True}, parent))
+            return [(resource, 'create', name, collection_path, data, parent)]
+        bad_keys, delta = su.get_delta(settings, current)
+        if len(bad_keys):
+            self.add_error(self.result[resource], name, 'Invalid key(s): ' + ', '.join(bad_keys))
+            return []
+        enabled = current.get('enabled')
+        if enabled and (delta or children_changed or enable is False):
+            delta['enabled'] = False
+        if (enabled or enable) and enable is not False and (delta or not enabled):
+            enable_ops.append((resource, 'enable', name, path_array, {'enabled': True}, parent))
+        return [(resource, 'update', name, path_array, delta, parent)] if delta else []
+
+    def plan_set(self, resource, parent, collection_path, names, current, exclusive, mandatory):
+        """Ops for a set of objects without settings, e.g. trusted common names"""
+        ops = [(resource, 'create', parent + '/' + name, collection_path, mandatory(name), parent)
+               for name in names if name not in current]
+        if exclusive:
+            ops += [(resource, 'delete', parent + '/' + name, collection_path + [name], None, parent)
+                    for name in current if name not in names]
+        return ops
+
+    def run_level(self, ops, failed):
+        """Execute the ops of one level in parallel, skipping ops of failed objects and their children"""
+        skipped = [op for op in ops if op[5] in failed or op[2] in failed]
+        failed.update(op[2] for op in skipped)
+        ops = [op for op in ops if op not in skipped]
+        if not ops:
+            return
+        if self.module.check_mode:
+            responses = [(True, None)] * len(ops)
+        else:
+            responses = su.run_parallel(self.apply_op, ops, self.workers)
+        for (resource, op, name, path_array, data, parent), (ok, resp) in zip(ops, responses):
+            result = self.result[resource]
+            if not ok:
+                failed.add(name)
+                self.add_error(result, name, resp)
+                continue
+            self.result['changed'] = True
+            if op in ['update', 'enable']:
+                # do not return write-only settings, e.g. passwords
+                result['updated'].setdefault(name, dict()).update((k, '********' if k in su.WHITELIST else v) for k, v in data.items())
+            else:
+                result[op + 'd'].append(name)
+
+    def apply_op(self, resource, op, name, path_array, data, parent):
+        try:
+            if op == 'create':
+                return su.make_post_request(self.solace_config, path_array, data)
+            if op == 'delete':
+                return su.make_delete_request(self.solace_config, path_array)
+            return su.make_patch_request(self.solace_config, path_array, data)
+        except Exception as e:
+            return False, str(e)
+
+
+def run_module():
+    """Entrypoint to module"""
+    module_args = dict(
+        msg_vpn=dict(type='str', required=True),
+        rdps=dict(type='list', elements='dict', required=True),
+        exclusive=dict(type='bool', default=False),
+        host=dict(type='str', default='localhost'),
+        port=dict(type='int', default=8080),
+        secure_connection=dict(type='bool', default=False),
+        username=dict(type='str', default='admin'),
+        password=dict(type='str', default='admin', no_log=True),
+        timeout=dict(default='30', require=False),
+        x_broker=dict(type='str', default='')
+    )
+    module_args.update(su.transport_arg_spec())
+    module_args.update(su.bulk_arg_spec())
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+
+    solace_task = SolaceRdpTreeTask(module)
+    result = solace_task.do_task()
+
+    module.exit_json(**result)
+
+
+def main():
+    """Standard boilerplate"""
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
+
+###
+# The End.
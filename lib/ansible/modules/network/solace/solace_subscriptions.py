@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+"""Ansible-Solace Module for configuring all Subscriptions of Queues at once"""
+import ansible.module_utils.network.solace.solace_utils as su
+from ansible.module_utils.basic import AnsibleModule
+
+ANSIBLE_METADATA = {
+    'metadata_version': '0.1.0',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: solace_subscriptions
+
+short_description: Configure the list of topic subscriptions of one or more queues.
+
+description:
+    - "Bulk version of solace_subscription. Reads the existing subscriptions of each queue once using paged collection GETs,
+       computes the topics to add and remove and sends the required POST/DELETE calls, optionally in parallel."
+    - "Reference documentation: https://docs.solace.com/API-Developer-Online-Ref-Documentation/swagger-ui/config/index.html#/queue."
+
+options:
+    msg_vpn:
+        description:
+            - The message vpn the queues are on
+        required: true
+    queue:
+        description:
+            - The queue to configure the subscriptions of. Use together with topics.
+        required: false
+    topics:
+        description:
+            - List of subscription topics of queue
+        required: false
+    queues:
+        description:
+            - Dictionary of queue name -> list of subscription topics, alternative to queue & topics
+        required: false
+    exclusive:
+        description:
+            - Remove the subscriptions of the queue(s) that are not in the list(s). Only used with state=present.
+        required: false
+        default: false
+    state:
+        description:
+            - Target state of the listed subscriptions, present/absent
+        required: false
+    workers:
+        description:
+            - Number of POST/DELETE requests sent in parallel
+        required: false
+        default: 1
+    async_transport:
+        description:
+            - Send the requests of the workers with the asyncio (httpx) transport, multiplexed over HTTP/2 if the h2 package is installed.
+              Falls back to the default transport without httpx, with the httpapi connection or with auth_type session / oauth.
+        required: false
+        default: false
+    host:
+        description:
+            - Hostname of Solace Broker, default is "localhost"
+        required: false
+    port:
+        description:
+            - Management port of Solace Broker, default is 8080
+        required: false
+    secure_connection:
+        description:
+            - If true use https rather than http for querying
+        required: false
+    username:
+        description:
+            - Administrator username for Solace Broker, default is "admin"
+        required: false
+    password:
+        description:
+            - Administrator password for Solace Broker, default is "admin"
+        required: false
+    timeout:
+        description:
+            - Connection timeout when making requests, defaults to 10 (seconds)
+        required: false
+    x_broker:
+        description:
+            - Custom HTTP header with the broker virtual router id, if using a SMEPv2 Proxy/agent infrastructure
+        required: false
+
+author:
+    - Ricardo Gomez-Ulmke (ricardo.gomez-ulmke@solace.com)
+'''
+
+EXAMPLES = '''
+    - name: Set the subscriptions of a queue, removing all others
+      solace_subscriptions:
+        msg_vpn: foo
+        queue: q1
+        topics:
+          - a/b/c
+          - a/b/>
+        exclusive: true
+        workers: 10
+
+    - name: Add subscriptions to several queues
+      solace_subscriptions:
+        msg_vpn: foo
+        queues:
+          q1:
+            - x/y
+          q2:
+            - x/z
+'''
+
+RETURN = '''
+queues:
+    description: Per queue, the subscriptions created, deleted and the errors per subscription
+    type: dict
+'''
+
+
+class SolaceSubscriptionsTask(su.SolaceBulkTask):
+
+    LOOKUP_ITEM_KEY = 'subscriptionTopic'
+
+    def __init__(self, module):
+        su.SolaceBulkTask.__init__(self, module)
+
+    def do_task(self):
+        vpn = self.module.params['msg_vpn']
+        queues = self.module.params['queues'] or {self.module.params['queue']: self.module.params['topics']}
+        present = self.module.params['state'] == 'present'
+        self.result['queues'] = dict((queue, dict()) for queue in queues)
+
+        # read the current subscriptions of all queues
+        current = su.run_parallel(lambda queue: self.get_func(self.solace_config, vpn, queue),
+                                  [[queue] for queue in queues], self.workers)
+
+        # topics to add & remove across all queues, keyed by (queue, topic)
+        ops = []
+        for queue, (ok, resp) in zip(queues, current):
+            if not ok:
+                self.add_error(self.result['queues'][queue], queue, resp)
+                continue
+            topics = set(queues[queue] or [])
+            current_topics = resp.keys()
+            if present:
+                ops += [('create', (queue, topic), None) for topic in sorted(topics - current_topics)]
+                if self.module.params['exclusive']:
+                    ops += [('delete', (queue, topic), None) for topic in sorted(current_topics - topics)]
+            else:
+                ops += [('delete', (queue, topic), None) for topic in sorted(topics & current_topics)]
+
+        result = dict()
+        self.apply(
+            ops,
+            lambda key, settings: self.create_func(self.solace_config, vpn, *key),
+            None,
+            lambda key: self.delete_func(self.solace_config, vpn, *key),
+            result
+        )
+        for op in ['created', 'deleted']:
+            for queue, topic in result[op]:
+                self.result['queues'][queue].setdefault(op, []).append(topic)
+        for (queue, topic), error in result['errors'].items():
+            self.result['queues'][queue].setdefault('errors', dict())[topic] = error
+        return self.finish()
+
+    def get_func(self, solace_config, vpn, queue):
+        """Pull all Subscriptions of a Queue"""
+        # GET /msgVpns/{msgVpnName}/queues/{queueName}/subscriptions
+        path_array = [su.SEMP_V2_CONFIG, su.MSG_VPNS, vpn, su.QUEUES, queue, su.SUBSCRIPTIONS]
+        return su.read_index(solace_config, path_array, self.LOOKUP_ITEM_KEY, select=[self.LOOKUP_ITEM_KEY])
+
+    def create_func(self, solace_config, vpn, queue, topic):
+        """Create a Subscription for a Topic on a Queue"""
+        # POST /msgVpns/{msgVpnName}/queues/{queueName}/subscriptions
+        data = {
+            'subscriptionTopic': topic
+        }
+        path_array = [su.SEMP_V2_CONFIG, su.MSG_VPNS, vpn, su.QUEUES, queue, su.SUBSCRIPTIONS]
+        return su.make_post_request(solace_config, path_array, data)
+
+    def delete_func(self, solace_config, vpn, queue, topic):
+        """Delete a Subscription"""
+        # DELETE /msgVpns/{msgVpnName}/queues/{queueName}/subscriptions/{subscriptionTopic}
+        path_array = [su.SEMP_V2_CONFIG, su.MSG_VPNS, vpn, su.QUEUES, queue, su.SUBSCRIPTIONS, topic]
+        return su.make_delete_request(solace_config, path_array)
+
+
+def run_module():
+    """Entrypoint to module"""
+    module_args = dict(
+        msg_vpn=dict(type='str', required=True),
+        queue=dict(type='str', required=False),
+        topics=dict(type='list', elements='str', required=False),
+        queues=dict(type='dict', required=False),
+        exclusive=dict(type='bool', default=False),
+        state=dict(default='present', choices=['absent', 'present']),
+        host=dict(type='str', default='localhost'),
+        port=dict(type='int', default=8080),
+        secure_connection=dict(type='bool', default=False),
+        username=dict(type='str', default='admin'),
+        password=dict(type='str', default='admin', no_log=True),
+        timeout=dict(default='10', require=False),
+        x_broker=dict(type='str', default='')
+    )
+    module_args.update(su.transport_arg_spec())
+    module_args.update(su.bulk_arg_spec())
+    module = AnsibleModule(
+        argument_spec=module_args,
+        mutually_exclusive=[('queue', 'queues')],
+        required_one_of=[('queue', 'queues')],
+        required_together=[('queue', 'topics')],
+        supports_check_mode=True
+    )
+
+    solace_task = SolaceSubscriptionsTask(module)
+    result = solace_task.do_task()
+
+    module.exit_json(**result)
+
+
+def main():
+    """Standard boilerplate"""
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
+
+###
+# The End.
@@ -0,0 +1,60 @@
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+"""Action plugin running the solace_* modules on the controller instead of on the target host.
+
+Used for all solace_* modules with ANSIBLE_NETWORK_GROUP_MODULES=solace. The module runs inside the
+worker process forked for the task, saving the AnsiballZ packaging, the file transfer and the
+interpreter startup. The worker ends with the task, so pooled connections are not reused across tasks.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+
+import ansible.module_utils
+from ansible import constants as C
+from ansible.errors import AnsibleActionFail
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.plugins.action import ActionBase
+from ansible.plugins.loader import module_loader
+from ansible.utils.display import Display
+
+display = Display()
+
+
+class ActionModule(ActionBase):
+
+    TRANSFERS_FILES = False
+
+    @staticmethod
+    def import_solace_local():
+        """Import solace_local, making the ANSIBLE_MODULE_UTILS paths importable in the controller first.
+
+        Also used by the solace_loop action plugin.
+        """
+        for path in C.DEFAULT_MODULE_UTILS_PATH:
+            if os.path.isdir(path) and path not in ansible.module_utils.__path__:
+                ansible.module_utils.__path__.append(path)
+        import ansible.module_utils.network.solace.solace_local as solace_local
+        return solace_local
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp
+
+        # opt out, e.g. if the broker is only reachable from the target host
+        if not boolean((task_vars or dict()).get('solace_controller_execution', True), strict=False):
+            result.update(self._execute_module(module_name=self._task.action, task_vars=task_vars))
+            return result
+
+        path = module_loader.find_plugin(self._task.action, mod_type='.py')
+        if path is None:
+            raise AnsibleActionFail('module {} not found, check ANSIBLE_LIBRARY'.format(self._task.action))
+        solace_local = self.import_solace_local()
+        result.update(solace_local.run_module(path, self._task.args,
+                                              check_mode=self._play_context.check_mode,
+                                              socket_path=self._connection.socket_path,
+                                              verbosity=display.verbosity))
+        return result
@@ -0,0 +1,85 @@
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+"""Action plugin running a solace_* module for a list of items in the controller process."""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible.errors import AnsibleActionFail
+from ansible.plugins.action import ActionBase
+from ansible.plugins.loader import action_loader, module_loader
+from ansible.utils.display import Display
+
+DEFAULT_WORKERS = 10
+
+display = Display()
+
+
+def merge_args(common, item):
+    """Module arguments of an item: the common arguments overridden by the item's.
+
+    Dict arguments, e.g. settings, are merged key by key, as the common settings of solace_queues.
+    """
+    args = dict(common)
+    for key, value in item.items():
+        if isinstance(value, dict) and isinstance(args.get(key), dict):
+            merged = dict(args[key])
+            merged.update(value)
+            value = merged
+        args[key] = value
+    return args
+
+
+class ActionModule(ActionBase):
+
+    TRANSFERS_FILES = False
+    _VALID_ARGS = frozenset(('module', 'items', 'args', 'workers'))
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp
+
+        name = self._task.args.get('module')
+        items = self._task.args.get('items') or []
+        common = self._task.args.get('args') or dict()
+        workers = int(self._task.args.get('workers') or DEFAULT_WORKERS)
+        if not name or not name.startswith('solace_') or name == 'solace_loop':
+            raise AnsibleActionFail('module must be a solace_* module, got: {}'.format(name))
+        if not isinstance(items, list):
+            raise AnsibleActionFail('items must be a list')
+        path = module_loader.find_plugin(name, mod_type='.py')
+        if path is None:
+            raise AnsibleActionFail('module {} not found, check ANSIBLE_LIBRARY'.format(name))
+        # the solace action plugin is loaded from ANSIBLE_ACTION_PLUGINS by the plugin loader, it can not be imported
+        solace_action = action_loader.get('solace', class_only=True)
+        if solace_action is None:
+            raise AnsibleActionFail('action plugin solace not found, check ANSIBLE_ACTION_PLUGINS')
+        solace_local = solace_action.import_solace_local()
+
+        def run_item(item):
+            args = merge_args(common, item)
+            # all items share the pooled session of the broker, make it large enough for all workers
+            args['pool_size'] = max(int(args.get('pool_size') or 0), workers)
+            item_result = solace_local.run_module(path, args, check_mode=self._play_context.check_mode,
+                                                  socket_path=self._connection.socket_path, verbosity=display.verbosity)
+            item_result['item'] = item
+            item_result['ansible_loop_var'] = 'item'
+            return item_result
+
+        executor = ThreadPoolExecutor(max_workers=max(1, workers))
+        try:
+            results = list(executor.map(run_item, items))
+        finally:
+            executor.shutdown(wait=True)
+
+        result['results'] = results
+        result['changed'] = any(r.get('changed') for r in results)
+        if any(r.get('failed') for r in results):
+            result['failed'] = True
+            result['msg'] = 'One or more items failed'
+        else:
+            result['msg'] = 'All items completed'
+        return result
@@ -0,0 +1,210 @@
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+"""Callback plugin summarizing the SEMP requests of the solace_* tasks of a playbook run."""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = """
+---
+author: Ricardo Gomez-Ulmke (ricardo.gomez-ulmke@solace.com)
+callback: solace_profile
+type: aggregate
+short_description: Summary of the SEMP request latency of the solace_* tasks
+description:
+  - Collects the semp_stats of the solace_* task results and prints a summary at the end of the run,
+    the slowest endpoints (method & resource, e.g. GET msgVpns/*/queues), p50/p95/p99 per method and
+    resource, requests per broker and the time split between SEMP requests and the rest of the tasks.
+  - The SEMP time of a task is the wall clock time with at least one request in flight. Tasks running
+    solace_loop items in parallel are left out of the split and only counted.
+  - Enables semp_stats for the modules running on the controller (see the solace action plugin) by setting
+    ANSIBLE_SOLACE_SEMP_STATS=1. Modules running on the target hosts need the option semp_stats=true,
+    e.g. with module_defaults.
+requirements:
+  - enable in configuration, e.g. callbacks_enabled = solace_profile
+options:
+  output_file:
+    description: Write the summary as json to this file.
+    env:
+      - name: ANSIBLE_SOLACE_PROFILE_FILE
+    ini:
+      - section: callback_solace_profile
+        key: output_file
+    type: path
+  top:
+    description: Number of slowest endpoints to show.
+    default: 10
+    env:
+      - name: ANSIBLE_SOLACE_PROFILE_TOP
+    ini:
+      - section: callback_solace_profile
+        key: top
+    type: int
+"""
+
+import json
+import os
+import time
+
+from ansible.plugins.callback import CallbackBase
+
+# enables semp_stats in solace_utils, for the modules running in the controller process
+SEMP_STATS_ENV = 'ANSIBLE_SOLACE_SEMP_STATS'
+PERCENTILES = [0.5, 0.95, 0.99]
+
+
+def percentile(samples, p):
+    """p-th percentile (0..1) of the sorted samples, nearest rank"""
+    return samples[int(p * (len(samples) - 1))] if samples else 0.0
+
+
+class CallbackModule(CallbackBase):
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'solace_profile'
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self, display=None):
+        super(CallbackModule, self).__init__(display=display)
+        os.environ.setdefault(SEMP_STATS_ENV, '1')
+        self.start = time.time()
+        # (host, task uuid) -> start time
+        self.running = dict()
+        # (method, resource) -> dict(calls, seconds, samples: list of seconds)
+        self.endpoints = dict()
+        # broker -> dict(requests, seconds)
+        self.brokers = dict()
+        self.tasks = 0
+        # tasks with parallel solace_loop items, not in task_seconds / semp_seconds
+        self.parallel_tasks = 0
+        self.task_seconds = 0.0
+        self.semp_seconds = 0.0
+        self.requests = 0
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def v2_runner_on_start(self, host, task):
+        self.running[(host.get_name(), task._uuid)] = time.time()
+
+    def _collect(self, result):
+        start = self.running.pop((result._host.get_name(), result._task._uuid), None)
+        # loops (e.g. solace_loop) have the stats of each item
+        items = result._result.get('results')
+        stats = [item.get('semp_stats') for item in items if isinstance(item, dict)] if isinstance(items, list) else []
+        stats = [s for s in stats + [result._result.get('semp_stats')] if s]
+        if not stats:
+            return
+        self.tasks += 1
+        semp_seconds = self.busy_seconds(stats)
+        if semp_seconds is None:
+            self.parallel_tasks += 1
+        elif start is not None:
+            self.task_seconds += time.time() - start
+            self.semp_seconds += semp_seconds
+        for semp_stats in stats:
+            self._add(result._host.get_name(), semp_stats)
+
+    @staticmethod
+    def busy_seconds(stats):
+        """Wall clock time of a task with requests in flight, None if the requests of its items overlap"""
+        windows = sorted((s.get('started') or 0.0, s.get('finished') or 0.0) for s in stats if s.get('requests'))
+        for (_, finished), (started, _) in zip(windows, windows[1:]):
+            if started < finished:
+                return None
+        return sum(s.get('busy_seconds', s.get('seconds', 0.0)) for s in stats)
+
+    def _add(self, host, semp_stats):
+        broker = self.brokers.setdefault(semp_stats.get('broker') or host, dict(requests=0, seconds=0.0))
+        broker['requests'] += semp_stats.get('requests', 0)
+        broker['seconds'] += semp_stats.get('seconds', 0.0)
+        self.requests += semp_stats.get('requests', 0)
+        self.retries += semp_stats.get('retries', 0)
+        self.bytes_sent += semp_stats.get('bytes_sent', 0)
+        self.bytes_received += semp_stats.get('bytes_received', 0)
+        calls = semp_stats.get('calls', [])
+        # calls is a sample for tasks with many requests, each sampled call stands for weight requests
+        weight = float(semp_stats.get('requests', len(calls))) / len(calls) if calls else 0.0
+        for call in calls:
+            endpoint = self.endpoints.setdefault((call['method'], call['resource']), dict(calls=0.0, seconds=0.0, samples=[]))
+            endpoint['calls'] += weight
+            endpoint['seconds'] += weight * call['seconds']
+            endpoint['samples'].append(call['seconds'])
+
+    def v2_runner_on_ok(self, result):
+        self._collect(result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._collect(result)
+
+    @staticmethod
+    def _latency(calls, seconds, samples):
+        samples = sorted(samples)
+        latency = dict(calls=int(round(calls)), seconds=round(seconds, 4), max=samples[-1])
+        for p in PERCENTILES:
+            latency['p{}'.format(int(p * 100))] = percentile(samples, p)
+        return latency
+
+    def summary(self):
+        endpoints = []
+        methods = dict()
+        for (method, resource), counters in self.endpoints.items():
+            endpoint = dict(method=method, resource=resource)
+            endpoint.update(self._latency(**counters))
+            endpoints.append(endpoint)
+            totals = methods.setdefault(method, dict(calls=0.0, seconds=0.0, samples=[]))
+            totals['calls'] += counters['calls']
+            totals['seconds'] += counters['seconds']
+            totals['samples'].extend(counters['samples'])
+        endpoints.sort(key=lambda e: e['seconds'], reverse=True)
+        return dict(
+            playbook_seconds=round(time.time() - self.start, 3),
+            tasks=self.tasks,
+            parallel_tasks=self.parallel_tasks,
+            task_seconds=round(self.task_seconds, 3),
+            semp_seconds=round(self.semp_seconds, 3),
+            # time of the tasks not spent on SEMP requests: ansible, module execution, connection setup
+            ansible_seconds=round(max(0.0, self.task_seconds - self.semp_seconds), 3),
+            requests=self.requests,
+            retries=self.retries,
+            bytes_sent=self.bytes_sent,
+            bytes_received=self.bytes_received,
+            methods=dict((method, self._latency(**totals)) for method, totals in methods.items()),
+            brokers=dict((b, dict(requests=s['requests'], seconds=round(s['seconds'], 3))) for b, s in self.brokers.items()),
+            endpoints=endpoints
+        )
+
+    def v2_playbook_on_stats(self, stats):
+        summary = self.summary()
+        self._display.banner('SOLACE PROFILE')
+        if not summary['tasks']:
+            self._display.display('No semp_stats in the task results, see the semp_stats option of the solace modules.')
+            return
+        self._display.display('{tasks} solace tasks: {task_seconds:.2f}s, of which SEMP requests {semp_seconds:.2f}s, '
+                              'ansible & modules {ansible_seconds:.2f}s'.format(**summary))
+        if summary['parallel_tasks']:
+            self._display.display('{parallel_tasks} of them ran solace_loop items in parallel and are left out of the time split'.format(**summary))
+        self._display.display('{requests} requests, {retries} retries, {sent:.2f} MB sent, {received:.2f} MB received'.format(
+            sent=summary['bytes_sent'] / 1e6, received=summary['bytes_received'] / 1e6, **summary))
+        self._display.display('\nlatency per method:')
+        self._display.display('  {:<7} {:>7} {:>9} {:>8} {:>8} {:>8} {:>8}'.format('method', 'calls', 'total s', 'p50', 'p95', 'p99', 'max'))
+        for method, latency in sorted(summary['methods'].items()):
+            self._display.display('  {:<7} {calls:>7} {seconds:>9.2f} {p50:>8.3f} {p95:>8.3f} {p99:>8.3f} {max:>8.3f}'.format(method, **latency))
+        self._display.display('\nrequests per broker:')
+        for broker, counters in sorted(summary['brokers'].items(), key=lambda b: b[1]['requests'], reverse=True):
+            self._display.display('  {:<40} {:>8} {:>10.2f}s'.format(broker, counters['requests'], counters['seconds']))
+        self._display.display('\nslowest endpoints (total time):')
+        self._display.display('  {:<7} {:<50} {:>7} {:>9} {:>8} {:>8} {:>8} {:>8}'.format(
+            'method', 'resource', 'calls', 'total s', 'p50', 'p95', 'p99', 'max'))
+        top = self.get_option('top')
+        for e in summary['endpoints'][:top]:
+            self._display.display('  {method:<7} {resource:<50} {calls:>7} {seconds:>9.2f} {p50:>8.3f} {p95:>8.3f} {p99:>8.3f} {max:>8.3f}'.format(**e))
+        if len(summary['endpoints']) > top:
+            self._display.display('  ... {} more'.format(len(summary['endpoints']) - top))
+        output_file = self.get_option('output_file')
+        if output_file:
+            with open(output_file, 'w') as f:
+                json.dump(summary, f, indent=2)
+            self._display.display('\nsummary written to {}'.format(output_file))
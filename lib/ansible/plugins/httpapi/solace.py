@@ -0,0 +1,79 @@
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+"""HttpApi plugin keeping a persistent SEMP v2 connection to a Solace Broker."""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = """
+---
+author: Ricardo Gomez-Ulmke (ricardo.gomez-ulmke@solace.com)
+httpapi: solace
+short_description: HttpApi Plugin for Solace Brokers (SEMP v2)
+description:
+  - This HttpApi plugin holds one authenticated keep-alive connection per broker in the
+    persistent connection daemon, so all solace_* tasks of a play re-use the same socket.
+  - Broker connection details are taken from the httpapi connection variables
+    (ansible_host, ansible_httpapi_port, ansible_user, ansible_password, ansible_httpapi_use_ssl,
+    ansible_httpapi_validate_certs).
+  - Falls back to the connection's own (non keep-alive) transport if the python requests module is not installed.
+  - Used with ansible_connection=ansible.netcommon.httpapi and ansible_network_os=solace. Since Ansible 2.10 the
+    httpapi connection plugin is part of the ansible.netcommon collection, Ansible 2.9 ships it as httpapi.
+requirements:
+  - the ansible.netcommon collection (Ansible 2.10 and later), e.g. ansible-galaxy collection install ansible.netcommon
+version_added: "2.9"
+"""
+
+import json
+
+from ansible.module_utils._text import to_text
+from ansible.plugins.httpapi import HttpApiBase
+
+try:
+    import requests
+
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+
+class HttpApi(HttpApiBase):
+
+    def __init__(self, connection):
+        super(HttpApi, self).__init__(connection)
+        self._session = None
+        self._url = None
+
+    def _get_session(self):
+        if self._session is None:
+            use_ssl = self.connection.get_option('use_ssl')
+            port = self.connection.get_option('port') or (443 if use_ssl else 80)
+            self._url = ('https' if use_ssl else 'http') + '://' + self.connection.get_option('host') + ':' + str(port)
+            self._session = requests.Session()
+            self._session.auth = (self.connection.get_option('remote_user'), self.connection.get_option('password'))
+            self._session.verify = self.connection.get_option('validate_certs')
+        return self._session
+
+    def logout(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def send_request(self, data, path, method='GET', headers=None, timeout=None):
+        """Send a SEMP v2 request, returns (http status code, response body)."""
+        if HAS_REQUESTS:
+            resp = self._get_session().request(method, self._url + path, json=data, headers=headers, timeout=timeout)
+            return resp.status_code, resp.text
+
+        body = json.dumps(data) if data is not None else None
+        all_headers = {'Content-Type': 'application/json'}
+        all_headers.update(headers or {})
+        response, response_data = self.connection.send(path, body, method=method, headers=all_headers)
+        return response.getcode(), to_text(response_data.getvalue())
+
+    def handle_httperror(self, exc):
+        # SEMP reports errors (e.g. not found) in the body, let the modules parse it
+        if exc.code == 401:
+            return False
+        return exc
@@ -0,0 +1,74 @@
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+"""Fixtures of the unit tests: the repo's module_utils with the installed ansible and a simulated broker.
+
+Run from the repo root: python -m pytest -q test/units
+"""
+
+import os
+import sys
+
+import pytest
+
+import ansible.module_utils
+
+# make lib/ansible/module_utils and tools/semp_sim.py importable with the installed ansible
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+ansible.module_utils.__path__.append(os.path.join(ROOT, 'lib', 'ansible', 'module_utils'))
+sys.path.insert(0, os.path.join(ROOT, 'tools'))
+import ansible.module_utils.network.solace.solace_local as solace_local  # noqa: E402
+import ansible.module_utils.network.solace.solace_utils as su  # noqa: E402
+import semp_sim  # noqa: E402
+
+MODULES = os.path.join(ROOT, 'lib', 'ansible', 'modules', 'network', 'solace')
+
+
+@pytest.fixture(autouse=True)
+def state_files(tmp_path, monkeypatch):
+    """Keep the state files (circuit breaker, latency, credentials) and pooled sessions of a test to itself"""
+    monkeypatch.setenv('HOME', str(tmp_path))
+    for env in [su.CASSETTE_ENV, su.SEMP_LOG_ENV, su.SEMP_STATS_ENV]:
+        monkeypatch.delenv(env, raising=False)
+    su._CIRCUIT_BREAKERS.clear()
+    su._CASSETTES.clear()
+    su._CREDENTIALS.clear()
+    su.close_sessions()
+    yield tmp_path
+    su.close_sessions()
+
+
+@pytest.fixture(scope='session')
+def sim_server():
+    server = semp_sim.serve(semp_sim.Broker())
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def broker(sim_server):
+    """Fresh simulated broker with the 'default' vpn, broker.port is its http port"""
+    broker = semp_sim.Broker()
+    broker.port = sim_server.server_port
+    sim_server.RequestHandlerClass.broker = broker
+    return broker
+
+
+@pytest.fixture
+def run_module(broker, state_files):
+    """run_module(module_name, **args): run the solace module in-process against the broker, returns its result"""
+    def run(module_name, check_mode=False, **args):
+        args.setdefault('host', '127.0.0.1')
+        args.setdefault('port', broker.port)
+        args.setdefault('retries', 0)
+        args.setdefault('circuit_breaker_file', str(state_files / 'solace_circuit_breaker.json'))
+        return solace_local.run_module(os.path.join(MODULES, module_name + '.py'), args, check_mode=check_mode)
+    return run
+
+
+def solace_config(port, **kwargs):
+    """SolaceConfig for the simulated broker on port"""
+    kwargs.setdefault('vmr_timeout', 5)
+    kwargs.setdefault('retries', 0)
+    return su.SolaceConfig('127.0.0.1', port, ('admin', 'admin'), **kwargs)
@@ -0,0 +1,568 @@
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+import json
+import os
+import shutil
+import socket
+import stat
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+import semp_sim
+from conftest import solace_config
+
+import ansible.module_utils.network.solace.solace_utils as su
+
+
+# pooled sessions
+def test_get_session_is_shared_per_broker_and_credentials(broker):
+    config = solace_config(broker.port)
+    assert su.get_session(config) is su.get_session(solace_config(broker.port))
+    other = su.SolaceConfig('127.0.0.1', broker.port, ('other', 'secret'))
+    assert su.get_session(config) is not su.get_session(other)
+
+
+def test_requests_reuse_the_connection(broker):
+    config = solace_config(broker.port)
+    for _ in range(5):
+        ok, resp = su.make_get_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS, 'default'])
+        assert ok and resp['msgVpnName'] == 'default'
+    assert broker.stats['requests'] == 5
+    assert broker.stats['connections'] == 1
+
+
+def test_keep_alive_disabled_opens_a_connection_per_request(broker):
+    config = solace_config(broker.port, keep_alive=False)
+    for _ in range(3):
+        assert su.make_get_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS, 'default'])[0]
+    assert broker.stats['connections'] == 3
+
+
+# change detection & bulk planning
+class _Module(object):
+    """Minimal module for SolaceBulkTask"""
+
+    def __init__(self, **params):
+        self.params = dict(host='127.0.0.1', port=8080, secure_connection=False, username='admin', password='admin',
+                           timeout=5, x_broker='', circuit_breaker_threshold=0)
+        self.params.update(params)
+        self.check_mode = False
+
+
+def test_get_delta():
+    current = dict(egressEnabled=False, maxMsgSpoolUsage=100, owner='')
+    assert su.get_delta(dict(egressEnabled=True, maxMsgSpoolUsage=100), current) == ([], dict(egressEnabled=True))
+    assert su.get_delta(dict(egressEnabled=False), current) == ([], dict())
+    assert su.get_delta(dict(bogus=1, owner='me'), current) == (['bogus'], dict(owner='me'))
+
+
+def test_get_delta_always_sends_write_only_settings():
+    assert su.get_delta(dict(password='secret'), dict(enabled=True)) == ([], dict(password='secret'))
+
+
+def test_plan():
+    task = su.SolaceBulkTask(_Module())
+    current = dict(q1=dict(maxMsgSpoolUsage=100), q2=dict(maxMsgSpoolUsage=100), q3=dict(), q4=dict())
+    desired = dict(q1=dict(maxMsgSpoolUsage=100), q2=dict(maxMsgSpoolUsage=200), q3=False, q5=None,
+                   q6=dict(bogus=1), q4=dict(bogus=1))
+    ops, errors = task.plan(desired, current)
+    assert sorted(ops) == [('create', 'q5', None), ('create', 'q6', dict(bogus=1)), ('delete', 'q3', None),
+                           ('update', 'q2', dict(maxMsgSpoolUsage=200))]
+    assert errors == dict(q4='Invalid key(s): bogus')
+
+
+def test_plan_prune_keeps_matching_objects():
+    task = su.SolaceBulkTask(_Module())
+    current = dict(q1=dict(), q2=dict(), keep=dict())
+    ops, _ = task.plan(dict(q1=None), current, prune=True, keep=lambda key: key == 'keep')
+    assert ops == [('delete', 'q2', None)]
+
+
+@pytest.fixture
+def selects(broker):
+    """select query parameter of each GET the broker handled, None without"""
+    selects = []
+    handle = broker.handle
+
+    def logging_handle(method, path, query, body, host='localhost'):
+        if method == 'GET':
+            selects.append(query.get('select', [None])[0])
+        return handle(method, path, query, body, host)
+    broker.handle = logging_handle
+    return selects
+
+
+def test_change_detection_reads_only_the_compared_attributes(run_module, broker, selects):
+    broker.populate('msgVpns/default/queues', 1, name='q1', maxMsgSpoolUsage=100, egressEnabled=True)
+    result = run_module('solace_queue', msg_vpn='default', name='q1', settings=dict(maxMsgSpoolUsage=200, egressEnabled=True))
+    assert result['changed'] and result['delta'] == dict(maxMsgSpoolUsage=200)
+    assert selects == ['queueName,maxMsgSpoolUsage,egressEnabled']
+    # attributes the broker does not know are not returned by the projection either, and still reported
+    result = run_module('solace_queue', msg_vpn='default', name='q1', settings=dict(bogus=1))
+    assert result['failed'] and result['msg'] == 'Invalid key(s): bogus'
+    # state absent only needs the key, without settings the full object is the response
+    run_module('solace_queue', msg_vpn='default', name='q1')
+    run_module('solace_queue', msg_vpn='default', name='q1', state='absent')
+    assert selects[2:] == [None, 'queueName']
+
+
+# retries
+class _Response(object):
+
+    def __init__(self, status_code=503, headers=None):
+        self.status_code = status_code
+        self.headers = headers or dict()
+
+
+def unused_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """Records the retry delays instead of sleeping"""
+    delays = []
+    monkeypatch.setattr(su.time, 'sleep', delays.append)
+    return delays
+
+
+def test_connect_errors_are_retried_for_all_methods(no_sleep):
+    config = solace_config(unused_port(), retries=2)
+    for method in ['GET', 'POST', 'DELETE']:
+        ok, resp = su._make_request(method, config, [su.SEMP_V2_CONFIG, su.MSG_VPNS])
+        assert not ok and 'refused' in resp
+    assert len(no_sleep) == 6
+
+
+def test_reset_connections_are_retried_for_idempotent_methods_only(broker, no_sleep):
+    broker.reset_rate = 1.0
+    config = solace_config(broker.port, retries=2)
+    assert not su.make_post_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS, 'default', su.QUEUES], dict(queueName='q'))[0]
+    assert broker.stats['requests'] == 1
+    assert not su.make_delete_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS, 'default', su.QUEUES, 'q'])[0]
+    assert broker.stats['requests'] == 2
+    assert not su.make_get_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS, 'default'])[0]
+    assert broker.stats['requests'] == 5
+
+
+def test_is_retriable_error():
+    read_timeout = su.requests.exceptions.ReadTimeout()
+    assert su._is_retriable_error('GET', read_timeout)
+    assert su._is_retriable_error('PATCH', read_timeout)
+    assert not su._is_retriable_error('POST', read_timeout)
+    assert su._is_retriable_error('POST', su.requests.exceptions.ConnectTimeout())
+    assert not su._is_retriable_error('DELETE', su.requests.exceptions.ConnectionError('Connection aborted.'))
+
+
+def test_is_retriable_error_async():
+    httpx = pytest.importorskip('httpx')
+    solace_async = su.solace_async
+    assert solace_async._is_retriable_error('POST', httpx.ConnectError('refused'))
+    assert not solace_async._is_retriable_error('POST', httpx.ReadError('reset'))
+    assert not solace_async._is_retriable_error('DELETE', httpx.ReadTimeout('timeout'))
+    assert solace_async._is_retriable_error('GET', httpx.ReadError('reset'))
+
+
+def test_5xx_is_retried(broker, no_sleep):
+    broker.error_rate = 1.0
+    ok, resp = su.make_post_request(solace_config(broker.port, retries=3), [su.SEMP_V2_CONFIG, su.MSG_VPNS], dict())
+    assert not ok and resp['responseCode'] == 503
+    assert broker.stats['requests'] == 4
+
+
+def test_retry_delay():
+    config = solace_config(8080, retries=3, retry_backoff=1.0)
+    assert 0 <= su._retry_delay(config, 2, None) <= 4.0
+    assert su._retry_delay(config, 3, None) is None
+    assert su._retry_delay(config, 0, _Response(headers={'Retry-After': '5'})) == 5.0
+    # Retry-After is capped
+    assert su._retry_delay(config, 0, _Response(headers={'Retry-After': '3600'})) == su.MAX_RETRY_BACKOFF
+    config.retry_backoff = 3600.0
+    assert su._retry_delay(config, 0, None) <= su.MAX_RETRY_BACKOFF
+
+
+def test_no_retry_beyond_the_deadline():
+    config = solace_config(8080, retries=3, deadline=2)
+    assert su._retry_delay(config, 0, _Response(headers={'Retry-After': '1'})) == 1.0
+    assert su._retry_delay(config, 0, _Response(headers={'Retry-After': '10'})) is None
+
+
+# adaptive timeouts
+def test_adaptive_read_timeout_from_the_latency_file(broker, state_files):
+    path = str(state_files / 'solace_latency.json')
+    config = solace_config(broker.port, latency_stats=su.get_latency_stats(path))
+    endpoint = 'GET msgVpns/*/queues'
+    for i in range(su.ADAPTIVE_TIMEOUT_MIN_SAMPLES):
+        # the configured timeout until enough requests of the endpoint were observed
+        assert su._attempt_timeout(config, endpoint) == 5.0
+        assert su.make_get_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS, 'default', su.QUEUES])[0]
+    # fast broker: 2 * p99 + 1s
+    timeout = su._attempt_timeout(config, endpoint)
+    assert su.ADAPTIVE_TIMEOUT_MIN <= timeout < 1.5
+    assert su._attempt_timeout(config, 'GET msgVpns/*/topicEndpoints') == 5.0
+    samples = json.load(open(path))[config.vmr_url][endpoint]
+    assert len(samples) == su.ADAPTIVE_TIMEOUT_MIN_SAMPLES
+
+    # another module process reads the samples from the file, a slow response times out after the adaptive timeout
+    broker.latency = 1.5
+    config = solace_config(broker.port, latency_stats=su.LatencyStats(path))
+    assert su._attempt_timeout(config, endpoint) == timeout
+    ok, resp = su.make_get_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS, 'default', su.QUEUES])
+    assert not ok and 'timed out' in resp
+    config.latency_stats.flush()
+    # recorded with the timeout as duration
+    assert json.load(open(path))[config.vmr_url][endpoint][-1] == pytest.approx(timeout, abs=1e-4)
+
+
+# circuit breaker
+def test_circuit_breaker_opens_and_resets(state_files):
+    path = str(state_files / 'breaker.json')
+    breaker = su.CircuitBreaker(path, 2, 30)
+    breaker.record('http://a:8080', False)
+    breaker.check('http://a:8080')
+    breaker.record('http://a:8080', False)
+    with pytest.raises(su.CircuitOpenError):
+        breaker.check('http://a:8080')
+    # other brokers are not affected, other processes see the state in the file
+    breaker.check('http://b:8080')
+    with pytest.raises(su.CircuitOpenError):
+        su.CircuitBreaker(path, 2, 30).check('http://a:8080')
+    breaker.record('http://a:8080', True)
+    breaker.check('http://a:8080')
+    assert json.load(open(path)) == dict()
+
+
+def test_circuit_breaker_lets_one_probe_through(state_files):
+    breaker = su.CircuitBreaker(str(state_files / 'breaker.json'), 1, 30)
+    breaker.record('http://a:8080', False)
+
+    def expire(state, url):
+        state[url]['opened'] -= 31
+    breaker._file.update(expire, 'http://a:8080')
+    breaker.check('http://a:8080')
+    with pytest.raises(su.CircuitOpenError):
+        breaker.check('http://a:8080')
+
+
+def test_circuit_breaker_counts_requests_not_attempts(state_files, no_sleep):
+    path = str(state_files / 'breaker.json')
+    config = solace_config(unused_port(), retries=2, circuit_breaker=su.CircuitBreaker(path, 3, 30))
+    for failures in [1, 2, 3]:
+        ok, resp = su.make_post_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS], dict())
+        assert not ok and 'refused' in resp
+        assert json.load(open(path))[config.vmr_url]['failures'] == failures
+    assert len(no_sleep) == 6
+    ok, resp = su.make_get_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS])
+    assert not ok and resp.startswith('circuit breaker open')
+    assert len(no_sleep) == 6
+
+
+def test_circuit_breaker_ignores_broker_errors(broker, state_files):
+    breaker = su.CircuitBreaker(str(state_files / 'breaker.json'), 1, 30)
+    config = solace_config(broker.port, circuit_breaker=breaker)
+    broker.error_rate = 1.0
+    assert not su.make_get_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS])[0]
+    broker.error_rate = 0.0
+    assert su.make_get_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS])[0]
+
+
+# session & oauth authentication
+class _TokenHandler(BaseHTTPRequestHandler):
+
+    tokens = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8'))
+        self.tokens.append(form)
+        out = json.dumps(dict(access_token='token-{}'.format(len(self.tokens)), expires_in=3600)).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+
+@pytest.fixture
+def token_server():
+    """OAuth token endpoint, the token requests' forms are in token_server.tokens"""
+    handler = type('Handler', (_TokenHandler,), dict(tokens=[]))
+    server = HTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    server.tokens = handler.tokens
+    server.url = 'http://127.0.0.1:{}/token'.format(server.server_port)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def oauth_config(port, token_server, credentials_file=None):
+    return solace_config(port, auth_type='oauth', oauth=dict(token_url=token_server.url, client_id='ansible',
+                                                             client_secret='secret', scope=None),
+                         credentials=su.get_credentials(credentials_file))
+
+
+def test_oauth_token_is_requested_once_and_cached(broker, token_server, state_files):
+    path = str(state_files / 'solace_credentials.json')
+    resp = su._send_request('GET', oauth_config(broker.port, token_server, path), '/SEMP/v2/config/msgVpns')
+    assert resp.status_code == 200
+    assert resp.request.headers['Authorization'] == 'Bearer token-1'
+    assert token_server.tokens == [dict(grant_type=['client_credentials'], client_id=['ansible'], client_secret=['secret'])]
+    # a new module process takes the token from the credentials file
+    su.close_sessions()
+    su._CREDENTIALS.clear()
+    resp = su._send_request('GET', oauth_config(broker.port, token_server, path), '/SEMP/v2/config/msgVpns')
+    assert resp.request.headers['Authorization'] == 'Bearer token-1'
+    assert len(token_server.tokens) == 1
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert 'secret' not in open(path).read()
+
+
+def test_oauth_token_is_kept_in_memory_without_credentials_file(broker, token_server, state_files):
+    su._send_request('GET', oauth_config(broker.port, token_server), '/SEMP/v2/config/msgVpns')
+    su.close_sessions()
+    resp = su._send_request('GET', oauth_config(broker.port, token_server), '/SEMP/v2/config/msgVpns')
+    assert resp.request.headers['Authorization'] == 'Bearer token-1'
+    assert len(token_server.tokens) == 1
+    # nothing written to disk, a new module process requests a new token
+    assert not [p for p in state_files.rglob('*') if 'credentials' in p.name]
+    su.close_sessions()
+    su._CREDENTIALS.clear()
+    resp = su._send_request('GET', oauth_config(broker.port, token_server), '/SEMP/v2/config/msgVpns')
+    assert resp.request.headers['Authorization'] == 'Bearer token-2'
+
+
+def test_oauth_token_is_renewed_on_401(broker, token_server):
+    broker.auth = ('admin', 'admin')
+    resp = su._send_request('GET', oauth_config(broker.port, token_server), '/SEMP/v2/config/msgVpns')
+    # sent once more with a new token
+    assert resp.status_code == 401 and len(resp.history) == 1
+    assert resp.request.headers['Authorization'] == 'Bearer token-2'
+    assert len(token_server.tokens) == 2
+
+
+def test_bearer_token(broker):
+    resp = su._send_request('GET', solace_config(broker.port, auth_type='oauth', bearer_token='abc'), '/SEMP/v2/config/msgVpns')
+    assert resp.request.headers['Authorization'] == 'Bearer abc'
+
+
+def test_session_auth_sends_basic_auth_without_cookie(broker):
+    broker.auth = ('admin', 'admin')
+    assert su.make_get_request(solace_config(broker.port, auth_type='session'), [su.SEMP_V2_CONFIG, su.MSG_VPNS])[0]
+
+
+def test_oauth_requires_token_or_oauth(run_module):
+    result = run_module('solace_queue', msg_vpn='default', name='q1', auth_type='oauth')
+    assert result['failed'] and "requires 'bearer_token' or 'oauth'" in result['msg']
+    result = run_module('solace_queue', msg_vpn='default', name='q1', auth_type='oauth', oauth=dict(client_id='ansible'))
+    assert result['failed'] and 'token_url' in result['msg'] and 'client_secret' in result['msg']
+
+
+# tls session resumption
+@pytest.fixture(scope='module')
+def certificate(tmp_path_factory):
+    """Self-signed certificate for 127.0.0.1: certfile, keyfile"""
+    if shutil.which('openssl') is None:
+        pytest.skip('openssl not installed')
+    path = tmp_path_factory.mktemp('tls')
+    certfile, keyfile = str(path / 'cert.pem'), str(path / 'key.pem')
+    subprocess.check_call(['openssl', 'req', '-x509', '-newkey', 'ec', '-pkeyopt', 'ec_paramgen_curve:prime256v1', '-nodes',
+                           '-days', '1', '-subj', '/CN=127.0.0.1', '-addext', 'subjectAltName=IP:127.0.0.1',
+                           '-keyout', keyfile, '-out', certfile], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return certfile, keyfile
+
+
+@pytest.fixture
+def tls_broker(broker, certificate):
+    """The broker served over https with the certificate, broker.certfile"""
+    certfile, keyfile = certificate
+    server = semp_sim.serve(broker, certfile=certfile, keyfile=keyfile)
+    broker.port = server.server_port
+    broker.certfile = certfile
+    yield broker
+    server.shutdown()
+    server.server_close()
+
+
+def test_untrusted_certificate_fails_the_request(tls_broker):
+    config = solace_config(tls_broker.port, vmr_secure=True)
+    for _ in range(2):
+        ok, resp = su.make_get_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS])
+        assert not ok and 'CERTIFICATE_VERIFY_FAILED' in resp
+    assert config.tls_stats['handshakes'] == 0
+
+
+def test_tls_sessions_are_resumed(tls_broker):
+    config = solace_config(tls_broker.port, vmr_secure=True, keep_alive=False)
+    su.get_session(config).get_adapter('https://').ssl_context.load_verify_locations(tls_broker.certfile)
+    for _ in range(3):
+        assert su.make_get_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS])[0]
+    assert config.tls_stats['handshakes'] == 3
+    assert config.tls_stats['resumed'] >= 1
+
+
+# collection index
+def test_collection_index():
+    index = su.CollectionIndex('queueName', ['queueName', 'egressEnabled', 'owner'])
+    index.add(dict(queueName='q1', egressEnabled=True, owner='me', accessType='exclusive'))
+    index.add(dict(queueName='q2', egressEnabled=False))
+    assert len(index) == 2 and 'q1' in index and 'q3' not in index
+    assert sorted(index) == ['q1', 'q2'] and set(['q1', 'q3']) - index.keys() == set(['q3'])
+    assert index['q1'] == dict(egressEnabled=True, owner='me')
+    # attributes the broker did not return are left out
+    assert index.get('q2') == dict(egressEnabled=False)
+    assert index.get('q3') is None
+    assert index.delta('q1', dict(egressEnabled=False, owner='me')) == ([], dict(egressEnabled=False))
+    assert index.delta('q2', dict(owner='me', accessType='x', password='secret')) == (['owner', 'accessType'],
+                                                                                       dict(password='secret'))
+
+
+def test_collection_index_composite_key_and_all_fields():
+    index = su.CollectionIndex(['topicSyntax', 'publishExceptionTopic'])
+    index.add(dict(topicSyntax='smf', publishExceptionTopic='a/>', aclProfileName='p1'))
+    assert list(index) == ['smf,a/>']
+    assert index['smf,a/>'] == dict(topicSyntax='smf', publishExceptionTopic='a/>', aclProfileName='p1')
+    assert index.delta('smf,a/>', dict(aclProfileName='p2')) == ([], dict(aclProfileName='p2'))
+
+
+def test_collection_index_invalid_field_names():
+    index = su.CollectionIndex('queueName', ['queueName', 'max-spool', 'maxMsgSpoolUsage', '__class__'])
+    index.add(dict(queueName='q1', maxMsgSpoolUsage=100))
+    assert index['q1'] == dict(maxMsgSpoolUsage=100)
+    assert index.delta('q1', {'max-spool': 1, '__class__': 1}) == (['max-spool', '__class__'], dict())
+
+
+# cassettes
+def test_cassette_replays_without_broker(broker, state_files, no_sleep):
+    path = str(state_files / 'cassette.jsonl')
+    broker.populate('msgVpns/default/queues', 25)
+    broker.error_rate = 0.5
+    config = solace_config(broker.port, retries=5, cassette=su.Cassette(path, 'record'))
+    recorded = [su.get_collection(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS, 'default', su.QUEUES], count=10),
+                su.make_post_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS, 'default', su.QUEUES], dict(queueName='q')),
+                su.make_patch_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS, 'default', su.QUEUES, 'q'], dict(owner='me'))]
+    requests_sent, retries = broker.stats['requests'], len(no_sleep)
+    assert broker.stats['errors'] > 0 and all(ok for ok, resp in recorded)
+    assert sum(1 for _ in open(path)) == requests_sent
+
+    # no broker on the port of the recording
+    config = solace_config(broker.port, retries=5, cassette=su.Cassette(path, 'replay', 0))
+    broker.port = unused_port()
+    replayed = [su.get_collection(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS, 'default', su.QUEUES], count=10),
+                su.make_post_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS, 'default', su.QUEUES], dict(queueName='q')),
+                su.make_patch_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS, 'default', su.QUEUES, 'q'], dict(owner='me'))]
+    assert replayed == recorded
+    assert len(no_sleep) == 2 * retries
+    assert broker.stats['requests'] == requests_sent
+
+
+def test_cassette_replays_connect_errors_with_retries(state_files, no_sleep):
+    path = str(state_files / 'cassette.jsonl')
+    port = unused_port()
+    config = solace_config(port, retries=2, cassette=su.Cassette(path, 'record'))
+    ok, recorded = su.make_post_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS], dict())
+    assert not ok and len(no_sleep) == 2
+    assert [json.loads(line).get('connect_error') for line in open(path)] == [True, True, True]
+
+    config = solace_config(port, retries=2, cassette=su.Cassette(path, 'replay', 0))
+    assert su.make_post_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS], dict()) == (False, recorded)
+    assert len(no_sleep) == 4
+
+
+def test_cassette_fails_unrecorded_requests(state_files):
+    path = state_files / 'cassette.jsonl'
+    path.write_text('')
+    config = solace_config(8080, cassette=su.Cassette(str(path), 'replay', 0))
+    ok, resp = su.make_get_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS])
+    assert not ok and resp.startswith('no recorded response for GET /SEMP/v2/config/msgVpns')
+
+
+# semp log
+def test_semp_log_redacts_credentials(broker):
+    broker.populate('msgVpns/default/clientUsernames', 1, name='svc-1', oauthToken='token-1')
+    config = solace_config(broker.port, semp_log=su.SempLog(size=2))
+    su.make_get_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS, 'default', su.CLIENT_USERNAMES, 'svc-1'])
+    data = dict(clientUsername='svc-2', password='secret', nested=[dict(clientSecret='secret', name='a')])
+    su.make_post_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS, 'default', su.CLIENT_USERNAMES], data)
+    get, post = config.semp_log.records()
+    assert get['response']['data'] == dict(clientUsername='svc-1', oauthToken='********', aclProfileName='default',
+                                           clientProfileName='default', enabled=False, msgVpnName='default',
+                                           guaranteedEndpointPermissionOverrideEnabled=False, subscriptionManagerEnabled=False)
+    assert post['request'] == dict(clientUsername='svc-2', password='********', nested=[dict(clientSecret='********', name='a')])
+    # the request body of the caller is not changed
+    assert data['password'] == 'secret'
+    # a ring buffer of the last requests
+    su.make_get_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS, 'default'])
+    assert [r['method'] for r in config.semp_log.records()] == ['POST', 'GET']
+
+
+def test_semp_log_of_failed_task(run_module, broker, monkeypatch):
+    monkeypatch.setenv(su.SEMP_LOG_ENV, '1')
+    result = run_module('solace_client', msg_vpn='default', name='svc-1', settings=dict(password='secret', bogus=1))
+    assert result['failed']
+    assert [(r['method'], r['status']) for r in result['semp_log']] == [('GET', 400), ('POST', 400)]
+    assert result['semp_log'][1]['request']['password'] == '********'
+    assert 'secret' not in json.dumps(result)
+    # only failed tasks return the log
+    assert 'semp_log' not in run_module('solace_client', msg_vpn='default', name='svc-1')
+
+
+# semp stats
+def test_semp_stats_counters(broker, no_sleep):
+    config = solace_config(broker.port, semp_stats=su.SempStats())
+    queues = [su.SEMP_V2_CONFIG, su.MSG_VPNS, 'default', su.QUEUES]
+    su.make_post_request(config, queues, dict(queueName='q1'))
+    su.make_get_request(config, queues + ['q1'])
+    su.make_get_request(config, queues + ['nope'])
+    stats = config.semp_stats.result()
+    assert stats['broker'] is None and stats['requests'] == 3
+    assert (stats['methods']['POST']['calls'], stats['methods']['GET']['calls']) == (1, 2)
+    assert stats['bytes_sent'] == len(su.json_dumps(dict(queueName='q1')))
+    assert stats['bytes_received'] > 0
+    # one keep-alive connection for all requests, broker errors are not transport errors
+    assert (stats['connections'], stats['connection_reuse'], stats['retries'], stats['errors']) == (1, 2, 0, 0)
+    assert [(c['method'], c['resource'], c['status']) for c in stats['calls']] == [
+        ('POST', 'msgVpns/*/queues', 200), ('GET', 'msgVpns/*/queues/*', 200), ('GET', 'msgVpns/*/queues/*', 400)]
+    assert stats['seconds'] == pytest.approx(sum(c['seconds'] for c in stats['calls']), abs=1e-3)
+
+    # each attempt is counted, a failed connect as a connection and an error
+    config = solace_config(unused_port(), retries=1, semp_stats=su.SempStats())
+    assert not su.make_get_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS])[0]
+    stats = config.semp_stats.result()
+    assert (stats['requests'], stats['retries'], stats['errors'], stats['connections'], stats['connection_reuse']) == (2, 1, 2, 2, 0)
+    assert [c['status'] for c in stats['calls']] == [None, None]
+
+
+def test_semp_stats_busy_seconds_is_the_union_of_parallel_requests(broker):
+    broker.latency = 0.2
+    config = solace_config(broker.port, semp_stats=su.SempStats())
+    su.run_parallel(lambda i: su.make_get_request(config, [su.SEMP_V2_CONFIG, su.MSG_VPNS, 'default']), [(i,) for i in range(4)], workers=4)
+    stats = config.semp_stats.result()
+    assert stats['requests'] == 4 and stats['seconds'] >= 0.8
+    assert 0.2 <= stats['busy_seconds'] < 0.6
+    assert stats['finished'] - stats['started'] == pytest.approx(stats['busy_seconds'], abs=0.01)
+
+
+def test_semp_stats_samples_the_calls(monkeypatch):
+    monkeypatch.setattr(su, 'SEMP_STATS_MAX_CALLS', 10)
+    stats = su.SempStats()
+    for i in range(1000):
+        stats.add('GET', '/SEMP/v2/config/msgVpns/vpn{}'.format(i), None, 0.001 * i)
+    result = stats.result()
+    assert result['requests'] == 1000 and len(result['calls']) == 10
+    assert result['max_seconds'] == 0.999
+    # a uniform sample of all requests, not the first ones
+    assert max(c['seconds'] for c in result['calls']) > 0.1
@@ -0,0 +1,57 @@
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+import pytest
+
+PROFILE = ('msgVpns', 'default', 'aclProfiles', 'p1')
+
+
+@pytest.fixture
+def profile(broker):
+    broker.populate('msgVpns/default/aclProfiles', 1, name='p1')
+
+
+def test_create_and_rerun(run_module, broker, profile):
+    args = dict(msg_vpn='default', acl_profile_name='p1', publish_topic_exceptions=dict(smf=['a/>'], mqtt=['a/#']),
+                client_connect_exceptions=['10.0.0.0/8'], workers=4)
+    result = run_module('solace_acl_exceptions', **args)
+    assert result['changed'] and result['api'] == 'current'
+    assert sorted(result['publish_topic_exceptions']['created']) == ['mqtt,a/#', 'smf,a/>']
+    assert result['client_connect_exceptions'] == dict(created=['10.0.0.0/8'])
+    assert sorted(broker.store[PROFILE + ('publishTopicExceptions',)]) == ['mqtt,a/#', 'smf,a/>']
+
+    assert not run_module('solace_acl_exceptions', **args)['changed']
+
+
+def test_exclusive_keeps_unmanaged_syntax(run_module, broker, profile):
+    # the first key attribute is the syntax
+    for syntax, topic in [('smf', 'old/0'), ('smf', 'old/1'), ('mqtt', 'keep/#')]:
+        broker.populate('/'.join(PROFILE + ('subscribeTopicExceptions',)), 1, name=syntax, subscribeTopicException=topic)
+    result = run_module('solace_acl_exceptions', msg_vpn='default', acl_profile_name='p1',
+                        subscribe_topic_exceptions=dict(smf=['old/1']), exclusive=True)
+    assert result['subscribe_topic_exceptions'] == dict(deleted=['smf,old/0'])
+    assert sorted(broker.store[PROFILE + ('subscribeTopicExceptions',)]) == ['mqtt,keep/#', 'smf,old/1']
+
+
+def test_deprecated_api(run_module, broker, profile):
+    result = run_module('solace_acl_exceptions', msg_vpn='default', acl_profile_name='p1', api='deprecated',
+                        publish_topic_exceptions=dict(smf=['a/>']))
+    assert result['api'] == 'deprecated' and result['changed']
+    assert list(broker.store[PROFILE + ('publishExceptions',)]) == ['smf,a/>']
+
+
+def test_missing_profile_fails_unchanged(run_module, broker):
+    result = run_module('solace_acl_exceptions', msg_vpn='default', acl_profile_name='p1',
+                        client_connect_exceptions=['10.0.0.0/8'])
+    assert result['failed'] and not result['changed']
+
+
+def test_delete_mqtt_wildcard_topics(run_module, broker, profile):
+    # '#' and '?' are url encoded in the path of the DELETE, not taken for a fragment / query
+    for topic in ['a/b/#', 'c?/#']:
+        broker.populate('/'.join(PROFILE + ('publishTopicExceptions',)), 1, name='mqtt', publishTopicException=topic)
+    result = run_module('solace_acl_exceptions', msg_vpn='default', acl_profile_name='p1',
+                        publish_topic_exceptions=dict(mqtt=['d/#']), exclusive=True)
+    assert not result.get('failed')
+    assert sorted(result['publish_topic_exceptions']['deleted']) == ['mqtt,a/b/#', 'mqtt,c?/#']
+    assert list(broker.store[PROFILE + ('publishTopicExceptions',)]) == ['mqtt,d/#']
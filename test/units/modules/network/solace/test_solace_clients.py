@@ -0,0 +1,60 @@
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+import json
+
+import pytest
+
+CLIENTS = ('msgVpns', 'default', 'clientUsernames')
+
+
+@pytest.fixture
+def passwords_sent(broker):
+    """clientUsername -> passwords sent to the broker, in order"""
+    sent = dict()
+    handle = broker.handle
+
+    def logging_handle(method, path, query, body, host='localhost'):
+        if body and 'password' in body:
+            sent.setdefault(body.get('clientUsername') or path.rsplit('/', 1)[-1], []).append(body['password'])
+        return handle(method, path, query, body, host)
+    broker.handle = logging_handle
+    return sent
+
+
+def test_create_rerun_update_delete(run_module, broker, passwords_sent):
+    clients = [dict(name='svc-1', password='secret-1'), dict(name='svc-2', password='secret-2', settings=dict(enabled=False))]
+    result = run_module('solace_clients', msg_vpn='default', clients=clients, settings=dict(aclProfileName='default'), workers=2)
+    assert result['changed'] and not result.get('failed')
+    assert sorted(result['clients']['created']) == ['svc-1', 'svc-2']
+    assert broker.store[CLIENTS]['svc-1']['enabled'] is True and broker.store[CLIENTS]['svc-2']['enabled'] is False
+    assert passwords_sent == {'svc-1': ['secret-1'], 'svc-2': ['secret-2']}
+    # the passwords are not logged
+    assert 'secret' not in json.dumps(result)
+
+    # update_password: on_create, the passwords of existing client usernames are not sent again
+    result = run_module('solace_clients', msg_vpn='default', clients=clients, settings=dict(aclProfileName='default'))
+    assert not result['changed']
+    assert broker.stats['methods'] == dict(GET=2, POST=2)
+
+    clients[1]['settings']['enabled'] = True
+    clients.append(dict(name='svc-1', state='absent'))
+    result = run_module('solace_clients', msg_vpn='default', clients=clients[1:])
+    assert result['clients']['updated'] == {'svc-2': dict(enabled=True)}
+    assert result['clients']['deleted'] == ['svc-1']
+    assert sorted(broker.store[CLIENTS]) == ['svc-2']
+
+
+def test_update_password_always(run_module, broker, passwords_sent):
+    broker.populate('/'.join(CLIENTS), 1, name='svc-1')
+    result = run_module('solace_clients', msg_vpn='default', clients=[dict(name='svc-1', password='new')], update_password='always')
+    assert result['changed']
+    assert result['clients']['updated'] == {'svc-1': dict(password='********')}
+    assert passwords_sent == {'svc-1': ['new']}
+
+
+def test_password_in_settings_fails(run_module, broker):
+    result = run_module('solace_clients', msg_vpn='default', clients=[dict(name='svc-1', settings=dict(password='secret'))])
+    assert result['failed'] and not result['changed']
+    assert "item's 'password'" in result['msg'] and 'secret' not in json.dumps(result)
+    assert broker.stats['requests'] == 0
@@ -0,0 +1,98 @@
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+import pytest
+
+QUEUES = ('msgVpns', 'default', 'queues')
+
+
+def test_create_rerun_update_delete(run_module, broker):
+    queues = [dict(name='q1'), dict(name='q2', settings=dict(maxMsgSpoolUsage=100))]
+    result = run_module('solace_queues', msg_vpn='default', queues=queues, settings=dict(egressEnabled=True))
+    assert result['changed'] and not result.get('failed')
+    assert sorted(result['queues']['created']) == ['q1', 'q2']
+    assert broker.store[QUEUES]['q2']['maxMsgSpoolUsage'] == 100
+    assert broker.store[QUEUES]['q1']['egressEnabled'] is True
+
+    result = run_module('solace_queues', msg_vpn='default', queues=queues, settings=dict(egressEnabled=True))
+    assert not result['changed']
+
+    queues[1]['settings']['maxMsgSpoolUsage'] = 200
+    queues.append(dict(name='q1', state='absent'))
+    result = run_module('solace_queues', msg_vpn='default', queues=queues[1:])
+    assert result['changed']
+    assert result['queues']['updated'] == dict(q2=dict(maxMsgSpoolUsage=200))
+    assert result['queues']['deleted'] == ['q1']
+    assert sorted(broker.store[QUEUES]) == ['q2']
+
+
+def test_prune_keeps_system_queues(run_module, broker):
+    broker.populate('/'.join(QUEUES), 3, name='old-{}')
+    broker.populate('/'.join(QUEUES), 1, name='#DEAD_MSG_QUEUE')
+    result = run_module('solace_queues', msg_vpn='default', queues=[dict(name='old-1')], prune=True)
+    assert sorted(result['queues']['deleted']) == ['old-0', 'old-2']
+    assert sorted(broker.store[QUEUES]) == ['#DEAD_MSG_QUEUE', 'old-1']
+
+
+def test_check_mode_does_not_write(run_module, broker):
+    result = run_module('solace_queues', check_mode=True, msg_vpn='default', queues=[dict(name='q1')])
+    assert result['changed'] and result['queues']['created'] == ['q1']
+    assert broker.store.get(QUEUES, {}) == {}
+    assert broker.stats['methods'] == dict(GET=1)
+
+
+def test_failed_ops_do_not_change(run_module, broker):
+    result = run_module('solace_queues', msg_vpn='default', queues=[dict(name='q1', settings=dict(bogus=1))])
+    assert result['failed'] and not result['changed']
+    assert 'q1' in result['queues']['errors']
+
+
+def test_partial_failure_is_changed(run_module, broker):
+    queues = [dict(name='q1', settings=dict(bogus=1)), dict(name='q2')]
+    result = run_module('solace_queues', msg_vpn='default', queues=queues, workers=2)
+    assert result['failed'] and result['changed']
+    assert result['queues']['created'] == ['q2']
+    assert list(result['queues']['errors']) == ['q1']
+
+
+def test_invalid_setting_name(run_module, broker):
+    broker.populate('/'.join(QUEUES), 1, name='q1')
+    result = run_module('solace_queues', msg_vpn='default', queues=[dict(name='q1', settings={'max-spool': 100})])
+    assert result['failed'] and not result['changed']
+    assert result['queues']['errors'] == dict(q1='Invalid key(s): max-spool')
+
+
+def test_cassette_record_and_replay(run_module, broker, state_files, monkeypatch):
+    monkeypatch.setenv('ANSIBLE_SOLACE_CASSETTE', str(state_files / 'cassette.jsonl'))
+    queues = [dict(name='q{}'.format(i)) for i in range(5)]
+    recorded = run_module('solace_queues', msg_vpn='default', queues=queues, workers=2)
+    assert recorded['changed'] and broker.stats['requests'] == 6
+
+    monkeypatch.setenv('ANSIBLE_SOLACE_CASSETTE_MODE', 'replay')
+    monkeypatch.setenv('ANSIBLE_SOLACE_CASSETTE_LATENCY', '0')
+    broker.reset_stats()
+    replayed = run_module('solace_queues', msg_vpn='default', queues=queues, workers=2)
+    assert replayed == recorded
+    assert broker.stats['requests'] == 0
+
+
+def test_async_transport(run_module, broker, monkeypatch):
+    pytest.importorskip('httpx')
+    import ansible.module_utils.network.solace.solace_async as solace_async
+    sent = []
+    send_request = solace_async._send_request
+
+    async def counting_send_request(method, *args, **kwargs):
+        sent.append(method)
+        return await send_request(method, *args, **kwargs)
+    monkeypatch.setattr(solace_async, '_send_request', counting_send_request)
+    broker.populate('/'.join(QUEUES), 5, name='old-{}')
+    queues = [dict(name='q{}'.format(i)) for i in range(20)] + [dict(name='old-0', state='absent')]
+    result = run_module('solace_queues', msg_vpn='default', queues=queues, prune=True, workers=8, async_transport=True)
+    assert result['changed'] and not result.get('failed')
+    assert len(result['queues']['created']) == 20 and sorted(result['queues']['deleted']) == ['old-{}'.format(i) for i in range(5)]
+    assert sorted(broker.store[QUEUES]) == sorted(q['name'] for q in queues[:20])
+    assert sorted(sent) == ['DELETE'] * 5 + ['GET'] + ['POST'] * 20
+
+    result = run_module('solace_queues', msg_vpn='default', queues=queues, prune=True, workers=8, async_transport=True)
+    assert not result['changed']
@@ -0,0 +1,103 @@
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+import pytest
+
+RDP = ('msgVpns', 'default', 'restDeliveryPoints', 'rdp1')
+
+
+@pytest.fixture
+def requests_log(broker):
+    """(method, path below msgVpns/default) of the write requests the broker handled, in order"""
+    log = []
+    handle = broker.handle
+
+    def logging_handle(method, path, query, body, host='localhost'):
+        if method != 'GET':
+            log.append((method, path.split('/msgVpns/default/', 1)[-1], dict(body or {})))
+        return handle(method, path, query, body, host)
+    broker.handle = logging_handle
+    return log
+
+
+def rdp(enabled=True, port=443):
+    return dict(name='rdp1', settings=dict(enabled=enabled, clientProfileName='default'),
+                rest_consumers=[dict(name='c1', settings=dict(remoteHost='fn.example.com', remotePort=port,
+                                                              tlsEnabled=True, enabled=True),
+                                     trusted_common_names=['*.example.com'])],
+                queue_bindings=[dict(name='q1', settings=dict(postRequestTarget='/api/fn'))])
+
+
+def test_create_enables_after_children(run_module, broker, requests_log):
+    result = run_module('solace_rdp_tree', msg_vpn='default', rdps=[rdp()], workers=4)
+    assert result['changed'] and not result.get('failed')
+    assert result['rest_delivery_points']['created'] == ['rdp1']
+    assert result['rest_consumers']['created'] == ['rdp1/c1']
+    assert result['queue_bindings']['created'] == ['rdp1/q1']
+    assert result['trusted_common_names']['created'] == ['rdp1/c1/*.example.com']
+    # objects are created disabled, the rdp is enabled last
+    assert requests_log[0] == ('POST', 'restDeliveryPoints', dict(msgVpnName='default', restDeliveryPointName='rdp1',
+                                                                  clientProfileName='default', enabled=False))
+    enables = [(method, path) for method, path, body in requests_log if body == dict(enabled=True)]
+    assert sorted(enables) == [('PATCH', 'restDeliveryPoints/rdp1'), ('PATCH', 'restDeliveryPoints/rdp1/restConsumers/c1')]
+    assert requests_log.index(('PATCH', 'restDeliveryPoints/rdp1', dict(enabled=True))) > 2
+    assert broker.store[('msgVpns', 'default', 'restDeliveryPoints')]['rdp1']['enabled'] is True
+    assert broker.store[RDP + ('restConsumers',)]['c1']['enabled'] is True
+
+    del requests_log[:]
+    result = run_module('solace_rdp_tree', msg_vpn='default', rdps=[rdp()])
+    assert not result['changed'] and requests_log == []
+
+
+def test_update_of_enabled_consumer_disables_it_in_the_same_patch(run_module, broker, requests_log):
+    run_module('solace_rdp_tree', msg_vpn='default', rdps=[rdp()])
+    del requests_log[:]
+    result = run_module('solace_rdp_tree', msg_vpn='default', rdps=[rdp(port=8443)])
+    assert result['changed']
+    assert requests_log == [
+        ('PATCH', 'restDeliveryPoints/rdp1/restConsumers/c1', dict(remotePort=8443, enabled=False)),
+        ('PATCH', 'restDeliveryPoints/rdp1/restConsumers/c1', dict(enabled=True))]
+    assert result['rest_consumers']['updated'] == {'rdp1/c1': dict(remotePort=8443, enabled=True)}
+
+
+def test_exclusive_deletes_other_children(run_module, broker):
+    run_module('solace_rdp_tree', msg_vpn='default', rdps=[rdp()])
+    broker.populate('/'.join(RDP + ('restConsumers',)), 1, name='old')
+    broker.populate('/'.join(RDP + ('queueBindings',)), 1, name='old')
+    result = run_module('solace_rdp_tree', msg_vpn='default', rdps=[rdp()], exclusive=True)
+    assert result['rest_consumers']['deleted'] == ['rdp1/old']
+    assert result['queue_bindings']['deleted'] == ['rdp1/old']
+    assert sorted(broker.store[RDP + ('restConsumers',)]) == ['c1']
+
+
+def test_failed_rdp_skips_its_children(run_module, broker, requests_log):
+    tree = rdp()
+    tree['settings']['bogus'] = 1
+    result = run_module('solace_rdp_tree', msg_vpn='default', rdps=[tree])
+    assert result['failed'] and not result['changed']
+    assert list(result['rest_delivery_points']['errors']) == ['rdp1']
+    assert [method for method, path, body in requests_log] == ['POST']
+
+
+def test_check_mode(run_module, broker, requests_log):
+    result = run_module('solace_rdp_tree', check_mode=True, msg_vpn='default', rdps=[rdp()])
+    assert result['changed'] and result['rest_delivery_points']['created'] == ['rdp1']
+    assert requests_log == []
+
+
+def test_updated_passwords_are_masked(run_module, broker):
+    run_module('solace_rdp_tree', msg_vpn='default', rdps=[rdp()])
+    selects = dict()
+    handle = broker.handle
+
+    def logging_handle(method, path, query, body, host='localhost'):
+        if method == 'GET':
+            selects[path.split('/msgVpns/default/', 1)[-1]] = query.get('select')
+        return handle(method, path, query, body, host)
+    broker.handle = logging_handle
+    tree = rdp()
+    tree['rest_consumers'][0]['settings']['password'] = 'secret'
+    result = run_module('solace_rdp_tree', msg_vpn='default', rdps=[tree])
+    assert result['rest_consumers']['updated'] == {'rdp1/c1': dict(password='********', enabled=True)}
+    # the trusted common names are read with a projection as well
+    assert selects['restDeliveryPoints/rdp1/restConsumers/c1/tlsTrustedCommonNames'] == ['tlsTrustedCommonName']
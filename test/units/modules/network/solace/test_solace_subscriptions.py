@@ -0,0 +1,43 @@
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+import pytest
+
+
+@pytest.fixture
+def queue(broker):
+    broker.populate('msgVpns/default/queues', 1, name='q1')
+    return ('msgVpns', 'default', 'queues', 'q1', 'subscriptions')
+
+
+def test_add_and_rerun(run_module, broker, queue):
+    result = run_module('solace_subscriptions', msg_vpn='default', queue='q1', topics=['a/b', 'a/>'], workers=2)
+    assert result['changed'] and not result.get('failed')
+    assert sorted(result['queues']['q1']['created']) == ['a/>', 'a/b']
+    assert sorted(broker.store[queue]) == ['a/>', 'a/b']
+
+    result = run_module('solace_subscriptions', msg_vpn='default', queue='q1', topics=['a/b', 'a/>'])
+    assert not result['changed']
+    assert broker.stats['methods'] == dict(GET=2, POST=2)
+
+
+def test_exclusive_removes_other_topics(run_module, broker, queue):
+    broker.populate('/'.join(queue), 3, name='old/{}')
+    result = run_module('solace_subscriptions', msg_vpn='default', queue='q1', topics=['old/1', 'new'], exclusive=True)
+    assert result['queues']['q1'] == dict(created=['new'], deleted=['old/0', 'old/2'])
+    assert sorted(broker.store[queue]) == ['new', 'old/1']
+
+
+def test_absent(run_module, broker, queue):
+    broker.populate('/'.join(queue), 2, name='t/{}')
+    result = run_module('solace_subscriptions', msg_vpn='default', queue='q1', topics=['t/0', 'nope'], state='absent')
+    assert result['changed'] and result['queues']['q1'] == dict(deleted=['t/0'])
+
+
+def test_missing_queue_fails_unchanged(run_module, broker, queue):
+    result = run_module('solace_subscriptions', msg_vpn='default', queues=dict(q1=['a'], missing=['a']))
+    assert result['failed'] and result['changed']
+    assert 'missing' in result['queues']['missing']['errors']
+
+    result = run_module('solace_subscriptions', msg_vpn='default', queue='missing', topics=['a'])
+    assert result['failed'] and not result['changed']
@@ -0,0 +1,76 @@
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+import importlib.util
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from conftest import ROOT
+
+PLUGINS = os.path.join(ROOT, 'lib', 'ansible', 'plugins', 'action')
+
+PLAYBOOK = """
+- hosts: localhost
+  gather_facts: false
+  tasks:
+    - name: queue with the module on the controller (solace action plugin)
+      solace_queue:
+        msg_vpn: default
+        name: q0
+        port: {port}
+    - name: queues with solace_loop
+      solace_loop:
+        module: solace_queue
+        args:
+          msg_vpn: default
+          port: {port}
+          settings:
+            egressEnabled: true
+            maxMsgSpoolUsage: 10
+        items:
+          - name: q1
+          - name: q2
+            settings:
+              maxMsgSpoolUsage: 100
+        workers: 2
+"""
+
+
+def load_plugin(name):
+    spec = importlib.util.spec_from_file_location('solace_test_action_' + name, os.path.join(PLUGINS, name + '.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_merge_args():
+    merge_args = load_plugin('solace_loop').merge_args
+    common = dict(msg_vpn='default', settings=dict(egressEnabled=True, maxMsgSpoolUsage=10))
+    args = merge_args(common, dict(name='q1', settings=dict(maxMsgSpoolUsage=100)))
+    assert args == dict(msg_vpn='default', name='q1', settings=dict(egressEnabled=True, maxMsgSpoolUsage=100))
+    assert common['settings'] == dict(egressEnabled=True, maxMsgSpoolUsage=10)
+    assert merge_args(common, dict(msg_vpn='other', settings=None))['settings'] is None
+
+
+@pytest.mark.skipif(shutil.which('ansible-playbook') is None, reason='ansible-playbook not installed')
+def test_playbook(broker, tmp_path):
+    playbook = tmp_path / 'playbook.yml'
+    playbook.write_text(PLAYBOOK.format(port=broker.port))
+    env = dict(os.environ,
+               ANSIBLE_ACTION_PLUGINS=PLUGINS,
+               ANSIBLE_MODULE_UTILS=os.path.join(ROOT, 'lib', 'ansible', 'module_utils'),
+               ANSIBLE_LIBRARY=os.path.join(ROOT, 'lib', 'ansible', 'modules'),
+               ANSIBLE_NETWORK_GROUP_MODULES='solace',
+               ANSIBLE_NOCOLOR='1')
+    run = subprocess.run(['ansible-playbook', '-i', 'localhost,', '-c', 'local', str(playbook)],
+                         env=env, cwd=str(tmp_path), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                         universal_newlines=True)
+    assert run.returncode == 0, run.stdout
+    assert 'changed=2' in run.stdout
+    queues = broker.store[('msgVpns', 'default', 'queues')]
+    assert sorted(queues) == ['q0', 'q1', 'q2']
+    assert (queues['q1']['egressEnabled'], queues['q1']['maxMsgSpoolUsage']) == (True, 10)
+    assert (queues['q2']['egressEnabled'], queues['q2']['maxMsgSpoolUsage']) == (True, 100)
@@ -0,0 +1,43 @@
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+import importlib.util
+import os
+
+from conftest import ROOT
+
+
+def load_callback(monkeypatch):
+    path = os.path.join(ROOT, 'lib', 'ansible', 'plugins', 'callback', 'solace_profile.py')
+    spec = importlib.util.spec_from_file_location('solace_test_callback_solace_profile', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    # the callback enables semp_stats in the environment, keep that to the test
+    monkeypatch.setenv(module.SEMP_STATS_ENV, '1')
+    return module.CallbackModule()
+
+
+def stats(started, finished, busy_seconds, calls=(), requests=None):
+    return dict(broker='http://broker:8080', requests=len(calls) if requests is None else requests, seconds=10.0,
+                busy_seconds=busy_seconds, started=started, finished=finished, calls=list(calls))
+
+
+def test_busy_seconds(monkeypatch):
+    callback = load_callback(monkeypatch)
+    # serial loop items: the busy time of each item adds up
+    assert callback.busy_seconds([stats(0.0, 2.0, 1.5, requests=2), stats(2.5, 4.0, 1.0, requests=2)]) == 2.5
+    # parallel loop items: unknown, left out of the time split
+    assert callback.busy_seconds([stats(0.0, 2.0, 1.5, requests=2), stats(1.0, 4.0, 1.0, requests=2)]) is None
+    # a task with parallel requests is split by its busy time, not the sum of the request durations
+    assert callback.busy_seconds([stats(0.0, 2.0, 2.0, requests=20)]) == 2.0
+
+
+def test_sampled_calls_are_weighted(monkeypatch):
+    callback = load_callback(monkeypatch)
+    calls = [dict(method='GET', resource='msgVpns/*/queues', seconds=0.1 * (i + 1)) for i in range(10)]
+    # 10 of 1000 requests sampled
+    callback._add('broker1', stats(0.0, 100.0, 100.0, calls=calls, requests=1000))
+    latency = callback.summary()['methods']['GET']
+    assert latency['calls'] == 1000
+    assert abs(latency['seconds'] - 550.0) < 1e-6
+    assert (latency['p50'], latency['max']) == (0.5, 1.0)
@@ -0,0 +1,73 @@
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+import importlib.util
+import io
+import json
+import os
+
+import pytest
+
+from conftest import ROOT
+
+
+def load_plugin():
+    path = os.path.join(ROOT, 'lib', 'ansible', 'plugins', 'httpapi', 'solace.py')
+    spec = importlib.util.spec_from_file_location('solace_test_httpapi_solace', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class _Response(object):
+
+    def __init__(self, code):
+        self.code = code
+
+    def getcode(self):
+        return self.code
+
+
+class _Connection(object):
+    """httpapi connection with the options of the connection variables, recording the requests of send()"""
+
+    def __init__(self, port):
+        self.options = dict(host='127.0.0.1', port=port, use_ssl=False, remote_user='admin', password='admin',
+                            validate_certs=False)
+        self.sent = []
+
+    def get_option(self, name):
+        return self.options[name]
+
+    def send(self, path, data, method='GET', headers=None):
+        self.sent.append((method, path, data, headers))
+        return _Response(200), io.BytesIO(b'{"data": [], "meta": {"responseCode": 200}}')
+
+
+@pytest.fixture
+def plugin():
+    return load_plugin()
+
+
+def test_send_request(plugin, broker):
+    connection = _Connection(broker.port)
+    httpapi = plugin.HttpApi(connection)
+    status, body = httpapi.send_request(dict(msgVpnName='default', queueName='q1'), '/SEMP/v2/config/msgVpns/default/queues',
+                                        method='POST')
+    assert status == 200 and json.loads(body)['data']['queueName'] == 'q1'
+    status, body = httpapi.send_request(None, '/SEMP/v2/config/msgVpns/default/queues/nope')
+    assert status == 400 and json.loads(body)['meta']['error']['code'] == 6
+    # one keep-alive session for all requests, the connection's own transport is not used
+    assert broker.stats['connections'] == 1 and connection.sent == []
+    httpapi.logout()
+    assert httpapi._session is None
+
+
+def test_send_request_falls_back_to_the_connection(plugin, monkeypatch):
+    monkeypatch.setattr(plugin, 'HAS_REQUESTS', False)
+    connection = _Connection(8080)
+    status, body = plugin.HttpApi(connection).send_request(dict(queueName='q1'), '/SEMP/v2/config/msgVpns/default/queues',
+                                                           method='POST', headers={'x-broker-name': 'b1'})
+    assert (status, json.loads(body)['data']) == (200, [])
+    assert connection.sent == [('POST', '/SEMP/v2/config/msgVpns/default/queues', '{"queueName": "q1"}',
+                                {'Content-Type': 'application/json', 'x-broker-name': 'b1'})]
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+"""Memory benchmark of reading a large collection: dict of objects vs CollectionIndex.
+
+Simulates the paged read of a collection of client usernames (pages of --count objects,
+with the attributes of a select) and measures the memory held after the read, the peak
+memory during the read and the time of SolaceBulkTask.plan() against each.
+
+Usage: python tools/benchmarks/bench_collection_index.py [--sizes 1000,10000,100000] [--count 100]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import ansible.module_utils
+
+# make lib/ansible/module_utils importable with the installed ansible
+ansible.module_utils.__path__.append(os.path.join(os.path.dirname(__file__), '..', '..', 'lib', 'ansible', 'module_utils'))
+import ansible.module_utils.network.solace.solace_utils as su  # noqa: E402
+
+KEY = 'clientUsername'
+SELECT = [KEY, 'aclProfileName', 'clientProfileName', 'enabled', 'guaranteedEndpointPermissionOverrideEnabled']
+
+
+def pages(size, count):
+    """json bodies of the pages of a collection of size objects, as received from the broker"""
+    for start in range(0, size, count):
+        yield json.dumps({'data': [{
+            KEY: 'client-{:07d}'.format(i), 'aclProfileName': 'acl-{}'.format(i % 10),
+            'clientProfileName': 'default', 'enabled': True, 'guaranteedEndpointPermissionOverrideEnabled': False,
+        } for i in range(start, min(size, start + count))]}).encode('utf-8')
+
+
+def read_dict(size, count):
+    """read_collection() before the index: dict key -> object"""
+    current = dict()
+    for body in pages(size, count):
+        for obj in su.json_loads(body)['data']:
+            current[obj[KEY]] = obj
+    return current
+
+
+def read_index(size, count):
+    index = su.CollectionIndex(KEY, SELECT)
+    for body in pages(size, count):
+        for obj in su.json_loads(body)['data']:
+            index.add(obj)
+    return index
+
+
+def measure(read, size, count):
+    """Returns the collection read, MB held after the read, peak MB during the read, seconds"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    current = read(size, count)
+    seconds = time.perf_counter() - start
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, held / 1e6, peak / 1e6, seconds
+
+
+def plan_seconds(current, size):
+    """plan() of a desired state changing every 10th client, with prune"""
+    desired = dict(('client-{:07d}'.format(i), {'enabled': i % 10 != 0}) for i in range(size))
+    task = su.SolaceBulkTask.__new__(su.SolaceBulkTask)
+    start = time.perf_counter()
+    ops, errors = task.plan(desired, current, prune=True)
+    assert len(ops) == (size + 9) // 10 and not errors
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', default='1000,10000,100000', help='comma separated collection sizes')
+    parser.add_argument('--count', type=int, default=su.DEFAULT_PAGE_COUNT, help='objects per page')
+    args = parser.parse_args()
+
+    print('{:>8} {:<6} {:>9} {:>9} {:>10} {:>8} {:>8}'.format('objects', 'read', 'held MB', 'peak MB', 'bytes/obj', 'read s', 'plan s'))
+    for size in [int(s) for s in args.sizes.split(',')]:
+        for name, read in [('dict', read_dict), ('index', read_index)]:
+            current, held, peak, seconds = measure(read, size, args.count)
+            print('{:>8} {:<6} {:>9.1f} {:>9.1f} {:>10.0f} {:>8.2f} {:>8.2f}'.format(
+                size, name, held, peak, held * 1e6 / size, seconds, plan_seconds(current, size)))
+            del current
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+###
+# The End.
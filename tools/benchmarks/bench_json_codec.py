@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+"""Micro-benchmark of the SEMP response decoding: json codecs and gzip compression.
+
+Builds a collection page of queues as returned by GET /msgVpns/{vpn}/queues and measures
+- the decode throughput of the stdlib json, ujson and orjson (those installed)
+- _parse_good_response() of solace_utils (codec: solace_utils.JSON_CODEC) against resp.json()
+- the time to fetch the payload over a link of --mbps, uncompressed vs gzip
+
+Usage: python tools/benchmarks/bench_json_codec.py [--objects 10000] [--repeat 20] [--mbps 10]
+"""
+
+import argparse
+import gzip
+import importlib
+import json
+import os
+import sys
+import time
+
+import ansible.module_utils
+
+# make lib/ansible/module_utils importable with the installed ansible
+ansible.module_utils.__path__.append(os.path.join(os.path.dirname(__file__), '..', '..', 'lib', 'ansible', 'module_utils'))
+import ansible.module_utils.network.solace.solace_utils as su  # noqa: E402
+
+
+def queue(i):
+    return {
+        'accessType': 'exclusive', 'consumerAckPropagationEnabled': True, 'deadMsgQueue': '#DEAD_MSG_QUEUE',
+        'egressEnabled': True, 'eventBindCountThreshold': {'clearPercent': 60, 'setPercent': 80},
+        'eventMsgSpoolUsageThreshold': {'clearPercent': 18, 'setPercent': 25}, 'ingressEnabled': True,
+        'maxBindCount': 1000, 'maxDeliveredUnackedMsgsPerFlow': 10000, 'maxMsgSize': 10000000,
+        'maxMsgSpoolUsage': 5000, 'maxRedeliveryCount': 0, 'maxTtl': 0, 'msgVpnName': 'default',
+        'owner': '', 'permission': 'no-access', 'queueName': 'benchmark/queue/{:06d}'.format(i),
+        'redeliveryEnabled': True, 'rejectLowPriorityMsgEnabled': False, 'rejectLowPriorityMsgLimit': 0,
+        'rejectMsgToSenderOnDiscardBehavior': 'when-queue-enabled', 'respectMsgPriorityEnabled': False,
+        'respectTtlEnabled': False,
+    }
+
+
+def payload(objects):
+    return json.dumps({
+        'data': [queue(i) for i in range(objects)],
+        'links': [{'uri': 'http://localhost:8080/SEMP/v2/config/msgVpns/default/queues/q{}'.format(i)} for i in range(objects)],
+        'meta': {'count': objects, 'request': {'method': 'GET', 'uri': 'http://localhost:8080/SEMP/v2/config/msgVpns/default/queues'},
+                 'responseCode': 200}
+    }).encode('utf-8')
+
+
+def best(func, repeat):
+    """Fastest of repeat runs of func() in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+class _Response(object):
+    """Stand-in for requests.Response"""
+
+    def __init__(self, content):
+        self.status_code = 200
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--objects', type=int, default=10000, help='objects in the payload')
+    parser.add_argument('--repeat', type=int, default=20, help='runs per measurement, the fastest is reported')
+    parser.add_argument('--mbps', type=float, default=10.0, help='link bandwidth in Mbit/s for the transfer estimate')
+    args = parser.parse_args()
+
+    body = payload(args.objects)
+    mb = len(body) / 1e6
+    print('payload: {} objects, {:.2f} MB'.format(args.objects, mb))
+
+    print('\ndecode            ms      MB/s   speedup')
+    baseline = None
+    for name in ['json', 'ujson', 'orjson']:
+        try:
+            codec = importlib.import_module(name)
+        except ImportError:
+            print('{:<12} not installed'.format(name))
+            continue
+        seconds = best(lambda: codec.loads(body), args.repeat)
+        baseline = baseline or seconds
+        print('{:<12} {:8.1f} {:9.1f} {:8.2f}x'.format(name, seconds * 1e3, mb / seconds, baseline / seconds))
+
+    resp = _Response(body)
+    stdlib = best(lambda: resp.json()['data'], args.repeat)
+    parse = best(lambda: su._parse_good_response(resp), args.repeat)
+    print('\n_parse_good_response ({}): {:.1f} ms, resp.json(): {:.1f} ms, {:.2f}x'.format(
+        su.JSON_CODEC, parse * 1e3, stdlib * 1e3, stdlib / parse))
+
+    compressed = gzip.compress(body, 6)
+    gunzip = best(lambda: gzip.decompress(compressed), args.repeat)
+    bytes_per_second = args.mbps * 1e6 / 8
+    plain = len(body) / bytes_per_second + parse
+    gzipped = len(compressed) / bytes_per_second + gunzip + parse
+    print('\ngzip: {:.2f} MB -> {:.2f} MB ({:.1f}x), decompress {:.1f} ms'.format(
+        mb, len(compressed) / 1e6, len(body) / float(len(compressed)), gunzip * 1e3))
+    print('fetch + parse at {:g} Mbit/s: identity {:.2f} s, gzip {:.2f} s, {:.1f}x'.format(
+        args.mbps, plain, gzipped, plain / gzipped))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+###
+# The End.
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+"""Benchmark of the modules against the SEMP simulator, with regression gates on SEMP calls and wall time.
+
+Runs the modules in-process (solace_local.run_module(), as the action plugins do) against
+tools/semp_sim.py with synthetic collections of --sizes objects. Per case and size the scenarios
+run in order on the same simulated broker:
+- create: cold create of all objects
+- rerun: the same arguments again, nothing to change
+- update: every 10th object with a changed setting
+- teardown: delete all objects
+Cases:
+- queue: solace_queue (SolaceTask), one task per queue, up to MAX_SINGLE_TASKS queues
+- queues: solace_queues (SolaceBulkTask), one task for all queues
+- subscriptions: solace_subscriptions, one task for all subscriptions of a queue
+
+Each scenario runs in a fresh child process, which reports its wall time, cpu time and peak RSS.
+The simulator runs in this process and counts the requests and the bytes of their bodies.
+
+The results are compared with the baseline file, if it exists: the script exits with 1 if a scenario
+sends more requests than in the baseline (more than --max-request-increase) or takes more than
+--max-time-increase longer. --save writes the results as the new baseline instead.
+The times of a baseline are machine dependent, use --requests-only on other machines.
+
+Usage: python tools/benchmarks/bench_modules.py [--sizes 100,10000,100000] [--cases queue,queues,subscriptions]
+                                                [--workers 10] [--latency 0] [--baseline FILE] [--save] [--requests-only]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import ansible.module_utils
+
+# make lib/ansible/module_utils and tools/semp_sim.py importable with the installed ansible
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+ansible.module_utils.__path__.append(os.path.join(ROOT, 'lib', 'ansible', 'module_utils'))
+sys.path.insert(0, os.path.join(ROOT, 'tools'))
+import ansible.module_utils.network.solace.solace_local as solace_local  # noqa: E402
+import semp_sim  # noqa: E402
+
+MODULES = os.path.join(ROOT, 'lib', 'ansible', 'modules', 'network', 'solace')
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'bench_modules.json')
+SCENARIOS = ['create', 'rerun', 'update', 'teardown']
+MAX_SINGLE_TASKS = 10000
+VPN = 'default'
+SUBSCRIPTIONS_QUEUE = 'bench-subscriptions'
+# time differences below are noise, not regressions
+MIN_TIME_INCREASE = 0.25
+
+
+def queue_settings(i, scenario):
+    settings = {'egressEnabled': True, 'ingressEnabled': True, 'maxMsgSpoolUsage': 100}
+    if scenario == 'update' and i % 10 == 0:
+        settings['maxMsgSpoolUsage'] = 200
+    return settings
+
+
+def queue_invocations(size, scenario, workers):
+    """Module arguments of the solace_queue tasks of a scenario"""
+    if scenario == 'teardown':
+        return [dict(msg_vpn=VPN, name='bench-q-{:06d}'.format(i), state='absent') for i in range(size)]
+    return [dict(msg_vpn=VPN, name='bench-q-{:06d}'.format(i), settings=queue_settings(i, scenario)) for i in range(size)]
+
+
+def queues_invocations(size, scenario, workers):
+    queues = [dict(name='bench-q-{:06d}'.format(i), settings=queue_settings(i, scenario)) for i in range(size)]
+    if scenario == 'teardown':
+        queues = [dict(name=queue['name'], state='absent') for queue in queues]
+    return [dict(msg_vpn=VPN, queues=queues, workers=workers)]
+
+
+def subscriptions_invocations(size, scenario, workers):
+    # update: replace every 10th topic, teardown: the topics after the update
+    topics = ['bench/{}/topic/{:06d}'.format('new' if scenario in ('update', 'teardown') and i % 10 == 0 else 'sub', i)
+              for i in range(size)]
+    return [dict(msg_vpn=VPN, queue=SUBSCRIPTIONS_QUEUE, topics=topics, workers=workers, exclusive=True,
+                 state='absent' if scenario == 'teardown' else 'present')]
+
+
+# case -> module, module arguments per scenario, max objects
+CASES = {
+    'queue': ('solace_queue', queue_invocations, MAX_SINGLE_TASKS),
+    'queues': ('solace_queues', queues_invocations, None),
+    'subscriptions': ('solace_subscriptions', subscriptions_invocations, None),
+}
+
+
+def run_scenario(case, size, scenario, port, workers):
+    """Run the tasks of a scenario, in the child process. Returns the measurements."""
+    module, invocations, _ = CASES[case]
+    path = os.path.join(MODULES, module + '.py')
+    tasks = invocations(size, scenario, workers)
+    solace_local.load_module(path)
+    transport = dict(host='127.0.0.1', port=port, retries=0)
+    start_cpu = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.perf_counter()
+    failed = changed = 0
+    for args in tasks:
+        args.update(transport)
+        result = solace_local.run_module(path, args)
+        failed += 1 if result.get('failed') or result.get('errors') else 0
+        changed += 1 if result.get('changed') else 0
+    wall = time.perf_counter() - start
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return dict(
+        wall_time=round(wall, 3),
+        cpu_time=round(usage.ru_utime + usage.ru_stime - start_cpu.ru_utime - start_cpu.ru_stime, 3),
+        # ru_maxrss is in KB on linux
+        peak_rss_mb=round(usage.ru_maxrss / 1024.0, 1),
+        tasks=len(tasks),
+        changed=changed,
+        failed=failed
+    )
+
+
+def run_case(case, size, broker, port, workers):
+    """Run the scenarios of a case on a cleared broker, returns scenario -> measurements"""
+    results = dict()
+    broker.store = dict((k, v) for k, v in broker.store.items() if k == ('msgVpns',))
+    if case == 'subscriptions':
+        broker.populate('msgVpns/{}/queues'.format(VPN), 1, name=SUBSCRIPTIONS_QUEUE)
+    for scenario in SCENARIOS:
+        broker.reset_stats()
+        # a fresh process per scenario for its own cpu time and peak rss
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            result = executor.submit(run_scenario, case, size, scenario, port, workers).result()
+        stats = broker.stats
+        result.update(requests=stats['requests'], methods=dict(stats['methods']),
+                      bytes=stats['bytes_received'] + stats['bytes_sent'])
+        results[scenario] = result
+    return results
+
+
+def compare(results, baseline, max_request_increase, max_time_increase=None):
+    """Returns the list of regressions of results against baseline, max_time_increase None: requests only"""
+    regressions = []
+    for key, result in sorted(results.items()):
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if result['requests'] > base['requests'] * (1 + max_request_increase):
+            regressions.append('{}: {} requests, baseline {}'.format(key, result['requests'], base['requests']))
+        if max_time_increase is None:
+            continue
+        if (result['wall_time'] > base['wall_time'] * (1 + max_time_increase)
+                and result['wall_time'] - base['wall_time'] > MIN_TIME_INCREASE):
+            regressions.append('{}: {:.2f}s, baseline {:.2f}s'.format(key, result['wall_time'], base['wall_time']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', default='100,10000,100000', help='comma separated numbers of objects')
+    parser.add_argument('--cases', default=','.join(sorted(CASES)), help='comma separated cases')
+    parser.add_argument('--workers', type=int, default=10, help='workers of the bulk modules')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added by the simulator to each request')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline json file')
+    parser.add_argument('--save', action='store_true', help='save the results as baseline instead of comparing')
+    parser.add_argument('--max-request-increase', type=float, default=0.0, help='tolerated share of additional requests')
+    parser.add_argument('--max-time-increase', type=float, default=0.25, help='tolerated share of additional wall time')
+    parser.add_argument('--requests-only', action='store_true', help='compare the requests only, e.g. on another machine')
+    args = parser.parse_args()
+
+    broker = semp_sim.Broker(latency=args.latency)
+    server = semp_sim.serve(broker)
+    results = dict()
+    print('{:<14} {:>7} {:<9} {:>6} {:>8} {:>8} {:>10} {:>8} {:>8} {:>7}'.format(
+        'case', 'objects', 'scenario', 'tasks', 'wall s', 'cpu s', 'requests', 'MB', 'rss MB', 'failed'))
+    for case in args.cases.split(','):
+        max_size = CASES[case][2]
+        for size in [int(s) for s in args.sizes.split(',')]:
+            if max_size and size > max_size:
+                print('{:<14} {:>7} skipped, more than {} tasks'.format(case, size, max_size))
+                continue
+            for scenario, result in run_case(case, size, broker, server.server_port, args.workers).items():
+                results['{}/{}/{}'.format(case, size, scenario)] = result
+                print('{:<14} {:>7} {:<9} {:>6} {:>8.2f} {:>8.2f} {:>10} {:>8.2f} {:>8.1f} {:>7}'.format(
+                    case, size, scenario, result['tasks'], result['wall_time'], result['cpu_time'], result['requests'],
+                    result['bytes'] / 1e6, result['peak_rss_mb'], result['failed']))
+    server.shutdown()
+
+    if args.save:
+        baseline = dict()
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        if not os.path.isdir(os.path.dirname(args.baseline)):
+            os.makedirs(os.path.dirname(args.baseline))
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print('\nbaseline saved: {}'.format(args.baseline))
+        return 0
+    if not os.path.exists(args.baseline):
+        print('\nno baseline {}, run with --save to create it'.format(args.baseline))
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.max_request_increase,
+                              None if args.requests_only else args.max_time_increase)
+    for regression in regressions:
+        print('REGRESSION ' + regression)
+    print('\n{} regression(s) against {}'.format(len(regressions), args.baseline))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+###
+# The End.
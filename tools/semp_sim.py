@@ -0,0 +1,446 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2020, Solace Corporation, Ricardo Gomez-Ulmke <ricardo.gomez-ulmke@solace.com>
+# MIT License
+
+"""Stateful local stand-in for the SEMP v2 config API of a Solace broker, for benchmarks and fault injection.
+
+Covers the resources of the solace_* modules with the broker's behaviour where the modules depend on it:
+- 400 with error code 6 (NOT_FOUND) for unknown objects or parents, code 10 for existing ones,
+  code 11 for unknown attributes
+- paged collections (count, cursor, meta.paging.nextPageUri), select and where (==, * wildcards)
+- DELETE removes the children of an object
+Per request latency, error rates (503, connection reset) and a connection limit can be configured.
+Random decisions use a seeded generator, so a run with the same requests in the same order injects
+the same faults.
+
+Usage:
+    python tools/semp_sim.py --port 8080 --latency 0.005 --error-rate 0.01 --max-connections 20
+    python tools/semp_sim.py --populate msgVpns/default/queues=10000
+
+In python (e.g. benchmarks):
+    import semp_sim
+    broker = semp_sim.Broker(latency=0.002)
+    server = semp_sim.serve(broker)          # port 0: any free port, see server.server_port
+    broker.populate('msgVpns/default/queues', 10000)
+"""
+
+import argparse
+import gzip
+import json
+import random
+import re
+import socket
+import ssl
+import sys
+import threading
+import time
+from base64 import b64decode
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlencode, urlsplit
+
+SEMP_V2_CONFIG = '/SEMP/v2/config'
+SEMP_VERSION = '2.19'
+DEFAULT_PAGE_COUNT = 10
+
+# collection path pattern ('*' for an object name) -> key attributes, default attributes of new objects.
+# Attributes set by the parent objects (e.g. msgVpnName) are filled in on create.
+COLLECTIONS = [
+    (('msgVpns',), ['msgVpnName'],
+     dict(enabled=False, authenticationBasicType='internal', dmrEnabled=False, maxConnectionCount=100,
+          maxMsgSpoolUsage=0, maxSubscriptionCount=500000, replicationEnabled=False)),
+    (('msgVpns', '*', 'queues'), ['queueName'],
+     dict(accessType='exclusive', deadMsgQueue='#DEAD_MSG_QUEUE', egressEnabled=False, ingressEnabled=False,
+          maxBindCount=1000, maxDeliveredUnackedMsgsPerFlow=10000, maxMsgSize=10000000, maxMsgSpoolUsage=5000,
+          maxRedeliveryCount=0, maxTtl=0, owner='', permission='no-access', redeliveryEnabled=True,
+          rejectMsgToSenderOnDiscardBehavior='when-queue-enabled', respectTtlEnabled=False)),
+    (('msgVpns', '*', 'queues', '*', 'subscriptions'), ['subscriptionTopic'], dict()),
+    (('msgVpns', '*', 'topicEndpoints'), ['topicEndpointName'],
+     dict(accessType='exclusive', egressEnabled=False, ingressEnabled=False, maxMsgSpoolUsage=5000, owner='',
+          permission='no-access', respectTtlEnabled=False)),
+    (('msgVpns', '*', 'clientUsernames'), ['clientUsername'],
+     dict(aclProfileName='default', clientProfileName='default', enabled=False,
+          guaranteedEndpointPermissionOverrideEnabled=False, subscriptionManagerEnabled=False)),
+    (('msgVpns', '*', 'clientProfiles'), ['clientProfileName'],
+     dict(allowBridgeConnectionsEnabled=False, allowGuaranteedEndpointCreateEnabled=False,
+          allowGuaranteedMsgReceiveEnabled=False, allowGuaranteedMsgSendEnabled=False,
+          allowTransactedSessionsEnabled=False, maxConnectionCountPerClientUsername=1000,
+          maxSubscriptionCount=500000)),
+    (('msgVpns', '*', 'aclProfiles'), ['aclProfileName'],
+     dict(clientConnectDefaultAction='disallow', publishTopicDefaultAction='disallow',
+          subscribeTopicDefaultAction='disallow')),
+    (('msgVpns', '*', 'aclProfiles', '*', 'clientConnectExceptions'), ['clientConnectExceptionAddress'], dict()),
+    (('msgVpns', '*', 'aclProfiles', '*', 'publishTopicExceptions'),
+     ['publishTopicExceptionSyntax', 'publishTopicException'], dict()),
+    (('msgVpns', '*', 'aclProfiles', '*', 'subscribeTopicExceptions'),
+     ['subscribeTopicExceptionSyntax', 'subscribeTopicException'], dict()),
+    (('msgVpns', '*', 'aclProfiles', '*', 'publishExceptions'), ['topicSyntax', 'publishExceptionTopic'], dict()),
+    (('msgVpns', '*', 'aclProfiles', '*', 'subscribeExceptions'), ['topicSyntax', 'subscribeExceptionTopic'], dict()),
+    (('msgVpns', '*', 'bridges'), ['bridgeName', 'bridgeVirtualRouter'],
+     dict(enabled=False, maxTtl=8, remoteAuthenticationBasicClientUsername='', remoteAuthenticationScheme='basic',
+          remoteConnectionRetryCount=0, remoteDeliverToOnePriority='p1', tlsCipherSuiteList='default')),
+    (('msgVpns', '*', 'bridges', '*', 'remoteMsgVpns'),
+     ['remoteMsgVpnName', 'remoteMsgVpnLocation', 'remoteMsgVpnInterface'],
+     dict(clientUsername='', compressedDataEnabled=False, connectOrder=4, egressFlowWindowSize=255, enabled=False,
+          queueBinding='', tlsEnabled=False, unidirectionalClientProfile='#client-profile')),
+    (('msgVpns', '*', 'bridges', '*', 'remoteSubscriptions'), ['remoteSubscriptionTopic'], dict(deliverAlwaysEnabled=False)),
+    (('msgVpns', '*', 'bridges', '*', 'tlsTrustedCommonNames'), ['tlsTrustedCommonName'], dict()),
+    (('msgVpns', '*', 'dmrBridges'), ['remoteNodeName'], dict(remoteMsgVpnName='')),
+    (('msgVpns', '*', 'restDeliveryPoints'), ['restDeliveryPointName'],
+     dict(clientProfileName='default', enabled=False, service='', vendor='')),
+    (('msgVpns', '*', 'restDeliveryPoints', '*', 'restConsumers'), ['restConsumerName'],
+     dict(authenticationScheme='none', enabled=False, localInterface='', maxPostWaitTime=30,
+          outgoingConnectionCount=3, remoteHost='', remotePort=8080, retryDelay=3, tlsCipherSuiteList='default',
+          tlsEnabled=False)),
+    (('msgVpns', '*', 'restDeliveryPoints', '*', 'restConsumers', '*', 'tlsTrustedCommonNames'),
+     ['tlsTrustedCommonName'], dict()),
+    (('msgVpns', '*', 'restDeliveryPoints', '*', 'queueBindings'), ['queueBindingName'],
+     dict(gatewayReplaceTargetAuthorityEnabled=False, postRequestTarget='')),
+    (('dmrClusters',), ['dmrClusterName'],
+     dict(authenticationBasicEnabled=True, authenticationBasicType='internal', directOnlyEnabled=False, enabled=False,
+          nodeName='', tlsServerCertMaxChainDepth=3, tlsServerCertValidateDateEnabled=True)),
+    (('dmrClusters', '*', 'links'), ['remoteNodeName'],
+     dict(authenticationScheme='basic', clientProfileName='#client-profile', enabled=False,
+          initiator='lexical', queueDeadMsgQueue='#DEAD_MSG_QUEUE', span='external', transportCompressedEnabled=False,
+          transportTlsEnabled=False)),
+    (('dmrClusters', '*', 'links', '*', 'remoteAddresses'), ['remoteAddress'], dict()),
+    (('dmrClusters', '*', 'links', '*', 'tlsTrustedCommonNames'), ['tlsTrustedCommonName'], dict()),
+    (('certAuthorities',), ['certAuthorityName'],
+     dict(certContent='', crlDayList='daily', crlTimeList='3:00', crlUrl='', ocspNonResponderCertEnabled=False,
+          ocspOverrideUrl='', ocspTimeout=5, revocationCheckEnabled=False)),
+]
+
+# write-only attributes, accepted but never returned
+WRITE_ONLY = set(['password', 'remoteAuthenticationBasicPassword', 'authenticationBasicPassword'])
+
+
+def _match(pattern, parts):
+    return len(pattern) == len(parts) and all(p == '*' or p == x for p, x in zip(pattern, parts))
+
+
+def _collection(parts):
+    """key attributes, defaults of the collection at parts, None if parts is not a collection"""
+    for pattern, keys, defaults in COLLECTIONS:
+        if _match(pattern, parts):
+            return keys, defaults
+    return None
+
+
+def _error(status, code, description, error_status):
+    return status, dict(meta=dict(responseCode=status, error=dict(code=code, description=description, status=error_status)))
+
+
+class Broker(object):
+    """State of the simulated broker and the faults to inject.
+
+    latency: seconds added to each request, plus up to jitter seconds (uniform)
+    error_rate: share of requests answered with 503 Service Unavailable
+    reset_rate: share of requests whose connection is closed without a response
+    max_connections: open connections accepted, further connections are closed right away (0: unlimited)
+    auth: (username, password) required as basic auth, None to accept any request
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, reset_rate=0.0, max_connections=0, auth=None, seed=0,
+                 gzip_enabled=False):
+        self.lock = threading.Lock()
+        # collection path (tuple) -> dict: object uri name -> object
+        self.store = dict()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.reset_rate = reset_rate
+        self.max_connections = max_connections
+        self.auth = auth
+        self.gzip_enabled = gzip_enabled
+        self.random = random.Random(seed)
+        self.stats = dict(requests=0, methods=dict(), bytes_received=0, bytes_sent=0, errors=0, resets=0,
+                          connections=0, refused_connections=0, max_open_connections=0)
+        self.open_connections = 0
+        self.store[('msgVpns',)] = dict(default=self.new_object(('msgVpns',), dict(msgVpnName='default', enabled=True)))
+
+    def new_object(self, parts, data):
+        keys, defaults = _collection(parts)
+        obj = dict(defaults)
+        # attributes identifying the parents, e.g. msgVpnName & queueName of a subscription
+        for i in range(1, len(parts), 2):
+            parent_keys = _collection(parts[:i])[0]
+            values = parts[i].split(',')
+            obj.update((k, v) for k, v in zip(parent_keys, values))
+        obj.update((k, '') for k in keys)
+        obj.update((k, v) for k, v in data.items() if k not in WRITE_ONLY)
+        return obj
+
+    def populate(self, path, count, name='obj-{:07d}', **attributes):
+        """Add count objects to the collection at path (e.g. msgVpns/default/queues), named by the name format"""
+        parts = tuple(path.strip('/').split('/'))
+        keys = _collection(parts)[0]
+        with self.lock:
+            objects = self.store.setdefault(parts, dict())
+            for i in range(count):
+                data = dict(attributes)
+                data[keys[0]] = name.format(i)
+                obj = self.new_object(parts, data)
+                objects[','.join(str(obj.get(k, '')) for k in keys)] = obj
+
+    def reset_stats(self):
+        with self.lock:
+            for key, value in self.stats.items():
+                self.stats[key] = dict() if isinstance(value, dict) else 0
+
+    def fault(self):
+        """Fault to inject into the next request: None, 'error' or 'reset'"""
+        with self.lock:
+            draw = self.random.random()
+        if draw < self.reset_rate:
+            return 'reset'
+        if draw < self.reset_rate + self.error_rate:
+            return 'error'
+        return None
+
+    def delay(self):
+        with self.lock:
+            return self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+
+    def _parent_exists(self, parts):
+        for i in range(1, len(parts), 2):
+            if parts[i] not in self.store.get(tuple(parts[:i]), {}):
+                return False
+        return True
+
+    def handle(self, method, path, query, body, host='localhost'):
+        """Returns http status, response body (dict)"""
+        if not path.startswith(SEMP_V2_CONFIG):
+            return _error(404, 1, 'Unknown path', 'NOT_FOUND')
+        parts = tuple(unquote(p) for p in path[len(SEMP_V2_CONFIG):].strip('/').split('/'))
+        if parts == ('about', 'api'):
+            return 200, dict(data=dict(platform='VMR', sempVersion=SEMP_VERSION), meta=dict(responseCode=200))
+        with self.lock:
+            collection = _collection(parts)
+            if collection is not None:
+                if not self._parent_exists(parts):
+                    return _error(400, 6, 'Could not find match for parent of {}'.format('/'.join(parts)), 'NOT_FOUND')
+                if method == 'GET':
+                    return self._page(self.store.get(parts, {}), path, query, host)
+                if method == 'POST':
+                    return self._create(parts, collection, body or dict())
+                return _error(405, 1, 'Method not allowed', 'NOT_ALLOWED')
+            collection = _collection(parts[:-1])
+            if collection is None:
+                return _error(404, 1, 'Unknown path', 'NOT_FOUND')
+            objects = self.store.get(parts[:-1], {})
+            # trailing empty key attributes may be left out, e.g. the interface of a bridge remote vpn
+            name = parts[-1] + ',' * (len(collection[0]) - 1 - parts[-1].count(','))
+            if not self._parent_exists(parts[:-1]) or name not in objects:
+                return _error(400, 6, 'Could not find match for {}'.format(parts[-1]), 'NOT_FOUND')
+            obj = objects[name]
+            if method == 'GET':
+                return 200, dict(data=self._select(obj, query), meta=dict(responseCode=200))
+            if method == 'PATCH':
+                unknown = [k for k in (body or {}) if k not in obj and k not in WRITE_ONLY]
+                if unknown:
+                    return _error(400, 11, 'Unknown attribute(s): {}'.format(', '.join(unknown)), 'INVALID_PARAMETER')
+                obj.update((k, v) for k, v in (body or {}).items() if k not in WRITE_ONLY)
+                return 200, dict(data=obj, meta=dict(responseCode=200))
+            if method == 'DELETE':
+                del objects[name]
+                parts = parts[:-1] + (name,)
+                for child in [p for p in self.store if p[:len(parts)] == parts]:
+                    del self.store[child]
+                return 200, dict(meta=dict(responseCode=200))
+        return _error(405, 1, 'Method not allowed', 'NOT_ALLOWED')
+
+    def _create(self, parts, collection, data):
+        keys, defaults = collection
+        missing = [k for k in keys[:2] if k not in data and not k.endswith('Interface')]
+        if missing:
+            return _error(400, 11, 'Missing attribute(s): {}'.format(', '.join(missing)), 'MISSING_ATTRIBUTE')
+        parent_keys = set(k for i in range(1, len(parts), 2) for k in _collection(parts[:i])[0])
+        unknown = [k for k in data if k not in defaults and k not in keys and k not in parent_keys and k not in WRITE_ONLY]
+        if unknown:
+            return _error(400, 11, 'Unknown attribute(s): {}'.format(', '.join(unknown)), 'INVALID_PARAMETER')
+        obj = self.new_object(parts, data)
+        name = ','.join(str(obj.get(k, '')) for k in keys)
+        objects = self.store.setdefault(parts, dict())
+        if name in objects:
+            return _error(400, 10, 'Object {} already exists'.format(name), 'ALREADY_EXISTS')
+        objects[name] = obj
+        return 200, dict(data=obj, meta=dict(responseCode=200))
+
+    @staticmethod
+    def _select(obj, query):
+        if 'select' not in query:
+            return obj
+        names = set(query['select'][0].split(','))
+        return dict((k, v) for k, v in obj.items() if k in names)
+
+    def _page(self, objects, path, query, host):
+        count = int(query.get('count', [DEFAULT_PAGE_COUNT])[0])
+        cursor = int(query.get('cursor', ['0'])[0])
+        selected = list(objects.values())
+        if 'where' in query:
+            for expression in query['where'][0].split(','):
+                name, value = expression.split('==', 1)
+                pattern = re.compile('^' + re.escape(value).replace('\\*', '.*') + '$')
+                selected = [obj for obj in selected if pattern.match(str(obj.get(name)))]
+        meta = dict(responseCode=200, count=len(selected))
+        if cursor + count < len(selected):
+            next_query = dict((k, v[0]) for k, v in query.items())
+            next_query['cursor'] = str(cursor + count)
+            meta['paging'] = dict(cursorQuery=next_query['cursor'],
+                                  nextPageUri='http://{}{}?{}'.format(host, quote(path), urlencode(next_query)))
+        data = [self._select(obj, query) for obj in selected[cursor:cursor + count]]
+        return 200, dict(data=data, meta=meta)
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    broker = None
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def _authorized(self):
+        if self.broker.auth is None:
+            return True
+        value = self.headers.get('Authorization', '')
+        if not value.startswith('Basic '):
+            return False
+        return b64decode(value[6:]).decode('utf-8') == '{}:{}'.format(*self.broker.auth)
+
+    def _handle(self):
+        broker = self.broker
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        with broker.lock:
+            broker.stats['requests'] += 1
+            broker.stats['methods'][self.command] = broker.stats['methods'].get(self.command, 0) + 1
+            broker.stats['bytes_received'] += length
+        delay = broker.delay()
+        if delay:
+            time.sleep(delay)
+        fault = broker.fault()
+        if fault == 'reset':
+            with broker.lock:
+                broker.stats['resets'] += 1
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        if fault == 'error':
+            with broker.lock:
+                broker.stats['errors'] += 1
+            status, payload = _error(503, 1, 'Service Unavailable (injected)', 'UNAVAILABLE')
+        elif not self._authorized():
+            status, payload = _error(401, 1, 'Unauthorized', 'UNAUTHORIZED')
+        else:
+            try:
+                body = json.loads(raw) if raw else None
+            except ValueError:
+                body = None
+            url = urlsplit(self.path)
+            status, payload = broker.handle(self.command, url.path, parse_qs(url.query), body,
+                                            self.headers.get('Host', 'localhost'))
+        out = json.dumps(payload).encode('utf-8')
+        gzipped = broker.gzip_enabled and 'gzip' in self.headers.get('Accept-Encoding', '')
+        if gzipped:
+            out = gzip.compress(out, 6)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        if self.close_connection:
+            # e.g. the client sent Connection: close, tells it not to reuse the connection
+            self.send_header('Connection', 'close')
+        self.send_header('Content-Length', str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+        with broker.lock:
+            broker.stats['bytes_sent'] += len(out)
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+
+class _Server(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def verify_request(self, request, client_address):
+        broker = self.RequestHandlerClass.broker
+        with broker.lock:
+            broker.stats['connections'] += 1
+            if broker.max_connections and broker.open_connections >= broker.max_connections:
+                broker.stats['refused_connections'] += 1
+                return False
+            broker.open_connections += 1
+            broker.stats['max_open_connections'] = max(broker.stats['max_open_connections'], broker.open_connections)
+        return True
+
+    def shutdown_request(self, request):
+        broker = self.RequestHandlerClass.broker
+        with broker.lock:
+            broker.open_connections -= 1
+        ThreadingHTTPServer.shutdown_request(self, request)
+
+    def handle_error(self, request, client_address):
+        # connections reset by the client or by an injected fault
+        pass
+
+
+def serve(broker, port=0, host='127.0.0.1', certfile=None, keyfile=None):
+    """Start the simulator in a daemon thread, returns the server (server.server_port, server.shutdown())"""
+    handler = type('Handler', (_Handler,), dict(broker=broker))
+    server = _Server((host, port), handler)
+    if certfile:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+    thread = threading.Thread(target=server.serve_forever, name='semp-sim')
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to each request')
+    parser.add_argument('--jitter', type=float, default=0.0, help='up to seconds added randomly to each request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests answered with 503')
+    parser.add_argument('--reset-rate', type=float, default=0.0, help='share of requests whose connection is reset')
+    parser.add_argument('--max-connections', type=int, default=0, help='open connections accepted, 0 for unlimited')
+    parser.add_argument('--auth', help='username:password required as basic auth')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the fault injection')
+    parser.add_argument('--gzip', action='store_true', help='gzip responses if the client accepts it')
+    parser.add_argument('--certfile', help='serve https with this certificate (pem)')
+    parser.add_argument('--keyfile', help='private key of --certfile')
+    parser.add_argument('--populate', action='append', default=[], metavar='PATH=COUNT',
+                        help='add COUNT objects to the collection at PATH, e.g. msgVpns/default/queues=1000')
+    args = parser.parse_args()
+
+    broker = Broker(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, reset_rate=args.reset_rate,
+                    max_connections=args.max_connections, auth=tuple(args.auth.split(':', 1)) if args.auth else None,
+                    seed=args.seed, gzip_enabled=args.gzip)
+    for populate in args.populate:
+        path, count = populate.rsplit('=', 1)
+        broker.populate(path, int(count))
+    server = serve(broker, args.port, args.host, args.certfile, args.keyfile)
+    print('SEMP v2 simulator on {}://{}:{}{}'.format('https' if args.certfile else 'http', args.host,
+                                                    server.server_port, SEMP_V2_CONFIG))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+###
+# The End.